@@ -0,0 +1,259 @@
+""" Rigs a batch of Maya scenes from the command line, without opening the Rig Helper window
+
+	mayapy RigBatch.py rig.json scenes/*.ma --workers 4
+
+The rig description is a JSON file listing the builds to run on every scene, in order. Each one
+names a build from the window (fk, ik, switch, switches, addtoswitch, twist, footroll, flip), the
+nodes to select for it in the order you would select them by hand, and optionally the window's
+checkboxes:
+
+	{"builds": [
+		{"build": "switch", "select": ["L_shoulder", "L_wrist"]},
+		{"build": "footroll", "select": ["L_ankle", "L_toe", "IK_L_shoulder_Handle"]},
+		{"build": "fk", "select": ["neck_01"], "options": {"IgnoreLeaf": true}}
+	]}
+
+switches takes the start and end joint of every chain, and a switch anim to share if there is one.
+
+A rig spec (see RigHelper/RigSpec.py), as JSON or YAML, can be given in place
+of the list of builds, to build the whole character from joint names in one pass.
+
+Every scene is rigged in a mayapy process of its own, with one process per core running at a
+time, and saved next to the original with a _rigged suffix unless --output or --in-place is given.
+A scene whose builds fail is not saved. The builds are the same functions the window's buttons run.
+With --profile, every build's maya commands are timed and added to the tool's profile log, which
+is RIG_HELPER_PROFILE_LOG when that is set.
+"""
+
+import argparse
+import ast
+import concurrent.futures
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+Here = os.path.dirname(os.path.abspath(__file__))
+ResultMarker = 'RIGBATCH_RESULT '
+SceneTypes = {'.ma': 'mayaAscii', '.mb': 'mayaBinary'}
+
+def LoadTool():
+	""" import the rig tool's builders, without its window """
+	if Here not in sys.path:
+		sys.path.insert(0, Here)
+	import RigHelper.Builders
+	import RigHelper.RigSpec
+	return RigHelper
+
+def BuildNames():
+	""" the builds RigHelper.Builders.Builds runs, read from its source, since the process handing
+	out the scenes may have no maya to import it with """
+	with open(os.path.join(Here, 'RigHelper', 'Builders.py')) as File:
+		Tree = ast.parse(File.read())
+	for Node in Tree.body:
+		if isinstance(Node, ast.Assign) and [getattr(Target, 'id', None) for Target in Node.targets] == ['Builds']:
+			return sorted(Key.value for Key in Node.value.keys)
+	raise ValueError('RigHelper/Builders.py has no Builds')
+
+def ReadDescription(Path):
+	""" the list of builds in a rig description, or a rig spec, checked before any scene is opened """
+	with open(Path) as File:
+		if os.path.splitext(Path)[1].lower() in ('.yaml', '.yml'):
+			try:
+				import yaml
+			except ImportError:
+				raise ValueError('PyYAML is needed to read %s, or save it as JSON' % Path)
+			Description = yaml.safe_load(File)
+		else:
+			Description = json.load(File)
+	if isinstance(Description, dict) and 'rig' in Description:
+		if not isinstance(Description['rig'], list):
+			raise ValueError('%s: expected a "rig" list of builds' % Path)
+		return Description
+	if isinstance(Description, dict):
+		Description = Description.get('builds')
+	if not isinstance(Description, list) or not Description:
+		raise ValueError('%s: expected a list of builds' % Path)
+	Known = BuildNames()
+	for i, Build in enumerate(Description):
+		if not isinstance(Build, dict) or 'build' not in Build:
+			raise ValueError('%s: build %d has no "build" name' % (Path, i))
+		if Build['build'] not in Known:
+			raise ValueError('%s: build %d: unknown build %r, expected one of %s' % (Path, i, Build['build'], ', '.join(Known)))
+		if not isinstance(Build.get('select', []), list):
+			raise ValueError('%s: build %d: "select" should be a list of node names' % (Path, i))
+		if not isinstance(Build.get('options', {}), dict):
+			raise ValueError('%s: build %d: "options" should map checkbox names to values' % (Path, i))
+	return Description
+
+def OutputPath(Scene, Output=None, Suffix='_rigged', InPlace=False):
+	""" where the rigged copy of a scene is saved """
+	if InPlace:
+		return Scene
+	Base, Extension = os.path.splitext(os.path.basename(Scene))
+	return os.path.join(Output or os.path.dirname(Scene), Base+Suffix+Extension)
+
+#--------------------------------------------------------------------------------------------------#
+# Inside a worker
+
+def RigScene(Tool, Scene, Builds, Output, Profile=False):
+	""" open a scene, run every build on it, or its rig spec, and save it as Output.
+	Returns a report of the builds """
+	import maya.cmds as cmds
+	Result = {'scene': Scene, 'output': Output, 'status': 'ok', 'builds': []}
+	Start = time.perf_counter()
+	Tool.Session.Current.Options['Profile'] = Profile
+	cmds.file(Scene, open=True, force=True)
+	if isinstance(Builds, dict):
+		Builds = [{'build': 'rig', 'spec': Builds}]
+	for Build in Builds:
+		BuildStart = time.perf_counter()
+		Report = {'build': Build['build'], 'select': Build.get('select', [])}
+		Result['builds'].append(Report)
+		try:
+			if 'spec' in Build:
+				Tool.RigSpec.BuildRig(Build['spec'])
+			else:
+				Tool.Builders.RunBuild(Build['build'], Build.get('select', []), Build.get('options'))
+		except Exception as Error:
+			Report['error'] = '%s: %s' % (type(Error).__name__, Error)
+			Result['status'] = 'failed'
+			break
+		finally:
+			Report['seconds'] = time.perf_counter() - BuildStart
+	if Result['status'] == 'ok':
+		cmds.file(rename=Output)
+		Type = SceneTypes.get(os.path.splitext(Output)[1].lower(), 'mayaAscii')
+		cmds.file(save=True, force=True, type=Type)
+	Result['seconds'] = time.perf_counter() - Start
+	return Result
+
+def RunWorker(Description, Scene, Output, Profile=False):
+	""" rig one scene in this mayapy process and print the report for the parent process """
+	import maya.standalone
+	maya.standalone.initialize(name='python')
+	try:
+		import maya.cmds as cmds
+		cmds.undoInfo(state=False)
+		Result = RigScene(LoadTool(), Scene, ReadDescription(Description), Output, Profile)
+	except Exception as Error:
+		Result = {'scene': Scene, 'output': Output, 'status': 'failed', 'builds': [],
+			'error': '%s: %s' % (type(Error).__name__, Error)}
+	finally:
+		maya.standalone.uninitialize()
+	sys.stdout.write(ResultMarker+json.dumps(Result)+'\n')
+	sys.stdout.flush()
+	return Result['status'] == 'ok'
+
+#--------------------------------------------------------------------------------------------------#
+# The process pool
+
+def FindMayapy():
+	""" this interpreter when it can import maya, otherwise mayapy from the PATH """
+	if importlib.util.find_spec('maya') is not None:
+		return sys.executable
+	return shutil.which('mayapy')
+
+def RigInProcess(Mayapy, Description, Scene, Output, Timeout=None, Profile=False):
+	""" rig one scene in a new mayapy process, returning its report """
+	Command = [Mayapy, os.path.abspath(__file__), Description, Scene, '--worker', '--output-file', Output]
+	if Profile:
+		Command.append('--profile')
+	Start = time.perf_counter()
+	try:
+		Process = subprocess.run(Command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+			universal_newlines=True, timeout=Timeout)
+	except subprocess.TimeoutExpired:
+		return {'scene': Scene, 'output': Output, 'status': 'failed', 'builds': [],
+			'error': 'timed out after %ds' % Timeout, 'seconds': time.perf_counter() - Start}
+	Lines = Process.stdout.splitlines()
+	for Line in reversed(Lines):
+		if Line.startswith(ResultMarker):
+			return json.loads(Line[len(ResultMarker):])
+	return {'scene': Scene, 'output': Output, 'status': 'failed', 'builds': [],
+		'error': 'mayapy exited with code %d' % Process.returncode, 'log': Lines[-20:],
+		'seconds': time.perf_counter() - Start}
+
+def RigScenes(Mayapy, Description, Jobs, Workers, Timeout=None, Profile=False):
+	""" rig every (scene, output) pair, running up to Workers mayapy processes at once. Reports are
+	printed as each scene finishes and returned in the order the scenes were given """
+	Results = {}
+	with concurrent.futures.ThreadPoolExecutor(max_workers=Workers) as Pool:
+		Futures = {}
+		for Scene, Output in Jobs:
+			Futures[Pool.submit(RigInProcess, Mayapy, Description, Scene, Output, Timeout, Profile)] = Scene
+		for Future in concurrent.futures.as_completed(Futures):
+			Result = Future.result()
+			Results[Futures[Future]] = Result
+			PrintResult(Result)
+	return [Results[Scene] for Scene, Output in Jobs]
+
+def PrintResult(Result):
+	Line = '%-6s %7.2fs  %s' % (Result['status'], Result.get('seconds', 0), Result['scene'])
+	if Result['status'] == 'ok':
+		Line += ' -> %s' % Result['output']
+	print(Line)
+	for Build in Result['builds']:
+		if 'error' in Build:
+			print('         %s on %s: %s' % (Build['build'], ', '.join(Build['select']), Build['error']))
+	if 'error' in Result:
+		print('         %s' % Result['error'])
+	for LogLine in Result.get('log', []):
+		print('         | %s' % LogLine)
+
+#--------------------------------------------------------------------------------------------------#
+
+def ParseArguments(Arguments=None):
+	Parser = argparse.ArgumentParser(description='Rig a batch of Maya scenes from a rig description.')
+	Parser.add_argument('description', help='JSON file listing the builds to run on every scene')
+	Parser.add_argument('scenes', nargs='+', help='Maya scenes to rig')
+	Parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+		help='scenes rigged at once, one mayapy process each (default: one per core)')
+	Parser.add_argument('--output', help='folder for the rigged scenes (default: next to each scene)')
+	Parser.add_argument('--suffix', default='_rigged', help='added to the rigged scene names')
+	Parser.add_argument('--in-place', action='store_true', help='overwrite the scenes instead')
+	Parser.add_argument('--mayapy', help='mayapy to run the workers with (default: found on PATH)')
+	Parser.add_argument('--timeout', type=int, help='seconds before a scene is given up on')
+	Parser.add_argument('--report', help='write every scene\'s report to this JSON file')
+	Parser.add_argument('--profile', action='store_true', help='add the maya commands each build makes to the profile log')
+	Parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+	Parser.add_argument('--output-file', help=argparse.SUPPRESS)
+	return Parser.parse_args(Arguments)
+
+def Main(Arguments=None):
+	Args = ParseArguments(Arguments)
+	if Args.worker:
+		return 0 if RunWorker(Args.description, Args.scenes[0], Args.output_file, Args.profile) else 1
+
+	try:
+		ReadDescription(Args.description)
+	except (OSError, ValueError) as Error:
+		print(Error)
+		return 2
+	Mayapy = Args.mayapy or FindMayapy()
+	if not Mayapy:
+		print('mayapy was not found, pass it with --mayapy')
+		return 2
+	if Args.output and not os.path.isdir(Args.output):
+		os.makedirs(Args.output)
+
+	Description = os.path.abspath(Args.description)
+	Jobs = []
+	for Scene in Args.scenes:
+		Scene = os.path.abspath(Scene)
+		Jobs.append((Scene, OutputPath(Scene, Args.output and os.path.abspath(Args.output), Args.suffix, Args.in_place)))
+	Start = time.perf_counter()
+	Results = RigScenes(Mayapy, Description, Jobs, max(1, Args.workers), Args.timeout, Args.profile)
+	Failed = len([Result for Result in Results if Result['status'] != 'ok'])
+	print('%d scenes rigged, %d failed, in %.2fs' % (len(Results)-Failed, Failed, time.perf_counter() - Start))
+
+	if Args.report:
+		with open(Args.report, 'w') as File:
+			json.dump(Results, File, indent=1)
+	return 1 if Failed else 0
+
+if __name__ == '__main__':
+	sys.exit(Main())
@@ -0,0 +1,844 @@
+""" The builds behind the window's buttons. Each Start function reads the selection and calls the
+Build function of the same name, which takes the joints to build on and can be called from a script:
+
+	BuildFK(Joints, DuplicateJoints=False, SelOnly=False, IgnoreLeaf=None, Matrix=False)
+	BuildIK(Joints, DuplicateJoints=False)		-> IK joints, anims, IK handle
+	BuildSwitch(Joints, BlendMatrix=False)		-> joints, switch anim, IK handle
+	BuildSwitches(Chains, SwitchAnim=None, BlendMatrix=False, PerChain=False)	-> BuildSwitch's, per chain
+	BuildAddToSwitch(Joints, SwitchAnim, BlendMatrix=False)	-> joints
+	BuildTwist(Joints, Segments=1)				-> twist joints
+	BuildFootRoll(Joints, LegIK=None, Anim=0)	-> foot roll anim
+
+The Build functions work from the names the maya commands return, and leave the selection as it was """
+
+import maya.cmds as cmds
+
+from .Hierarchy import (GetSkeletonIndex, FindChildren, GetCurrentSelection, SortJointChain,
+	ShortName, FindMiddleJoints)
+from .Session import GetOption, RigOperation, RunChunked
+from .Graph import NewGraph
+from .Transforms import TransformCache, ReadWorldMatrices, FlippedLocals, RestOffset, Identity
+from .Shapes import MakeShape
+from . import Session
+
+def FreezeTransforms(Anim):
+	cmds.delete(Anim, constructionHistory=True)
+	cmds.makeIdentity(Anim, apply=True, t=1, r=1, s=1, n=0)
+
+def MatchTransformGrp(Anim, Joint):
+	""" match the transforms of an anim control curve and make a group to add it to """
+	cmds.matchTransform(Anim, Joint, pivots=False, scale=False, rot=True, pos=True)
+	Grp = cmds.group(name = Anim+'_grp', empty=True)
+	cmds.matchTransform(Grp, Joint, pivots=False, scale=False, rot=True, pos=True)
+	cmds.parent(Anim, Grp)
+	return Anim
+
+
+#--------------------------------------------------------------------------------------------------#
+
+def DuplicatedPath(Original, Duplicate):
+	""" long name of the duplicate of Original, which duplicate puts beside it """
+	Parent = GetSkeletonIndex().Resolve(Original).rsplit('|', 1)[0]
+	return Parent + '|' + Duplicate.split('|')[-1]
+
+def DuplicateJointChain(Joints, Prefix):
+	""" Used when duplicating chains for IK and FK switching. Returns the new joints in order """
+	selected = FindMiddleJoints(Joints)
+	Skeleton = GetSkeletonIndex()
+	newJoints = cmds.duplicate(selected, parentOnly=True)
+	# the duplicates keep the chain, so each one's long name follows from the one above it
+	newJoints[0] = DuplicatedPath(selected[0], newJoints[0])
+	for i in range(1, len(newJoints)):
+		newJoints[i] = newJoints[i-1] + '|' + newJoints[i].split('|')[-1]
+	Skeleton.Add(newJoints)
+	for i in reversed(range(len(newJoints))): #this loop goes backwards, otherwise it cant find children
+		newName = cmds.rename(newJoints[i], Prefix+ShortName(selected[i]))
+		newJoints[i] = Skeleton.Rename(newJoints[i], newName)
+	return [newJoints[0]] + Skeleton.Descendants(newJoints[0])
+
+def DuplicateJointChains(Chains, Prefix):
+	""" DuplicateJointChain for many chains, with one duplicate call for all of them. A chain whose
+	top is below a joint of another chain goes under that joint's duplicate. Returns the new chains """
+	Skeleton = GetSkeletonIndex()
+	# shallowest first, so the duplicates come back in the same order whichever way they are made
+	Joints = sorted(set(Joint for Chain in Chains for Joint in Chain), key=lambda Joint: (Skeleton.DepthOf(Joint), Skeleton.OrderOf(Joint)))
+	Duplicates = cmds.duplicate(Joints, parentOnly=True)
+	# each duplicate is under the duplicate of its joint's parent, or beside its joint
+	Paths = {}
+	for Joint, Duplicate in zip(Joints, Duplicates):
+		Parent = Skeleton.ParentOf(Joint)
+		Paths[Joint] = Paths.get(Parent, Parent or '') + '|' + ShortName(Duplicate)
+	New = [Paths[Joint] for Joint in Joints]
+	Skeleton.Add(New)
+	Handles = dict(zip(Joints, Skeleton.Handles(New)))
+	for Joint in Joints:
+		Path = Handles[Joint].Path()
+		Skeleton.Rename(Path, cmds.rename(Path, Prefix+ShortName(Joint)))
+	return [[Handles[Joint].Path() for Joint in Chain] for Chain in Chains]
+
+def ParentDuplicateChain(Chain, Prefix):
+	""" put a duplicated chain under the duplicate its parent got from an earlier build with the
+	same Prefix, or in the world when there is none. The chain is held by handles while it moves,
+	so its new long names come from the skeleton index. Returns them in order """
+	Skeleton = GetSkeletonIndex()
+	Handles = Skeleton.Handles(Chain)
+	Parent = Skeleton.ParentOf(Chain[0])
+	if Parent:
+		NewParent = Skeleton.Resolve(Prefix+ShortName(Parent)) or Skeleton.Resolve(Prefix+ShortName(Parent)+'1')
+		if NewParent:
+			Moved = cmds.parent(Chain[0], NewParent)
+		else:
+			Moved = cmds.parent(Chain[0], world=True)
+		Skeleton.Reparent(Chain[0], NewParent, Moved[0])
+	return [Handle.Path() for Handle in Handles]
+	
+def MakeControlsIK(Joints):
+	Anims = []
+	Joints = SortJointChain(Joints)
+	name = ShortName(Joints[-1])
+	print(name)
+	if 'IK_' in name:
+		name = name.replace('IK_', '')
+
+	WristSquare = MakeShape('IK_Anim%s' %name, 'square', 5)
+	WristSquare = MatchTransformGrp(WristSquare, Joints[-1])
+	WristSquare = cmds.rename(WristSquare, 'IK_Anim_%s' %name)
+	try:
+		cmds.connectAttr( '%s.rotate'%WristSquare[0], '%s.rotate' %Joints[-1])
+	except:
+		cmds.connectAttr( '%s.rotate'%WristSquare, '%s.rotate' %Joints[-1])
+	Anims.append(WristSquare)
+	name = ShortName(Joints[-2])
+	ElbowSphere = MakeShape('IK_PoleVector_%s' %name, 'sphere', 1)
+	ElbowSphere = MatchTransformGrp(ElbowSphere, Joints[-2])
+	Anims.append(ElbowSphere)
+	print('IK anims created')
+	return Anims
+	
+def MakeConstraintsIK(Joints, Anims):
+	if len(Joints) == 3:
+		Joints = SortJointChain(Joints)
+		IK = cmds.ikHandle(startJoint=Joints[0], endEffector=Joints[2])
+		cmds.setAttr(IK[0]+'.visibility', 0)
+		Name = str(ShortName(Joints[-1]))
+		IK = cmds.rename(IK[0], Name + '_Handle')
+		IK = cmds.ls(cmds.parent(IK, Anims[0]), long=True)
+		cmds.poleVectorConstraint(Anims[1], IK[0])
+		print('IK constraints created')
+		return IK[0]
+	print('IK constraints created')
+		
+def MakeControlFK(Joint, ParentAnim, Graph=None, Matrix=False):
+	""" an FK anim lined up with Joint under ParentAnim, constrained to drive the joint, or driving it
+	by matrix with Matrix. Made in Graph when it is given, otherwise straight away """
+	ShortName = []
+	try:
+		ShortName = Joint.split("|")[-1]
+	except:
+		ShortName = Joint[0].split("|")[-1]
+		Joint = Joint[0]
+	Builder = Graph or NewGraph()
+	NurbsCircle = Builder.Control('FK_Anim_%s' % ShortName, Joint, ParentAnim and ParentAnim[0])
+	if Matrix:
+		MatrixControlFK(Builder, NurbsCircle[0], Joint)
+	else:
+		Builder.Later(ConstrainControlFK, NurbsCircle[0], Joint)
+	if Graph is None:
+		Builder.Finish()
+		NurbsCircle = [Builder.Name(Node) for Node in NurbsCircle]
+	return NurbsCircle
+
+def ConstrainControlFK(Anim, Joint):
+	cmds.orientConstraint(Anim, Joint, mo=True)
+	cmds.pointConstraint(Anim, Joint, mo=True)
+
+def MatrixControlFK(Graph, Anim, Joint):
+	""" drive Joint with Anim through its offsetParentMatrix, with one multMatrix in place of two
+	constraints. The multMatrix starts with the inverse of the joint's rest transform, which the anim
+	was lined up with, so the joint keeps its attributes and goes back to them if the node is deleted.
+	Nothing is read from the joint itself, which would make it depend on itself for parallel evaluation """
+	Mult = Graph.CreateNode('multMatrix', 'FK_Matrix_%s' % ShortName(Joint))
+	with Session.Derived('Attr', Joint+'.inverseMatrix'):
+		Graph.SetMatrix(Mult, 'matrixIn[0]', cmds.getAttr(Joint+'.inverseMatrix'))
+	Graph.Connect(Anim, 'worldMatrix[0]', Mult, 'matrixIn[1]')
+	Parent = GetSkeletonIndex().Resolve(Joint).rsplit('|', 1)[0]
+	if Parent:
+		Graph.Connect(Parent, 'worldInverseMatrix[0]', Mult, 'matrixIn[2]')
+	Graph.Connect(Mult, 'matrixSum', Joint, 'offsetParentMatrix')
+
+def Rename(Joint):
+	ShortName = Joint.split("|")[-1]
+	newName = cmds.rename(Joint, 'FK_%s' %ShortName)
+	return newName
+    
+def Search(Joint, PrevAnim, IgnoreLeaf=None, Graph=None, Matrix=False):
+	for Step in SearchSteps(Joint, PrevAnim, IgnoreLeaf, Graph, Matrix):
+		pass
+
+def SearchSteps(Joint, PrevAnim, IgnoreLeaf=None, Graph=None, Matrix=False):
+	""" FK anims for every joint below Joint under PrevAnim, in hierarchy order, yielding after each
+	joint so a chunked build can stop between them """
+	Skeleton = GetSkeletonIndex()
+	if IgnoreLeaf is None:
+		IgnoreLeaf = GetOption('IgnoreLeaf', False)
+	Waiting = [(children, PrevAnim) for children in reversed(Skeleton.ChildrenOf(Joint))]
+	while Waiting:
+		children, PrevAnim = Waiting.pop()
+		Below = Skeleton.ChildrenOf(children)
+		if Below or not IgnoreLeaf:
+			NewAnim = MakeControlFK(children, PrevAnim, Graph, Matrix)
+			Waiting += [(child, NewAnim) for child in reversed(Below)]
+		yield
+			
+def RenameHierarchy(Joint, Prefix):
+	""" Adds a prefix to every joint in a hierarchy, returns the new long name of the top joint """
+	for Root in RenameSteps(Joint, Prefix):
+		pass
+	return [Root]
+
+def RenameSteps(Joint, Prefix):
+	""" RenameHierarchy a joint at a time, yielding the top joint's long name after each one """
+	Skeleton = GetSkeletonIndex()
+	Root = Skeleton.Resolve(Joint)
+	Joints = [Root] + Skeleton.Descendants(Root)
+	for current in reversed(Joints): #bottom up, so the long names above stay valid
+		Short = ShortName(current)
+		if Prefix not in Short:
+			newName = cmds.rename(current, Prefix+Short)
+			newName = Skeleton.Rename(current, newName)
+			if current == Root:
+				Root = newName
+		yield Root
+	
+def MakeAnimIKFK(Joints, Name='IK-FK_switch'):
+	Curve = [MakeShape(Name, 'square', 5, (0, 1, 0))]
+
+	node = cmds.createNode('pickMatrix', name='pickMatrix'+Joints[-2], skipSelect=True)
+	cmds.setAttr(node+'.useScale', 0)
+	cmds.setAttr(node+'.useShear', 0)
+	cmds.connectAttr(Joints[-1]+'.worldMatrix[0]', '%s.inputMatrix' %node) 
+	cmds.connectAttr('%s.outputMatrix' %node, '%s.offsetParentMatrix' %Curve[0]) 
+	cmds.addAttr(Curve, longName='IKFK', shortName='IKFK', at='float', dv=0, min=0, max=1, k=True)
+	print('IK/FK switch created')
+	return Curve
+	
+def SwitchReverse(Graph, SwitchAnim):
+	""" the plusMinusAverage giving 1 - IKFK for a switch anim, made once and shared by every chain
+	on the switch """
+	Existing = cmds.listConnections(SwitchAnim+'.IKFK', source=False, type='plusMinusAverage')
+	if Existing:
+		return Existing[0]
+	MinusNode = Graph.CreateNode('plusMinusAverage')
+	Graph.Connect(SwitchAnim, 'IKFK', MinusNode, 'input3D[1].input3Dx')
+	Graph.Set(MinusNode, 'operation', 2)
+	Graph.Set(MinusNode, 'input3D[0].input3Dx', 1)
+	return MinusNode
+
+def BlendSwitchJoint(Graph, SwitchAnim, Joint, IKJoint, FKJoint, BlendMatrix=False):
+	""" blend Joint between its IK and FK joints by the switch's IKFK attribute: its rotation with a
+	blendColors, or with BlendMatrix its whole matrix, into its offsetParentMatrix after the inverse
+	of its rest transform, as in MatrixControlFK """
+	short = ShortName(Joint)
+	if not BlendMatrix:
+		blendNode = Graph.CreateNode('blendColors', 'blendIKFK'+short)
+		Graph.Connect(SwitchAnim, 'IKFK', blendNode, 'blender')
+		Graph.Connect(IKJoint, 'rotate', blendNode, 'color2')
+		Graph.Connect(FKJoint, 'rotate', blendNode, 'color1')
+		Graph.Connect(blendNode, 'output', Joint, 'rotate')
+		return
+	blendNode = Graph.CreateNode('blendMatrix', 'blendIKFK'+short)
+	Graph.Connect(IKJoint, 'matrix', blendNode, 'inputMatrix')
+	Graph.Connect(FKJoint, 'matrix', blendNode, 'target[0].targetMatrix')
+	Graph.Connect(SwitchAnim, 'IKFK', blendNode, 'target[0].weight')
+	Mult = Graph.CreateNode('multMatrix', 'IKFK_Matrix_'+short)
+	with Session.Derived('Attr', Joint+'.inverseMatrix'):
+		Graph.SetMatrix(Mult, 'matrixIn[0]', cmds.getAttr(Joint+'.inverseMatrix'))
+	Graph.Connect(blendNode, 'outputMatrix', Mult, 'matrixIn[1]')
+	Graph.Connect(Mult, 'matrixSum', Joint, 'offsetParentMatrix')
+
+def SwitchVisibility(Graph, SwitchAnim, FKNodes, IKNodes):
+	""" show FKNodes when the switch is on FK and IKNodes when it is on IK. Given the tops of the
+	chains and control groups, everything below follows """
+	Reverse = SwitchReverse(Graph, SwitchAnim)
+	for Node in FKNodes:
+		Graph.Connect(SwitchAnim, 'IKFK', Node, 'visibility')
+	for Node in IKNodes:
+		Graph.Connect(Reverse, 'output3Dx', Node, 'visibility')
+
+@RigOperation('add to existing IK/FK switch')
+def AddToSwitch(*args):
+	JointsSelected = cmds.ls(sl=True,long=True, type='joint') or []
+	AllSelected = cmds.ls(sl=True,long=True) or []
+	SwitchAnim = 0
+
+	for i in range(len(AllSelected)):
+		if AllSelected[i] not in JointsSelected:
+			SwitchAnim = AllSelected[i]
+	BuildAddToSwitch(JointsSelected, SwitchAnim, GetOption('BlendMatrix', False))
+
+@RigOperation('add to existing IK/FK switch')
+def BuildAddToSwitch(Joints, SwitchAnim, BlendMatrix=False):
+	""" FK and IK chains for the joints from Joints[0] down to Joints[-1], blended by the IKFK
+	attribute of an existing switch anim, whose reverse node they share. The anim and the joints are
+	checked before anything is made """
+	if not SwitchAnim or not cmds.objExists(SwitchAnim) or not cmds.attributeQuery('IKFK', node=SwitchAnim, exists=True):
+		raise RuntimeError('No usable anim selected, select a switch anim with an IKFK attribute')
+	JointsSelected = FindMiddleJoints(Joints)
+	
+	for joints in JointsSelected:
+		connections = cmds.listConnections([joints+'.rotate', joints+'.offsetParentMatrix'], d=False)
+		if connections:
+			raise RuntimeError('There is already an incoming connection to '+joints)
+	#Make FK
+	FKChain = ParentDuplicateChain(DuplicateJointChain(JointsSelected, 'FK_'), 'FK_')
+	print(FKChain)
+	Graph = NewGraph()
+	FKAnim = MakeControlFK(FKChain[0], 0, Graph)
+	
+	Search(FKChain[0], FKAnim, Graph=Graph)
+
+	#Make IK
+	IKChain = ParentDuplicateChain(DuplicateJointChain(JointsSelected, 'IK_'), 'IK_')
+	print(IKChain)
+	for i in range(len(JointsSelected)):
+		BlendSwitchJoint(Graph, SwitchAnim, JointsSelected[i], IKChain[i], FKChain[i], BlendMatrix)
+
+	SwitchVisibility(Graph, SwitchAnim, Graph.TopGroups + FKChain[:1], IKChain[:1])
+	Graph.Finish()
+		
+	print('Addition to IK/FK completed')
+	return JointsSelected
+		
+	
+#--------------------------------------------------------------------------------------------------#
+# Deciding what to build
+
+@RigOperation('generate IK')
+def StartIK(*args):
+	Skeleton = GetSkeletonIndex()
+	DuplicateJoints = GetOption('Duplicate', False)
+	selected = cmds.ls(sl=True,long=True, type='joint') or []
+	selected = SortJointChain(selected)
+	
+	if len(selected) == 2:
+		if Skeleton.ParentOf(selected[1]) in Skeleton.ChildrenOf(selected[0]):
+			return BuildIK(selected, bool(args and args[0]) or DuplicateJoints)
+
+@RigOperation('generate IK')
+def BuildIK(Joints, DuplicateJoints=False):
+	""" IK controls for the three joint chain from Joints[0] down to Joints[-1].
+	Returns the IK joints, the anims and the IK handle """
+	if DuplicateJoints:
+		Joints = DuplicateJointChain(Joints, 'IK_')
+	else:
+		Joints = FindMiddleJoints(Joints)
+	Anims = MakeControlsIK(Joints)
+	Handle = MakeConstraintsIK(Joints, Anims)
+	print('IK created')
+	return Joints, Anims, Handle
+			
+def StartFK(*args):
+	selected = GetCurrentSelection('joint')
+	DuplicateJoints = GetOption('Duplicate', False)
+	SelOnly = GetOption('SelOnly', False)
+	RunChunked('generate FK', FKSteps(selected, DuplicateJoints, SelOnly, None, GetOption('MatrixFK', False)))
+
+@RigOperation('generate FK')
+def BuildFK(Joints, DuplicateJoints=False, SelOnly=False, IgnoreLeaf=None, Matrix=False):
+	""" FK controls for the hierarchies below Joints, or for only those joints with SelOnly.
+	With Matrix the anims drive the joints by matrix connections rather than constraints """
+	for Progress in FKSteps(Joints, DuplicateJoints, SelOnly, IgnoreLeaf, Matrix):
+		pass
+
+def FKSteps(Joints, DuplicateJoints=False, SelOnly=False, IgnoreLeaf=None, Matrix=False):
+	""" BuildFK a joint at a time, yielding the joints done and the total after each one. Duplicated
+	hierarchies count each joint twice, once renamed and once given its anim """
+	Skeleton = GetSkeletonIndex()
+	selected = list(Joints)
+	Graph = NewGraph()
+	Done = 0
+	
+	if SelOnly:
+		if DuplicateJoints:
+			selected = DuplicateJointChain(selected, 'FK_')
+			Graph.Transforms.Fetch(selected)
+			Total = len(selected)
+			Anim = MakeControlFK(selected[0], 0, Graph, Matrix)
+			Done += 1
+			yield Done, Total
+			for Step in SearchSteps(selected[0], Anim, IgnoreLeaf, Graph, Matrix):
+				Done += 1
+				yield Done, Total
+		else:
+			Graph.Transforms.Fetch(selected)
+			Total = len(selected)
+			for i in range(len(selected)):
+				Anim = MakeControlFK(selected[i], 0, Graph, Matrix)
+				Done += 1
+				yield Done, Total
+	else:
+		Total = sum(1 + Skeleton.CountDescendants(Joint) for Joint in selected)
+		Hierachies =[]
+		if DuplicateJoints:
+			Total *= 2
+			for i in range(len(selected)):
+				Duplicate = cmds.duplicate(selected[i])
+				Top = Skeleton.AddHierarchy(DuplicatedPath(selected[i], Duplicate[0]))[0]
+				for Top in RenameSteps(Top, 'FK_'):
+					Done += 1
+					yield Done, Total
+				temp = cmds.parent(Top, world=True)
+				Hierachies.append([Skeleton.Reparent(Top, None, temp[0])])
+
+		else:
+			Hierachies = selected
+		# every joint's world matrix in one pass, for placing all the anims
+		Tops = [Skeleton.Resolve(Top[0] if isinstance(Top, list) else Top) for Top in Hierachies]
+		Graph.Transforms.Fetch(Tops + [Joint for Top in Tops for Joint in Skeleton.Descendants(Top)])
+		for i in range(len(Hierachies)):
+			Anim = MakeControlFK(Hierachies[i], 0, Graph, Matrix)
+			Done += 1
+			yield Done, Total
+			for Step in SearchSteps(Hierachies[i], Anim, IgnoreLeaf, Graph, Matrix):
+				Done += 1
+				yield Done, Total
+	Graph.Finish()
+	print('FK controls completed')
+			
+@RigOperation('generate IK/FK switch')
+def StartSwitch(*args):
+	selected = cmds.ls(sl=True,long=True, type='joint') or []
+	BuildSwitch(selected, GetOption('BlendMatrix', False))
+
+@RigOperation('generate IK/FK switch')
+def BuildSwitch(Joints, BlendMatrix=False):
+	""" FK and IK chains for the three joints from Joints[0] down to Joints[-1], blended by a switch anim,
+	their rotations by default or their whole matrices with BlendMatrix.
+	Returns the original joints, the switch anim and the IK handle """
+	#Make FK
+	Graph = NewGraph()
+	FKChain = DuplicateJointChain(Joints, 'FK_')
+	Graph.Transforms.Fetch(FKChain)
+	FKAnim = MakeControlFK(FKChain[0], 0, Graph)
+	Search(FKChain[0], FKAnim, Graph=Graph)
+
+	#Make IK
+	IK = BuildIK(Joints, True)
+	selected = FindMiddleJoints(Joints)
+	IKSwitchAnim = MakeAnimIKFK(selected)
+	IKChain = IK[0]
+	IKAnims = IK[1]
+	Switch = IKSwitchAnim[0]
+	
+	for i in range(len(selected)):
+		BlendSwitchJoint(Graph, Switch, selected[i], IKChain[i], FKChain[i], BlendMatrix)
+
+	SwitchVisibility(Graph, Switch, Graph.TopGroups + FKChain[:1], IKAnims[:2] + IKChain[:1])
+	Graph.Finish()
+	print('IK/FK switch completed')
+	return selected, IKSwitchAnim[0], IK[2]
+
+@RigOperation('generate IK/FK switches')
+def StartSwitches(*args):
+	""" switches for the selected chains, each given by its start and end joint. The joints are
+	paired in hierarchy order, so the selection order does not matter. A selected anim is the
+	switch they all share """
+	Joints = SortJointChain(cmds.ls(sl=True, long=True, type='joint') or [])
+	Anims = [Node for Node in cmds.ls(sl=True, long=True) or [] if cmds.nodeType(Node) != 'joint']
+	if not Joints or len(Joints) % 2:
+		print('Select the start and end joint of each chain')
+		return
+	Chains = [Joints[i:i+2] for i in range(0, len(Joints), 2)]
+	return BuildSwitches(Chains, Anims[0] if Anims else None, GetOption('BlendMatrix', False), GetOption('SwitchPerChain', False))
+
+@RigOperation('generate IK/FK switches')
+def BuildSwitches(Chains, SwitchAnim=None, BlendMatrix=False, PerChain=False):
+	""" IK/FK switches for many chains in one build, each chain a start and end joint as for
+	BuildSwitch. The FK and IK joints of all of them are made with one duplicate call each, and
+	every anim and blend node is made in one graph. The chains share SwitchAnim, or one new switch
+	anim, and its reverse node, or with PerChain each get a switch anim of its own.
+	A chain below another one, like fingers below an arm, has its FK and IK joints and its FK anims
+	put under the other chain's. Returns the joints, switch anim and IK handle of each chain """
+	Skeleton = GetSkeletonIndex()
+	Chains = [FindMiddleJoints(Chain) for Chain in Chains]
+	Graph = NewGraph()
+	FKChains = DuplicateJointChains(Chains, 'FK_')
+	IKChains = DuplicateJointChains(Chains, 'IK_')
+	Graph.Transforms.Fetch([Joint for Chain in FKChains for Joint in Chain])
+	Duplicated = set(Joint for Chain in FKChains for Joint in Chain)
+
+	Results = []
+	Visible = {} # the FK and IK nodes each switch anim shows and hides
+	for Chain, FKChain, IKChain in zip(Chains, FKChains, IKChains):
+		TopGroups = len(Graph.TopGroups)
+		FKTops = []
+		# a chain inside another gets its FK anims from the outer chain's Search
+		if Skeleton.ParentOf(FKChain[0]) not in Duplicated:
+			FKAnim = MakeControlFK(FKChain[0], 0, Graph)
+			Search(FKChain[0], FKAnim, Graph=Graph)
+			FKTops = Graph.TopGroups[TopGroups:] + FKChain[:1]
+		IKAnims = MakeControlsIK(IKChain)
+		Handle = MakeConstraintsIK(IKChain, IKAnims)
+
+		if PerChain:
+			Switch = MakeAnimIKFK(Chain, 'IK-FK_switch_'+ShortName(Chain[-1]))[0]
+		else:
+			if not SwitchAnim:
+				SwitchAnim = MakeAnimIKFK(Chain)[0]
+			Switch = SwitchAnim
+		for i in range(len(Chain)):
+			BlendSwitchJoint(Graph, Switch, Chain[i], IKChain[i], FKChain[i], BlendMatrix)
+		Nodes = Visible.setdefault(Switch, ([], []))
+		Nodes[0].extend(FKTops)
+		Nodes[1].extend(IKAnims[:2] + IKChain[:1])
+		Results.append((Chain, Switch, Handle))
+
+	for Switch, (FKNodes, IKNodes) in Visible.items():
+		SwitchVisibility(Graph, Switch, FKNodes, IKNodes)
+	Graph.Finish()
+	print('IK/FK switches completed for %d chains' % len(Chains))
+	return Results
+			
+@RigOperation('generate twist joint')
+def StartTwist(*args):
+	selected = cmds.ls(sl=True,long=True, type='joint') or []
+	BuildTwist(selected, GetOption('TwistSegments', 1))
+
+@RigOperation('generate twist joint')
+def BuildTwist(Joints, Segments=1):
+	""" Segments twist joints spread evenly along each joint, together following its child's X
+	rotation. Each twist joint is under the one before and turns by the share of it that goes with
+	one step down the joint, 1/(Segments+1), so twist joint j has turned j/(Segments+1) of the way,
+	as far as it is along the joint. The shares of a limb, a run of selected joints each under the
+	one before, come from one multiplyDivide with a channel for each joint, and the twist joints pass
+	them down. A single twist joint is driven by the child straight away. Returns the twist joints """
+	Skeleton = GetSkeletonIndex()
+	selected = list(Joints)
+	Segments = max(int(Segments), 1)
+	TwistJoints = []
+	# where each joint's first child is, from one pass over their world matrices
+	Parents = [Joint for Joint in selected if Skeleton.ChildrenOf(Joint)]
+	Offsets = TransformCache().LocalPositions([Skeleton.ChildrenOf(Joint)[0] for Joint in Parents], Parents)
+	Offsets = dict(zip(Parents, Offsets))
+	Shares = TwistShares(Skeleton, Parents, 1.0/(Segments+1)) if Segments > 1 else {}
+	for i in range(len(selected)):
+		Child = Skeleton.ChildrenOf(selected[i])
+		Name = ShortName(selected[i])
+		if Child:
+			Twist = Child[0]+'.rotateX'
+			if Segments > 1:
+				Share, Channel = Shares[selected[i]]
+				cmds.connectAttr(Twist, '%s.input1%s' % (Share, Channel))
+				Twist = '%s.output%s' % (Share, Channel)
+			# the twist joints start where their parent is, so each one's translate is one step down the joint
+			Step = [Value/(Segments+1) for Value in Offsets[selected[i]]]
+		Parent = Skeleton.Resolve(selected[i])
+		for Segment in range(Segments):
+			TwistName = 'Twist_'+Name if Segments == 1 else 'Twist_%s_%d' % (Name, Segment+1)
+			TwistJoint = Parent+'|'+ShortName(cmds.createNode('joint', name=TwistName, parent=Parent, skipSelect=True))
+			TwistJoints.append(TwistJoint)
+			if Child:
+				with Session.Derived('Offset', Child[0], selected[i], 1.0/(Segments+1)):
+					cmds.setAttr(TwistJoint+'.translate', *Step)
+				cmds.connectAttr(Twist, TwistJoint+'.rotateX')
+				Twist = TwistJoint+'.rotateX'
+			Parent = TwistJoint
+	Skeleton.Add(TwistJoints)
+	print('Twist joints completed')
+	return TwistJoints
+
+def TwistShares(Skeleton, Joints, Share):
+	""" a multiplyDivide channel giving Share of the twist for each of Joints, by joint. Joints each
+	under the one before share a node, three to a node, so a limb takes one """
+	Shares = {}
+	Limbs = {}
+	Made = {}
+	for Joint in sorted(Joints, key=lambda Joint: Skeleton.Resolve(Joint).count('|')):
+		Long = Skeleton.Resolve(Joint)
+		Limb = Limbs[Long] = Limbs.get(Long.rsplit('|', 1)[0], Long)
+		Nodes = Made.setdefault(Limb, [])
+		if len(Nodes) % 3 == 0:
+			Node = cmds.createNode('multiplyDivide', name='Twist_%s_share' % ShortName(Limb), skipSelect=True)
+		else:
+			Node = Nodes[-1]
+		Channel = 'XYZ'[len(Nodes) % 3]
+		Nodes.append(Node)
+		cmds.setAttr('%s.input2%s' % (Node, Channel), Share)
+		Shares[Joint] = (Node, Channel)
+	return Shares
+
+def FoldRestIntoOffset(Grp):
+	""" move a pivot group's rest translate, and its rest rotation from Y on, into its offsetParentMatrix,
+	so the roll can drive its rotateY from zero rather than through a node adding the rest rotation.
+	rotateX stays in the channel: in the xyz rotate order X, then Y of the rest plus the roll, then Z
+	is X, then Y of the roll, then the rest's Y and Z, so the roll turns about the same axis as before.
+	The group is read before anything is set, which a trace played again does too """
+	Rotation = cmds.xform(Grp, query=True, rotation=True)
+	Translation = cmds.xform(Grp, query=True, translation=True)
+	with Session.Derived('RestOffset', Grp):
+		cmds.setAttr(Grp+'.offsetParentMatrix', RestOffset(Rotation, Translation), type='matrix')
+	with Session.Derived('Attr', Grp+'.rotate', [1, 0, 0]):
+		cmds.xform(Grp, rotation=(Rotation[0], 0, 0))
+	cmds.xform(Grp, translation=(0, 0, 0))
+
+def ConnectFootRollAttr(AnimAttr, Grp):
+	FoldRestIntoOffset(Grp)
+	cmds.connectAttr(AnimAttr, Grp+'.rotateY')
+
+def FootRollClamp(Anim):
+	""" one clamp for both ways the foot rolls: FootRoll limited to the heel in R and the toe in G """
+	Clamp = cmds.createNode('clamp', skipSelect=True)
+	cmds.connectAttr(Anim+'.FootRoll', Clamp+'.inputR')
+	cmds.connectAttr(Anim+'.FootRoll', Clamp+'.inputG')
+	cmds.setAttr(Clamp+'.maxR', 60)
+	cmds.setAttr(Clamp+'.minG', -60)
+	return Clamp
+
+def FootRollExpression(Name, Lines, Grps):
+	""" the whole roll as one expression node, setting the rotateY of each of Grps """
+	for Grp in Grps:
+		FoldRestIntoOffset(Grp)
+	cmds.expression(name=Name+'_FootRoll_expr', string='\n'.join(Lines), alwaysEvaluate=False)
+
+@RigOperation('add foot roll')
+def StartFootRoll(*args):
+	JointsSelected = cmds.ls(sl=True,long=True, type='joint') or []
+	Transforms = cmds.ls(sl=True,long=True, type='transform') or []
+	LegIK = cmds.ls(sl=True,long=True, type='ikHandle') or []
+	Expression = GetOption('FootRollExpression', False)
+	Anim = 0
+	for i in range(len(Transforms)):
+		children = cmds.listRelatives(Transforms[i], type='nurbsCurve')
+		if children:
+			Anim = Transforms[i]
+	BuildFootRoll(JointsSelected, LegIK, Anim, Expression)
+
+@RigOperation('add foot roll')
+def BuildFootRoll(Joints, LegIK=None, Anim=0, Expression=False):
+	""" foot roll groups for the ankle Joints[0] down to the toe, holding the leg IK handle.
+	The IK handle is found from the ankle and the anim is made when they are not given.
+	The pivot groups are driven by a few utility nodes, or by one expression with Expression """
+	JointsSelected = list(Joints)
+	if isinstance(LegIK, str):
+		LegIK = [LegIK]
+	if len(JointsSelected) > 1:
+		Joints = FindMiddleJoints(JointsSelected)
+	else:
+		Joints = FindChildren(JointsSelected, JointsSelected)
+			
+	if not LegIK:
+		effector = cmds.listConnections(Joints[0], source=False, type = 'ikEffector')
+		LegIK = cmds.listConnections(effector[0], source=False, type = 'ikHandle')
+	
+	NamePrefix = ShortName(JointsSelected[0])
+	if not Anim:
+		Anim = MakeShape('FootRoll_Anim_%s' % NamePrefix, 'circle', 6, (0, 1, 0))
+		cmds.matchTransform(Anim, JointsSelected[1], pivots=False, scale=False, rot=False, pos=True)
+		cmds.setAttr(Anim+'.translateY', 0)
+		Grp = cmds.group(name = Anim+'_grp', empty=True)
+		cmds.matchTransform(Grp, Anim, pivots=False, scale=False, rot=True, pos=True)
+		cmds.parent(Anim, Grp)
+	
+	AnimName = ShortName(Anim)
+	ParentFootGrp = cmds.group(name = NamePrefix+'_Roll_Parent_grp', empty=True)
+	cmds.matchTransform(ParentFootGrp, Joints[1], pivots=False, scale=False, rot=True, pos=True)
+	FootGrp = cmds.group(name = NamePrefix+'_Roll_grp', empty=True)
+	cmds.matchTransform(FootGrp, Joints[-1], pivots=False, scale=False, rot=True, pos=True)
+	ToeGrp = cmds.group(name = NamePrefix+'_FrontPivot_grp', empty=True)
+	cmds.matchTransform(ToeGrp, Joints[-1], pivots=False, scale=False, rot=True, pos=True)
+	HeelGrp = cmds.group(name = NamePrefix+'_BackPivot_grp', empty=True)
+	cmds.matchTransform(HeelGrp, Joints[0], pivots=False, scale=False, rot=True, pos=True)
+	
+	cmds.parent(HeelGrp, ToeGrp)
+	cmds.parent(ToeGrp, FootGrp)
+	cmds.parent(FootGrp, ParentFootGrp)
+
+	if len(Joints) == 2 or len(Joints) > 3:	
+			
+		cmds.addAttr(Anim, ln='FootRoll', at='float', dv=0, min=-60, max=60, k=True)
+		IKname = ShortName(Joints[1]) + '_ikHandle'
+		ToeIK = cmds.ikHandle(name=IKname, startJoint=Joints[0], endEffector=Joints[1], sol='ikSCsolver')
+		
+		cmds.parent(ToeIK[0], HeelGrp)
+		cmds.parent(LegIK, HeelGrp)
+		cmds.parentConstraint(Anim, ParentFootGrp, maintainOffset=True)
+		
+		if Expression:
+			FootRollExpression(NamePrefix, [
+				'%s.rotateY = -clamp(0, 60, %s.FootRoll);' % (HeelGrp, Anim),
+				'%s.rotateY = -clamp(-60, 0, %s.FootRoll);' % (ToeGrp, Anim),
+				], [HeelGrp, ToeGrp])
+		else:
+			#HEEL AND TOE, turned the other way to the roll
+			Clamp = FootRollClamp(Anim)
+			RollMD = cmds.createNode('multiplyDivide', skipSelect=True)
+			cmds.connectAttr(Clamp+'.outputR', RollMD+'.input1X')
+			cmds.connectAttr(Clamp+'.outputG', RollMD+'.input1Y')
+			cmds.setAttr(RollMD+'.input2X', -1)
+			cmds.setAttr(RollMD+'.input2Y', -1)
+			ConnectFootRollAttr(RollMD+'.outputX', HeelGrp)
+			ConnectFootRollAttr(RollMD+'.outputY', ToeGrp)
+		
+		print('Simple foot roll completed')
+		return Anim
+	elif len(Joints) == 3:
+			
+		cmds.addAttr(Anim, ln='FootRoll', at='float', dv=0, min=-60, max=60, k=True)
+		cmds.addAttr(Anim, ln='AnkleBend', at='float', dv=0, min=0, max=60, k=True)
+		cmds.addAttr(Anim, ln='ToeFlap', at='float', dv=0, min=-60, max=60, k=True)
+		IKname = ShortName(Joints[1]) + '_ikHandle'
+		AnkleBall = cmds.ikHandle(name=IKname, startJoint=Joints[0], endEffector=Joints[1], sol='ikSCsolver')
+		IKname = ShortName(Joints[2]) + '_ikHandle'
+		BallToe = cmds.ikHandle(name=IKname, startJoint=Joints[1], endEffector=Joints[2], sol='ikSCsolver')
+			
+		BallToeGrp = cmds.group(name = NamePrefix+'_BallToe_grp', empty=True)
+		cmds.matchTransform(BallToeGrp, Joints[1], pivots=False, scale=False, rot=True, pos=True)
+		LegGrp = cmds.group(name = NamePrefix+'_Leg_grp', empty=True)
+		cmds.matchTransform(LegGrp, Joints[1], pivots=False, scale=False, rot=True, pos=True)
+		
+		cmds.parent(BallToe[0], BallToeGrp)
+		cmds.parent(LegIK, LegGrp)
+		cmds.parent(BallToeGrp, HeelGrp)
+		cmds.parent(LegGrp, HeelGrp)
+		cmds.parent(AnkleBall[0], HeelGrp)
+		cmds.parentConstraint(Anim, ParentFootGrp, maintainOffset=True)
+		
+		if Expression:
+			FootRollExpression(NamePrefix, [
+				'float $Toe = clamp(-60, 0, %s.FootRoll);' % Anim,
+				'%s.rotateY = -0.5 * clamp(0, 60, %s.FootRoll);' % (HeelGrp, Anim),
+				'%s.rotateY = -$Toe;' % ToeGrp,
+				'%s.rotateY = %s.AnkleBend - 1.5 * $Toe;' % (LegGrp, Anim),
+				'%s.rotateY = -%s.ToeFlap;' % (BallToeGrp, Anim),
+				], [HeelGrp, ToeGrp, LegGrp, BallToeGrp])
+		else:
+			#HEEL, TOE AND TOE FLAP, turned the other way to the roll
+			Clamp = FootRollClamp(Anim)
+			RollMD = cmds.createNode('multiplyDivide', skipSelect=True)
+			cmds.connectAttr(Clamp+'.outputR', RollMD+'.input1X')
+			cmds.connectAttr(Clamp+'.outputG', RollMD+'.input1Y')
+			cmds.connectAttr(Anim+'.ToeFlap', RollMD+'.input1Z')
+			cmds.setAttr(RollMD+'.input2X', -0.5)
+			cmds.setAttr(RollMD+'.input2Y', -1)
+			cmds.setAttr(RollMD+'.input2Z', -1)
+
+			#LEG, the ankle bend less one and a half times the toe roll
+			LegBW = cmds.createNode('blendWeighted', skipSelect=True)
+			cmds.connectAttr(Clamp+'.outputG', LegBW+'.input[0]')
+			cmds.connectAttr(Anim+'.AnkleBend', LegBW+'.input[1]')
+			cmds.setAttr(LegBW+'.weight[0]', -1.5)
+			cmds.setAttr(LegBW+'.weight[1]', 1)
+
+			ConnectFootRollAttr(RollMD+'.outputX', HeelGrp)
+			ConnectFootRollAttr(RollMD+'.outputY', ToeGrp)
+			ConnectFootRollAttr(LegBW+'.output', LegGrp)
+			ConnectFootRollAttr(RollMD+'.outputZ', BallToeGrp)
+		
+		print('Foot roll completed')
+		return Anim
+
+	
+####################################################################################################
+
+def Flip(Joint):
+	""" turn Joint and everything under it 180 degrees about their own Y axes, one at a time, moving
+	the children out of the way of each turn. Works on any transforms """
+	Waiting = [Joint]
+	while Waiting:
+		Joint = Waiting.pop()
+		children = cmds.listRelatives(Joint, fullPath=True)
+		Grp = []
+		if children:
+			Grp = cmds.group(name = 'Temp_Flip_grp', empty=True)
+			for i in range(len(children)):
+				cmds.parent(children[i], Grp)
+		cmds.rotate(0, '180deg', 0, Joint, r=True, os=True)
+		if children:
+			children = cmds.listRelatives(Grp, fullPath=True)
+			for i in range(len(children)):
+				Child = cmds.parent(children[i], Joint)
+				Waiting.append(Child[0])
+			cmds.delete(Grp)
+
+def FlippedJoints(Top):
+	""" How to flip and freeze a hierarchy of only joints, worked out from all their world matrices at
+	once, to be set straight into jointOrient and translate with no reparenting: each joint with its
+	new jointOrient and translate. None when there is anything but joints under Top """
+	Below = cmds.listRelatives(Top, allDescendents=True, fullPath=True) or []
+	if cmds.nodeType(Top) != 'joint' or len(cmds.ls(Below, type='joint') or []) != len(Below):
+		return None
+	Joints = cmds.ls(Top, long=True) + Below
+	Index = dict((Joint, i) for i, Joint in enumerate(Joints))
+	Parents = [Index.get(Joint.rsplit('|', 1)[0], -1) for Joint in Joints]
+	TopParent = Joints[0].rsplit('|', 1)[0]
+	Worlds = ReadWorldMatrices(Joints + [TopParent] if TopParent else Joints)
+	Orients, Translates = FlippedLocals(Worlds[:len(Joints)], Parents, Worlds[-1] if TopParent else Identity)
+	return list(zip(Joints, Orients, Translates))
+
+def StartFlipJoints(*args):
+	selected = cmds.ls(sl=True,long=True) or []
+	RunChunked('flip joint orientations', FlipSteps(selected))
+
+def FlipSteps(Tops):
+	""" flip the joint orientations of each of Tops and everything under it, a joint at a time,
+	yielding the joints done and the total. A hierarchy with other nodes in it is one step """
+	Skeleton = GetSkeletonIndex()
+	Counts = [1 + Skeleton.CountDescendants(Top) for Top in Tops]
+	Total = sum(Counts)
+	Done = 0
+	for Top, Count in zip(Tops, Counts):
+		Flipped = FlippedJoints(Top)
+		if Flipped is None:
+			Flip(Top)
+			cmds.makeIdentity(Top, apply=True, t=False, r=True, s=False, n=False, pn=True)
+			Done += Count
+			yield Done, Total
+		else:
+			# what the flip and the preferred angles set is kept, so a cancelled flip leaves no joint
+			# half done. The top joint's new orient goes first, before anything under Top has changed,
+			# which is when a trace played again works them all out
+			Session.KeepValues([Joint+'.preferredAngle' for Joint, Orient, Translate in Flipped])
+			for Joint, Orient, Translate in Flipped:
+				Session.KeepValues([Joint+'.jointOrient', Joint+'.translate', Joint+'.rotate', Joint+'.rotateAxis'])
+				with Session.Derived('Flipped', Top, Joint, 0):
+					cmds.setAttr(Joint+'.jointOrient', *Orient)
+				with Session.Derived('Flipped', Top, Joint, 1):
+					cmds.setAttr(Joint+'.translate', *Translate)
+				cmds.setAttr(Joint+'.rotate', 0, 0, 0)
+				cmds.setAttr(Joint+'.rotateAxis', 0, 0, 0)
+				Done += 1
+				yield Done, Total
+		cmds.joint(Top, e=True, spa=True, ch=True)
+
+#--------------------------------------------------------------------------------------------------#
+# Building without the window
+
+Builds = {
+	'fk': StartFK,
+	'ik': StartIK,
+	'switch': StartSwitch,
+	'switches': StartSwitches,
+	'addtoswitch': AddToSwitch,
+	'twist': StartTwist,
+	'footroll': StartFootRoll,
+	'flip': StartFlipJoints,
+	}
+
+def RunBuild(Build, Selection, Settings=None):
+	""" run one of the window's builds from a script or a batch job: the nodes in Selection are
+	selected in order, as they would be by hand, and Settings stand in for the window's checkboxes.
+	The build runs straight through, since the Settings are only in place until this returns """
+	if Build not in Builds:
+		raise ValueError('unknown build %r, expected one of %s' % (Build, ', '.join(sorted(Builds))))
+	Previous = Session.Current.Options
+	Session.Current.Options = dict(Previous, **(Settings or {}))
+	Session.Current.Options['ChunkedBuilds'] = False
+	try:
+		if Selection:
+			cmds.select(Selection, replace=True)
+		else:
+			cmds.select(clear=True)
+		return Builds[Build](False)
+	finally:
+		Session.Current.Options = Previous
+
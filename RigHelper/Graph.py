@@ -0,0 +1,238 @@
+""" The two ways a build can make its nodes and connections: maya commands, one at a time, or one
+OpenMaya modifier that makes everything a build queued with a single doIt. The modifier is used when
+the Modifier option is on and OpenMaya is there, and both make the same nodes with the same names.
+A traced build makes them with commands, which is what its trace keeps """
+
+import os
+import maya.cmds as cmds
+
+try:
+	import maya.api.OpenMaya as om
+except ImportError: # mayapy without the API, or the benchmarks' stand-in
+	om = None
+
+from .Session import GetOption
+from . import Session
+from .Transforms import TransformCache
+from .Shapes import MakeShape, ShapeCurves
+
+PluginName = 'RigHelperModifier'
+PluginPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), PluginName+'.py')
+
+# modifiers waiting for the rigHelperModifier command to run them
+Pending = []
+
+def NewGraph():
+	""" the graph for a build to make its nodes in """
+	if GetOption('Modifier', False) and not Session.Current.Tracer and LoadModifierCommand():
+		return ModifierGraph()
+	return CommandGraph()
+
+def LoadModifierCommand():
+	""" load the plugin that runs modifiers as an undoable command. False when OpenMaya is not there """
+	if om is None:
+		return False
+	if not cmds.pluginInfo(PluginName, query=True, loaded=True):
+		cmds.loadPlugin(PluginPath, quiet=True)
+	return True
+
+class CommandGraph(object):
+	""" Makes nodes and connections with maya commands as they are asked for. Nodes are their names """
+
+	def __init__(self):
+		self.TopGroups = [] # the groups of the controls made with no parent
+		self.Transforms = TransformCache()
+		self.LinedUp = {} # the joint each control made was lined up with
+
+	def CreateNode(self, Type, Name=None):
+		if Name:
+			return cmds.createNode(Type, name=Name, skipSelect=True)
+		return cmds.createNode(Type, skipSelect=True)
+
+	def Connect(self, Source, SourceAttr, Destination, DestinationAttr):
+		cmds.connectAttr(Source+'.'+SourceAttr, Destination+'.'+DestinationAttr)
+
+	def Set(self, Node, Attr, Value):
+		cmds.setAttr(Node+'.'+Attr, Value)
+
+	def SetMatrix(self, Node, Attr, Values):
+		""" set a matrix attribute to 16 values, row by row """
+		cmds.setAttr(Node+'.'+Attr, Values, type='matrix')
+
+	def Control(self, Name, Joint, Parent=None):
+		""" a circle anim called Name in a Name_grp group, lined up with Joint and put under Parent.
+		Returns a list of the circle, like cmds.circle without history. The group is placed from the
+		transform cache in one local xform, and the circle goes under it where it is. A trace keeps
+		the placement as the joints it is between """
+		Local = self.Transforms.LocalPlacement(Joint, Parent)
+		NurbsCircle = [MakeShape(Name, 'circle', 5)]
+		if Parent:
+			Grp = cmds.group(empty=True, n=Name+'_grp', parent=Parent)
+		else:
+			Grp = cmds.group(empty=True, n=Name+'_grp')
+			self.TopGroups.append(Grp)
+		with Session.Derived('Placement', Joint, self.LinedUp.get(Parent, Parent)):
+			cmds.xform(Grp, matrix=Local)
+		cmds.parent(NurbsCircle[0], Grp, relative=True)
+		self.Transforms.Remember(NurbsCircle[0], self.Transforms.Placement(Joint))
+		self.LinedUp[NurbsCircle[0]] = Joint
+		return NurbsCircle
+
+	def Later(self, Function, *args):
+		""" run Function on args once the nodes in them exist, which they already do """
+		Function(*args)
+
+	def Name(self, Node):
+		return Node
+
+	def Finish(self):
+		pass
+
+class ModifierGraph(CommandGraph):
+	""" Queues nodes and connections in an MDagModifier, and makes them all in Finish. Nodes are
+	MObjects until then, or the names of nodes that were already in the scene """
+
+	def __init__(self):
+		CommandGraph.__init__(self)
+		self.Modifier = om.MDagModifier()
+		self.Waiting = []
+		self.Made = [] # for the registry, once they exist
+
+	def Find(self, Node):
+		if isinstance(Node, om.MObject):
+			return Node
+		Selection = om.MSelectionList()
+		Selection.add(Node)
+		return Selection.getDependNode(0)
+
+	def Plug(self, Node, Attr):
+		""" the plug for an attribute path like input3D[1].input3Dx """
+		Node = self.Find(Node)
+		Function = om.MFnDependencyNode(Node)
+		Plug = None
+		for Part in Attr.split('.'):
+			Name, Bracket, Index = Part.partition('[')
+			if Plug is None:
+				Plug = Function.findPlug(Name, False)
+			else:
+				Plug = Plug.child(Function.attribute(Name))
+			if Bracket:
+				Plug = Plug.elementByLogicalIndex(int(Index.rstrip(']')))
+		return Plug
+
+	def CreateNode(self, Type, Name=None):
+		# MDagModifier.createNode only makes DAG nodes, the DG version is called for the rest
+		Node = om.MDGModifier.createNode(self.Modifier, Type)
+		if Name:
+			self.Modifier.renameNode(Node, Name)
+		self.Made.append(Node)
+		return Node
+
+	def CreateDagNode(self, Type, Name=None, Parent=None):
+		""" a DAG node under Parent, or in the world """
+		Node = self.Modifier.createNode(Type, self.Find(Parent) if Parent is not None else om.MObject.kNullObj)
+		if Name:
+			self.Modifier.renameNode(Node, Name)
+		self.Made.append(Node)
+		return Node
+
+	def Curve(self, Name, Points, Degree, Knots, Periodic):
+		""" a curve with no history, as the curve command makes it: its transform and its shape """
+		Transform = self.CreateDagNode('transform', Name)
+		Shape = self.Modifier.createNode('nurbsCurve', Transform)
+		self.Modifier.renameNode(Shape, Name+'Shape')
+		self.Modifier.newPlugValue(self.Plug(Shape, 'cached'), self.CurveData(Points, Degree, Knots, Periodic))
+		return [Transform, Shape]
+
+	def Reparent(self, Node, Parent):
+		""" put Node under Parent, keeping its transform values as parent -relative does """
+		self.Modifier.reparentNode(self.Find(Node), self.Find(Parent))
+
+	def Connect(self, Source, SourceAttr, Destination, DestinationAttr):
+		self.Modifier.connect(self.Plug(Source, SourceAttr), self.Plug(Destination, DestinationAttr))
+
+	def Set(self, Node, Attr, Value):
+		self.SetPlug(self.Plug(Node, Attr), Value)
+
+	def SetPlug(self, Plug, Value):
+		Attribute = Plug.attribute()
+		if Attribute.hasFn(om.MFn.kEnumAttribute):
+			self.Modifier.newPlugValueInt(Plug, int(Value))
+		elif Attribute.hasFn(om.MFn.kNumericAttribute) and om.MFnNumericAttribute(Attribute).numericType() == om.MFnNumericData.kBoolean:
+			self.Modifier.newPlugValueBool(Plug, bool(Value))
+		else:
+			self.Modifier.newPlugValueDouble(Plug, float(Value))
+
+	def SetMatrix(self, Node, Attr, Values):
+		Data = om.MFnMatrixData().create(om.MMatrix(Values))
+		self.Modifier.newPlugValue(self.Plug(Node, Attr), Data)
+
+	def Key(self, Node):
+		""" what the transform cache knows a node by, nodes made in this graph are not named yet """
+		if isinstance(Node, om.MObject):
+			return om.MObjectHandle(Node).hashCode()
+		return Node
+
+	def Control(self, Name, Joint, Parent=None):
+		Local = om.MMatrix(self.Transforms.LocalPlacement(Joint, Parent and self.Key(Parent)))
+		ParentNode = om.MObject.kNullObj
+		if Parent:
+			ParentNode = self.Find(Parent)
+
+		Grp = self.Modifier.createNode('transform', ParentNode)
+		self.Modifier.renameNode(Grp, Name+'_grp')
+		self.Place(Grp, Local)
+
+		Circle = self.Modifier.createNode('transform', Grp)
+		self.Modifier.renameNode(Circle, Name)
+		self.Made += [Grp, Circle]
+		for Points, Degree, Knots, Periodic in ShapeCurves('circle', 5):
+			Shape = self.Modifier.createNode('nurbsCurve', Circle)
+			self.Modifier.renameNode(Shape, Name+'Shape')
+			self.Modifier.newPlugValue(self.Plug(Shape, 'cached'), self.CurveData(Points, Degree, Knots, Periodic))
+
+		self.Transforms.Remember(self.Key(Circle), self.Transforms.Placement(Joint))
+		if not Parent:
+			self.TopGroups.append(Grp)
+		return [Circle]
+
+	def Place(self, Node, Matrix):
+		""" set the translate, rotate and scale of a transform that has nothing else in its matrix, as
+		xform -matrix does """
+		Transform = om.MTransformationMatrix(om.MMatrix(Matrix))
+		Translation = Transform.translation(om.MSpace.kTransform)
+		Rotation = Transform.rotation()
+		Scale = Transform.scale(om.MSpace.kTransform)
+		for Axis, Translate, Rotate, Size in zip('XYZ', Translation, (Rotation.x, Rotation.y, Rotation.z), Scale):
+			self.Set(Node, 'translate'+Axis, Translate)
+			self.Set(Node, 'rotate'+Axis, Rotate)
+			if abs(Size - 1.0) > 1e-9:
+				self.Set(Node, 'scale'+Axis, Size)
+
+	def CurveData(self, Points, Degree, Knots, Periodic):
+		""" curve data for a shape with no history, as the curve command would make it """
+		Data = om.MFnNurbsCurveData().create()
+		Form = om.MFnNurbsCurve.kPeriodic if Periodic else om.MFnNurbsCurve.kOpen
+		om.MFnNurbsCurve().create([om.MPoint(Point) for Point in Points], Knots, Degree, Form, False, True, Data)
+		return Data
+
+	def Later(self, Function, *args):
+		self.Waiting.append((Function, args))
+
+	def Name(self, Node):
+		if not isinstance(Node, om.MObject):
+			return Node
+		if Node.hasFn(om.MFn.kDagNode):
+			return om.MFnDagNode(Node).partialPathName()
+		return om.MFnDependencyNode(Node).name()
+
+	def Finish(self):
+		""" make everything queued in one doIt, through the plugin command so it can be undone with
+		the rest of the build, then run what was waiting for the nodes """
+		Pending.append(self.Modifier)
+		cmds.rigHelperModifier()
+		if Session.Current.Recorder:
+			Session.Current.Recorder.Add(self.Made)
+		for Function, args in self.Waiting:
+			Function(*[self.Name(Arg) for Arg in args])
+		self.Waiting = []
@@ -0,0 +1,368 @@
+""" The joint hierarchy: an in-memory index of the skeleton, and the helpers the builders use to
+find joints in it """
+
+import maya.cmds as cmds
+
+from . import Session
+
+class NodeHandle(object):
+	""" A node kept by its UUID, which stays the same through renames and reparenting, and the short
+	name it had when the handle was made. Its long name is only worked out when something asks for
+	it: from the skeleton index for the joints it has handles for, which follows what the tool moves
+	and renames, and from the scene for anything else """
+	__slots__ = ('Uuid', 'Short')
+
+	def __init__(self, Uuid, Short):
+		self.Uuid = Uuid
+		self.Short = Short
+
+	def Path(self):
+		Skeleton = Session.Current.Skeleton
+		Path = Skeleton and Skeleton.PathOf(self)
+		if Path:
+			return Path
+		return (cmds.ls(self.Uuid, long=True) or [None])[0]
+
+	def __eq__(self, Other):
+		return isinstance(Other, NodeHandle) and Other.Uuid == self.Uuid
+
+	def __ne__(self, Other):
+		return not self == Other
+
+	def __hash__(self):
+		return hash(self.Uuid)
+
+	def __repr__(self):
+		return 'NodeHandle(%r, %r)' % (self.Uuid, self.Short)
+
+class SkeletonIndex(object):
+	""" In-memory copy of the joint hierarchy, read from the scene with a single ls call.
+	Joints are looked up by long or short name and answered without going back to the scene """
+
+	def __init__(self, Paths=None):
+		self.Names = {}
+		self.Parents = {}
+		self.Prefixes = {}
+		self.Children = {}
+		self.Paths = {}
+		self.Lookup = {}
+		self.ShortNames = {}
+		self.Roots = []
+		self.Order = None
+		self.Pre = {}
+		self.End = {}
+		self.Depths = {}
+		self.ByUuid = {}
+		self.NextId = 0
+		if Paths is None:
+			Paths = cmds.ls(type='joint', long=True, dag=True) or []
+		self.Add(Paths)
+
+	def Add(self, Paths):
+		""" add joints by long name, parents are attached before their children """
+		for path in sorted(Paths, key=lambda Path: Path.count('|')):
+			if path in self.Lookup:
+				continue
+			ParentPath, Name = path.rsplit('|', 1)
+			Id = self.NextId
+			self.NextId += 1
+			ParentId = self.Lookup.get(ParentPath)
+			self.Names[Id] = Name
+			self.Parents[Id] = ParentId
+			self.Children[Id] = []
+			if ParentId is None:
+				self.Prefixes[Id] = ParentPath
+				self.Roots.append(Id)
+			else:
+				self.Children[ParentId].append(Id)
+			self.Paths[Id] = path
+			self.Lookup[path] = Id
+			self.ShortNames.setdefault(Name, []).append(Id)
+		self.Order = None
+
+	def AddHierarchy(self, Joint):
+		""" add a joint and everything below it, eg after duplicating a whole hierarchy """
+		Paths = cmds.ls(Joint, long=True, type='joint') or []
+		if Paths:
+			Paths += cmds.listRelatives(Paths[0], fullPath=True, ad=True, type='joint') or []
+		self.Add(Paths)
+		return Paths[:1]
+
+	def Handles(self, Joints):
+		""" handles for joints, with their UUIDs read in one ls call """
+		Ids = [self.Find(Joint) for Joint in Joints]
+		Handles = []
+		for Id, Uuid in zip(Ids, cmds.ls([self.Paths[Id] for Id in Ids], uuid=True) if Ids else []):
+			self.ByUuid[Uuid] = Id
+			Handles.append(NodeHandle(Uuid, self.Names[Id]))
+		return Handles
+
+	def PathOf(self, Handle):
+		""" long name of a joint this index made a handle for, or None """
+		Id = self.ByUuid.get(Handle.Uuid)
+		if Id is None:
+			return None
+		return self.Paths[Id]
+
+	def Find(self, Joint):
+		""" internal id for a joint name, reading the scene again only if it names one joint the
+		index does not know. A name of more than one joint, like L_elbow under both an FK and an IK
+		chain, is None without reading the scene again """
+		if isinstance(Joint, (list, tuple)):
+			Joint = Joint[0]
+		Id = self.Lookup.get(Joint)
+		if Id is not None:
+			return Id
+		Id = self.FindShort(Joint)
+		if Id is not None:
+			return Id
+		Paths = cmds.ls(Joint, type='joint', long=True) or []
+		if len(Paths) != 1:
+			return None
+		if Paths[0] not in self.Lookup:
+			self.ReRead()
+		return self.Lookup.get(Paths[0])
+
+	def ReRead(self):
+		""" read the skeleton from the scene again, keeping the handles made for the joints still there """
+		Handles = dict((Uuid, self.Paths[Id]) for Uuid, Id in self.ByUuid.items())
+		self.__init__()
+		for Uuid, Path in Handles.items():
+			if Path in self.Lookup:
+				self.ByUuid[Uuid] = self.Lookup[Path]
+
+	def FindShort(self, Joint):
+		Matches = []
+		for Id in self.ShortNames.get(Joint.split('|')[-1], []):
+			if Joint.startswith('|') or ('|'+self.Paths[Id]).endswith('|'+Joint):
+				Matches.append(Id)
+		if len(Matches) == 1:
+			return Matches[0]
+		return None
+
+	def Resolve(self, Joint):
+		""" long name of a joint, or None if it is not a joint """
+		Id = self.Find(Joint)
+		if Id is None:
+			return None
+		return self.Paths[Id]
+
+	def ParentOf(self, Joint):
+		Id = self.Find(Joint)
+		if Id is None or self.Parents[Id] is None:
+			return None
+		return self.Paths[self.Parents[Id]]
+
+	def ChildrenOf(self, Joint):
+		Id = self.Find(Joint)
+		if Id is None:
+			return []
+		return [self.Paths[child] for child in self.Children[Id]]
+
+	def DepthOf(self, Joint):
+		""" number of joints above this one, -1 if it is not a joint """
+		Id = self.Find(Joint)
+		if Id is None:
+			return -1
+		self.BuildRanges()
+		return self.Depths[Id]
+
+	def Descendants(self, Joint):
+		""" every joint below this one, in hierarchy order """
+		Id = self.Find(Joint)
+		if Id is None:
+			return []
+		self.BuildRanges()
+		return [self.Paths[child] for child in self.Order[self.Pre[Id]+1:self.End[Id]+1]]
+
+	def CountDescendants(self, Joint):
+		Id = self.Find(Joint)
+		if Id is None:
+			return 0
+		self.BuildRanges()
+		return self.End[Id] - self.Pre[Id]
+
+	def OrderOf(self, Joint):
+		""" depth first position, parents always come before their children """
+		Id = self.Find(Joint)
+		if Id is None:
+			return -1
+		self.BuildRanges()
+		return self.Pre[Id]
+
+	def Chain(self, StartJoint, EndJoint):
+		""" the joints from StartJoint down to EndJoint, or None if EndJoint is not below StartJoint """
+		StartId = self.Find(StartJoint)
+		Id = self.Find(EndJoint)
+		Chain = []
+		while Id is not None:
+			Chain.append(self.Paths[Id])
+			if Id == StartId:
+				Chain.reverse()
+				return Chain
+			Id = self.Parents[Id]
+		return None
+
+	def IsDescendant(self, Joint, Ancestor):
+		""" True if Joint is anywhere below Ancestor """
+		Id = self.Find(Joint)
+		AncestorId = self.Find(Ancestor)
+		if Id is None or AncestorId is None:
+			return False
+		self.BuildRanges()
+		return self.Pre[AncestorId] < self.Pre[Id] <= self.End[AncestorId]
+
+	def BuildRanges(self):
+		""" number the joints depth first, so each joint's descendants are one range of that order """
+		if self.Order is not None:
+			return
+		self.Order = []
+		self.Pre = {}
+		self.Depths = {}
+		Stack = [(Id, 0) for Id in reversed(self.Roots)]
+		while Stack:
+			Id, Depth = Stack.pop()
+			self.Pre[Id] = len(self.Order)
+			self.Depths[Id] = Depth
+			self.Order.append(Id)
+			for child in reversed(self.Children[Id]):
+				Stack.append((child, Depth+1))
+		self.End = {}
+		for Id in reversed(self.Order):
+			if self.Children[Id]:
+				self.End[Id] = self.End[self.Children[Id][-1]]
+			else:
+				self.End[Id] = self.Pre[Id]
+
+	def Rename(self, Joint, NewName):
+		""" record a cmds.rename, NewName is the name returned by rename. Returns the new long name """
+		Id = self.Find(Joint)
+		if Id is None:
+			return NewName
+		self.ShortNames[self.Names[Id]].remove(Id)
+		self.Names[Id] = NewName.split('|')[-1]
+		self.ShortNames.setdefault(self.Names[Id], []).append(Id)
+		self.UpdatePaths(Id)
+		return self.Paths[Id]
+
+	def Reparent(self, Joint, NewParent, NewName=None):
+		""" record a cmds.parent, NewParent is None when the joint is moved to the world.
+		Returns the new long name """
+		Id = self.Find(Joint)
+		if Id is None:
+			return None
+		if self.Parents[Id] is None:
+			self.Roots.remove(Id)
+		else:
+			self.Children[self.Parents[Id]].remove(Id)
+		ParentId = None
+		if NewParent:
+			ParentId = self.Find(NewParent)
+		self.Parents[Id] = ParentId
+		if ParentId is None:
+			Prefix = ''
+			if NewParent:
+				Prefix = NewParent if NewParent.startswith('|') else cmds.ls(NewParent, long=True)[0]
+			self.Prefixes[Id] = Prefix
+			self.Roots.append(Id)
+		else:
+			self.Children[ParentId].append(Id)
+		if NewName:
+			self.ShortNames[self.Names[Id]].remove(Id)
+			self.Names[Id] = NewName.split('|')[-1]
+			self.ShortNames.setdefault(self.Names[Id], []).append(Id)
+		self.UpdatePaths(Id)
+		self.Order = None
+		return self.Paths[Id]
+
+	def UpdatePaths(self, Id):
+		""" recompute the long names of a joint and everything below it """
+		Stack = [Id]
+		while Stack:
+			Current = Stack.pop()
+			if self.Lookup.get(self.Paths[Current]) == Current:
+				del self.Lookup[self.Paths[Current]]
+			ParentId = self.Parents[Current]
+			if ParentId is None:
+				self.Paths[Current] = self.Prefixes[Current] + '|' + self.Names[Current]
+			else:
+				self.Paths[Current] = self.Paths[ParentId] + '|' + self.Names[Current]
+			self.Lookup[self.Paths[Current]] = Current
+			Stack.extend(self.Children[Current])
+
+def GetSkeletonIndex():
+	""" the skeleton index for the current operation, read from the scene on first use """
+	if Session.Current.Skeleton is None:
+		Session.Current.Skeleton = SkeletonIndex()
+	return Session.Current.Skeleton
+
+def ResetSkeletonIndex():
+	""" forget the cached skeleton, so the next operation reads the scene again """
+	Session.Current.Skeleton = None
+
+
+def FindChildren(Joint, JointList):
+	""" Build a list of all the joints below Joint, in hierarchy order """
+	Skeleton = GetSkeletonIndex()
+	if isinstance(Joint, str):
+		Joint = [Joint]
+	for current in list(Joint):
+		JointList.extend(Skeleton.Descendants(current))
+	return JointList
+    
+def GetCurrentSelection(type):
+	""" get the current scene selection filtered by type """
+	selected = cmds.ls(sl=True,long=True, type=type) or []
+	try:
+		selected.append(0)
+		selected.remove(0)
+	except:
+		string = selected
+		selected = []
+		selected[0] = string
+	return selected
+	
+def FindParentJoint(Joints):
+	Skeleton = GetSkeletonIndex()
+	CurrentBest = 0
+	CurrentHighScore = 0
+	for i in range(len(Joints)):
+		Children = Skeleton.CountDescendants(Joints[i])
+		if Children > CurrentHighScore:
+			CurrentBest = Joints[i]
+			CurrentHighScore = Children
+	return CurrentBest
+        
+def SortJointChain(Joints):
+	""" sorts a list of joints in a random order into hierarchhical order.
+	Branches come out one after another, in the order they are in the outliner """
+	Skeleton = GetSkeletonIndex()
+	return sorted(Joints, key=Skeleton.OrderOf)
+
+def ShortName(LongName):
+	""" the name of a node without the path above it. Takes a long name, a handle, or a list whose
+	first item is one, as the commands that make nodes return """
+	if isinstance(LongName, (list, tuple)):
+		LongName = LongName[0]
+	if isinstance(LongName, NodeHandle):
+		return LongName.Short
+	return LongName.split('|')[-1]
+	
+def FindMiddleJoints(Joints):
+	""" Given a start and end point of a joint chain, find the full chain. 
+	Used when duplicating chains for IK and FK switching """
+	Skeleton = GetSkeletonIndex()
+	Joints = SortJointChain(Joints)
+	StartJoint = Joints[0]
+	EndJoint = StartJoint
+	for current in Joints[1:]: #the deepest selected joint below the start, the first one on a tie
+		if Skeleton.DepthOf(current) > Skeleton.DepthOf(EndJoint) and Skeleton.IsDescendant(current, StartJoint):
+			EndJoint = current
+	
+	JointsToDuplicate = Skeleton.Chain(StartJoint, EndJoint)
+	OnChain = set(JointsToDuplicate)
+	for current in Joints:
+		if Skeleton.Resolve(current) not in OnChain:
+			print('%s is not on the chain from %s to %s, ignoring it' % (ShortName(current), ShortName(StartJoint), ShortName(EndJoint)))
+	return JointsToDuplicate
+	
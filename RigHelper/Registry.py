@@ -0,0 +1,146 @@
+""" What each build made, kept on a network node in the scene so it is saved with it. Each build's
+entry lists the UUIDs of the nodes it made, so one build, or everything the tool made, can be
+deleted without searching the scene, and a build that fails part way can take back what it made.
+
+The nodes are found as they are made: while a build runs, the tool's modules call maya through a
+CreationRecorder, which keeps the nodes returned by the commands that make them """
+
+import json
+import time
+import maya.cmds as cmds
+
+try:
+	import maya.api.OpenMaya as om
+except ImportError: # mayapy without the API, or the benchmarks' stand-in
+	om = None
+
+RegistryNode = 'RigHelperRegistry'
+
+# the commands that make nodes, which return the names of what they made
+CreatingCommands = ('createNode', 'group', 'curve', 'circle', 'nurbsSquare', 'sphere', 'duplicate',
+	'joint', 'ikHandle', 'expression', 'spaceLocator', 'shadingNode', 'parentConstraint',
+	'orientConstraint', 'pointConstraint', 'aimConstraint', 'scaleConstraint', 'poleVectorConstraint')
+
+class CreationRecorder(object):
+	""" Stands in for maya.cmds while a build runs, like the profiler. Commands that make nodes are
+	passed on and what they return is kept, as MObjectHandles when OpenMaya is there and as UUIDs
+	when not, so nodes renamed or moved later in the build are still known. Everything else is
+	maya.cmds' own function """
+
+	def __init__(self, Commands):
+		self.Commands = Commands
+		self.Created = []
+
+	def __getattr__(self, Command):
+		Function = getattr(self.Commands, Command)
+		if Command not in CreatingCommands:
+			setattr(self, Command, Function)
+			return Function
+		def Recorded(*args, **kwargs):
+			Result = Function(*args, **kwargs)
+			if Result and not any(Flag in kwargs for Flag in ('query', 'q', 'edit', 'e')):
+				self.Add([Result] if isinstance(Result, str) else Result)
+			return Result
+		setattr(self, Command, Recorded)
+		return Recorded
+
+	def Add(self, Nodes):
+		""" keep nodes made during the build, by name, or as MObjects made by a modifier """
+		if om is None:
+			self.Created += self.Commands.ls(Nodes, uuid=True) or []
+			return
+		for Node in Nodes:
+			if not isinstance(Node, om.MObject):
+				Selection = om.MSelectionList()
+				Selection.add(Node)
+				Node = Selection.getDependNode(0)
+			self.Created.append(om.MObjectHandle(Node))
+
+	def Uuids(self, Start=0):
+		""" the UUIDs of the nodes made since the Start'th, that are still there """
+		if om is None:
+			return self.Created[Start:]
+		return [om.MFnDependencyNode(Handle.object()).uuid().asString() for Handle in self.Created[Start:] if Handle.isValid()]
+
+#--------------------------------------------------------------------------------------------------#
+# The registry node
+
+def ReadRegistry():
+	""" every build recorded in the scene, oldest first, as dicts of operation, time and nodes """
+	if not cmds.objExists(RegistryNode):
+		return []
+	return json.loads(cmds.getAttr(RegistryNode+'.rigBuilds') or '[]')
+
+def WriteRegistry(Builds):
+	if not cmds.objExists(RegistryNode):
+		cmds.createNode('network', name=RegistryNode, skipSelect=True)
+		cmds.addAttr(RegistryNode, longName='rigBuilds', dataType='string')
+	cmds.setAttr(RegistryNode+'.rigBuilds', json.dumps(Builds), type='string')
+
+def RecordBuild(Name, Uuids):
+	""" add a finished build and the nodes it made to the registry """
+	if not Uuids:
+		return
+	Builds = ReadRegistry()
+	Builds.append({'operation': Name, 'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'nodes': Uuids})
+	WriteRegistry(Builds)
+
+#--------------------------------------------------------------------------------------------------#
+# Taking builds down
+
+def Existing(Uuids):
+	""" the long names of the nodes with these UUIDs that are still in the scene. ls is not asked
+	about no nodes, which would list them all """
+	return (Uuids and cmds.ls(Uuids, long=True)) or []
+
+def DeleteCreated(Nodes):
+	""" delete nodes a build made, given by long name. Only the top ones are deleted, which takes
+	the rest with them, and anything under them that they did not make, like the leg IK handle
+	under a foot roll, is moved to the world first """
+	Made = set(Nodes)
+	if not Nodes:
+		return 0
+	Roots = [Node for Node in Nodes if '|' not in Node or Node.rsplit('|', 1)[0] not in Made]
+	DagRoots = [Node for Node in Roots if '|' in Node]
+	Held = []
+	for Node in (DagRoots and cmds.listRelatives(DagRoots, allDescendents=True, fullPath=True, type='transform')) or []:
+		if Node not in Made and Node.rsplit('|', 1)[0] in Made:
+			Held.append(Node)
+	if Held:
+		cmds.parent(Held, world=True)
+	cmds.delete(Roots)
+	return len(Nodes)
+
+def RollBack(Recorder):
+	""" delete what a failed build made before it stopped """
+	return DeleteCreated(Existing(Recorder.Uuids()))
+
+def TearDownBuild(Index=-1):
+	""" delete what one recorded build made, the last one by default. Returns the build's entry,
+	or None when there are none """
+	Builds = ReadRegistry()
+	if not Builds:
+		return None
+	Build = Builds.pop(Index)
+	DeleteCreated(Existing(Build['nodes']))
+	WriteRegistry(Builds)
+	return Build
+
+def TearDownAll(WhiteList=()):
+	""" delete everything the tool made except the nodes in WhiteList, and the groups above them
+	so they stay where they are. Returns how many nodes were deleted """
+	Builds = ReadRegistry()
+	if not Builds:
+		return 0
+	Keep = set()
+	for Node in (WhiteList and cmds.ls(list(WhiteList), long=True)) or []:
+		Parts = Node.split('|')
+		Keep.update('|'.join(Parts[:i]) for i in range(2, len(Parts)+1))
+	Kept = set((Keep and cmds.ls(list(Keep), uuid=True)) or [])
+	Uuids = []
+	for Build in Builds:
+		Uuids += [Uuid for Uuid in Build['nodes'] if Uuid not in Kept]
+		Build['nodes'] = [Uuid for Uuid in Build['nodes'] if Uuid in Kept]
+	Deleted = DeleteCreated(Existing(Uuids))
+	WriteRegistry([Build for Build in Builds if Build['nodes']])
+	return Deleted
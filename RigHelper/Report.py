@@ -0,0 +1,342 @@
+""" What the tool has built in a scene, and what it costs to evaluate: node and connection counts and
+the longest chain of nodes that depend on each other, for each build and for the whole rig. Lint
+looks for what keeps Maya's parallel evaluation from helping, and FixRigProblems fixes what it can.
+
+	from RigHelper import Report
+	Report.PrintRigReport()
+
+Parallel evaluation schedules whole nodes, so two nodes that feed each other through any of their
+attributes are a cycle, and are evaluated together, one at a time, even when no attribute depends
+on itself. The parentMatrix and parentInverseMatrix of a node only depend on its parent, so they
+are counted as its parent's, settings like a joint's rotateOrder and jointOrient are left out, and
+a node under the node it drives, as a constraint is, is not counted as depending on it """
+
+import maya.cmds as cmds
+
+from .Graph import CommandGraph
+from .Builders import MatrixControlFK
+from .Session import RigOperation
+from .Registry import ReadRegistry, Existing
+from . import RigSpec
+
+# nodes connected to a build's nodes that belong to the build too
+UtilityTypes = ['blendColors', 'plusMinusAverage', 'multiplyDivide', 'clamp', 'blendWeighted', 'reverse',
+	'blendMatrix', 'multMatrix', 'pickMatrix', 'decomposeMatrix', 'expression', 'unitConversion',
+	'constraint', 'ikEffector', 'makeNurbCircle', 'makeNurbsSquare', 'makeNurbSphere']
+
+# utility nodes that do nothing unless something reads them
+ComputeTypes = ['blendColors', 'plusMinusAverage', 'multiplyDivide', 'clamp', 'blendWeighted', 'reverse',
+	'blendMatrix', 'multMatrix', 'pickMatrix', 'decomposeMatrix', 'unitConversion']
+
+ParentPlugs = ('parentMatrix', 'parentInverseMatrix')
+SettingPlugs = ('rotateOrder', 'jointOrient', 'rotateAxis', 'rotatePivot', 'rotatePivotTranslate',
+	'segmentScaleCompensate', 'scale', 'inverseScale')
+
+def ToolNodes():
+	""" the long names of the nodes each build made, by build. Builds from a rig spec are found by
+	their records, and builds from the window by the registry, under the name of their operation,
+	so renamed nodes are still found and the user's own nodes are left out whatever they are called """
+	Builds = {}
+	Claimed = set()
+	for Name, Record in sorted(RigSpec.ReadRigRecords().items()):
+		Builds[Name] = [Node for Node in Record['nodes'] if Node not in Claimed]
+		Claimed.update(Builds[Name] + [Record['record']])
+
+	Made = []
+	for Build in ReadRegistry():
+		Nodes = [Node for Node in Existing(Build['nodes']) if Node not in Claimed]
+		Claimed.update(Nodes)
+		Made.append((Build['operation'], Nodes))
+	for Name, Nodes in Made:
+		# the registry keeps what the commands returned: the shapes and joints made under those, and
+		# the nodes maya put between their connections, are the build's too
+		Below = (Nodes and cmds.listRelatives(Nodes, allDescendents=True, fullPath=True)) or []
+		Nodes = Nodes + [Node for Node in dict.fromkeys(Below) if Node not in Claimed]
+		Claimed.update(Nodes)
+		Frontier = Nodes
+		while Frontier:
+			Connected = cmds.listConnections(Frontier, shapes=True)
+			Frontier = [Node for Node in dict.fromkeys((Connected and cmds.ls(Connected, type=UtilityTypes, long=True)) or [])
+				if Node not in Claimed and Node not in Nodes]
+			Nodes += Frontier
+		if Nodes:
+			Builds.setdefault(Name, [])
+			Builds[Name] += Nodes
+			Claimed.update(Nodes)
+	return Builds
+
+#--------------------------------------------------------------------------------------------------#
+# The dependency graph of the tool's nodes
+
+def NodeTypes(Nodes):
+	""" long name to node type for each of Nodes """
+	if not Nodes:
+		return {}
+	Typed = cmds.ls(Nodes, long=True, showType=True) or []
+	return dict(zip(Typed[::2], Typed[1::2]))
+
+def LongNames(Names):
+	""" the long name of each of Names, which are the short names maya commands give """
+	Names = list(dict.fromkeys(Names))
+	if not Names:
+		return {}
+	return dict(zip(cmds.ls(Names), cmds.ls(Names, long=True)))
+
+def Connections(Nodes):
+	""" every connection into or out of Nodes as (source, source attr, destination, destination attr),
+	with long node names, leaving out message connections """
+	Found = set()
+	if not Nodes:
+		return []
+	Out = cmds.listConnections(Nodes, source=False, connections=True, plugs=True, shapes=True) or []
+	In = cmds.listConnections(Nodes, destination=False, connections=True, plugs=True, shapes=True) or []
+	Pairs = [(Out[i], Out[i+1]) for i in range(0, len(Out), 2)] + [(In[i+1], In[i]) for i in range(0, len(In), 2)]
+	Long = LongNames([Plug.split('.', 1)[0] for Pair in Pairs for Plug in Pair])
+	for Source, Destination in Pairs:
+		SourceNode, SourceAttr = Source.split('.', 1)
+		DestinationNode, DestinationAttr = Destination.split('.', 1)
+		if SourceAttr.startswith('message') or DestinationAttr.startswith('message'):
+			continue
+		Found.add((Long.get(SourceNode, SourceNode), SourceAttr, Long.get(DestinationNode, DestinationNode), DestinationAttr))
+	return sorted(Found)
+
+def DependencyGraph(Nodes, Edges):
+	""" node to the nodes that depend on it: through a connection, or as a child in the hierarchy """
+	Graph = dict((Node, set()) for Node in Nodes)
+	for Source, SourceAttr, Destination, DestinationAttr in Edges:
+		Attr = SourceAttr.split('[')[0]
+		if Attr in ParentPlugs:
+			Source = Source.rsplit('|', 1)[0]
+			if not Source:
+				continue
+		elif Attr.rstrip('XYZ') in SettingPlugs:
+			continue
+		Graph.setdefault(Source, set()).add(Destination)
+		Graph.setdefault(Destination, set())
+	for Node in list(Graph):
+		Parent = Node.rsplit('|', 1)[0]
+		if Parent in Graph and Parent not in Graph[Node]:
+			Graph[Parent].add(Node)
+	return Graph
+
+def StrongComponents(Graph):
+	""" the groups of nodes that all depend on each other, by Tarjan's method without recursion, so
+	deep chains do not run out of stack """
+	Index = {}
+	Low = {}
+	Stack = []
+	OnStack = set()
+	Components = []
+	for Start in Graph:
+		if Start in Index:
+			continue
+		Work = [(Start, iter(sorted(Graph[Start])))]
+		Index[Start] = Low[Start] = len(Index)
+		Stack.append(Start)
+		OnStack.add(Start)
+		while Work:
+			Node, Children = Work[-1]
+			for Child in Children:
+				if Child not in Index:
+					Index[Child] = Low[Child] = len(Index)
+					Stack.append(Child)
+					OnStack.add(Child)
+					Work.append((Child, iter(sorted(Graph[Child]))))
+					break
+				if Child in OnStack:
+					Low[Node] = min(Low[Node], Index[Child])
+			else:
+				Work.pop()
+				if Work:
+					Low[Work[-1][0]] = min(Low[Work[-1][0]], Low[Node])
+				if Low[Node] == Index[Node]:
+					Component = []
+					while True:
+						Member = Stack.pop()
+						OnStack.discard(Member)
+						Component.append(Member)
+						if Member == Node:
+							break
+					Components.append(Component)
+	return Components
+
+def LongestPath(Graph, Components):
+	""" the longest chain of nodes each waiting on the last, counting a cycle as all of its nodes """
+	Owner = {}
+	for i, Component in enumerate(Components):
+		for Node in Component:
+			Owner[Node] = i
+	# Tarjan finds a component after everything that depends on it, so those are already measured
+	Length = []
+	Next = []
+	for i, Component in enumerate(Components):
+		Longest, After = 0, None
+		for Node in Component:
+			for Child in Graph[Node]:
+				j = Owner[Child]
+				if j != i and Length[j] > Longest:
+					Longest, After = Length[j], j
+		Length.append(Longest + len(Component))
+		Next.append(After)
+	if not Components:
+		return 0, []
+	i = max(range(len(Components)), key=lambda i: Length[i])
+	Path = []
+	while i is not None:
+		Path += sorted(Components[i])
+		i = Next[i]
+	return len(Path), Path
+
+def GraphCost(Nodes, Edges):
+	""" node and connection counts, the longest dependency path and the cycles among Nodes """
+	Nodes = set(Nodes)
+	Touching = [Edge for Edge in Edges if Edge[0] in Nodes or Edge[2] in Nodes]
+	Graph = DependencyGraph(Nodes, Touching)
+	Components = StrongComponents(Graph)
+	Length, Path = LongestPath(Graph, Components)
+	return {
+		'nodes': len(Nodes),
+		'connections': len(Touching),
+		'longest': Length,
+		'path': Path,
+		'cycles': [sorted(Component) for Component in Components if len(Component) > 1],
+		}
+
+def RigCost(Builds=None):
+	""" the cost of each build, and of all of them together under 'total' """
+	if Builds is None:
+		Builds = ToolNodes()
+	Everything = [Node for Nodes in Builds.values() for Node in Nodes]
+	Edges = Connections(Everything)
+	Costs = dict((Name, GraphCost(Nodes, Edges)) for Name, Nodes in Builds.items())
+	Costs['total'] = GraphCost(Everything, Edges)
+	return Costs
+
+#--------------------------------------------------------------------------------------------------#
+# Lint, and the fixes for what it finds
+
+def ConstraintsToMatrix(Anim, Joint, Constraints):
+	""" swap the orient and point constraints from an FK anim for a matrix connection """
+	cmds.delete(Constraints)
+	Graph = CommandGraph()
+	MatrixControlFK(Graph, Anim, Joint)
+	Graph.Finish()
+
+def DeleteUnused(Node):
+	cmds.delete(Node)
+
+def LinedUp(A, B, Tolerance=1e-3):
+	""" whether two transforms are in the same place and turned the same way, ignoring scale """
+	MatrixA = cmds.xform(A, query=True, matrix=True, worldSpace=True)
+	MatrixB = cmds.xform(B, query=True, matrix=True, worldSpace=True)
+	for Row in range(4):
+		RowA, RowB = MatrixA[Row*4:Row*4+3], MatrixB[Row*4:Row*4+3]
+		if Row < 3:
+			LengthA = sum(Value*Value for Value in RowA) ** 0.5 or 1.0
+			LengthB = sum(Value*Value for Value in RowB) ** 0.5 or 1.0
+			RowA = [Value/LengthA for Value in RowA]
+			RowB = [Value/LengthB for Value in RowB]
+		if max(abs(a - b) for a, b in zip(RowA, RowB)) > Tolerance:
+			return False
+	return True
+
+def Lint(Builds=None):
+	""" what in the tool's nodes holds back parallel evaluation. Each problem is a dict with the rule,
+	the nodes, a message, and the fix as a function and its arguments, or None """
+	if Builds is None:
+		Builds = ToolNodes()
+	Everything = [Node for Nodes in Builds.values() for Node in Nodes]
+	Edges = Connections(Everything)
+	Types = NodeTypes(list(set(Everything + [Edge[2] for Edge in Edges])))
+	Problems = []
+
+	# cycles, which are only reported: breaking one, like the switch anim following the joint it
+	# blends, would change what the rig does
+	Graph = DependencyGraph(Everything, Edges)
+	for Component in StrongComponents(Graph):
+		if len(Component) < 2:
+			continue
+		Members = set(Component)
+		Follow = [Edge for Edge in Edges if Edge[2] in Members and Edge[3] == 'offsetParentMatrix' and Edge[0] in Members]
+		Message = '%d nodes depend on each other and are evaluated one at a time' % len(Component)
+		if Follow:
+			Message += ', %s follows a node it drives, left as it is' % Follow[0][2].split('|')[-1]
+		Problems.append({'rule': 'cycle', 'nodes': sorted(Component), 'message': Message, 'fix': None})
+
+	# an orient and a point constraint from the same FK anim, which one multMatrix can replace
+	Stacks = {}
+	Targets = {}
+	Reads = set()
+	for Source, SourceAttr, Destination, DestinationAttr in Edges:
+		if DestinationAttr.startswith('target['):
+			Targets.setdefault(Destination, set()).add(Source)
+		if SourceAttr.startswith('constraint'):
+			Stacks.setdefault(Destination, set()).add(Source)
+		if SourceAttr.startswith('rotate') and Types.get(Destination) in ('blendColors', 'blendMatrix'):
+			Reads.add(Source)
+	for Joint, Constraints in sorted(Stacks.items()):
+		Kinds = sorted(Types.get(Constraint) for Constraint in Constraints)
+		Anims = set(Target for Constraint in Constraints for Target in Targets.get(Constraint, ()))
+		if Kinds != ['orientConstraint', 'pointConstraint'] or len(Anims) != 1:
+			continue
+		Anim = Anims.pop()
+		Fix = None
+		Message = '%s is driven by two constraints from %s' % (Joint.split('|')[-1], Anim.split('|')[-1])
+		if Joint in Reads:
+			Message += ', left as they are because a switch blends its rotation'
+		elif not LinedUp(Anim, Joint):
+			Message += ', not fixed because the anim is not lined up with the joint'
+		else:
+			Fix = (ConstraintsToMatrix, [Anim, Joint, sorted(Constraints)])
+			Message += ', fixed with a multMatrix'
+		Problems.append({'rule': 'constraint stack', 'nodes': [Joint] + sorted(Constraints), 'message': Message, 'fix': Fix})
+
+	# utility nodes nothing reads
+	Read = set(Edge[0] for Edge in Edges)
+	for Node in Everything:
+		if Types.get(Node) in ComputeTypes and Node not in Read:
+			Problems.append({'rule': 'unused', 'nodes': [Node], 'fix': (DeleteUnused, [Node]),
+				'message': '%s is never read, fixed by deleting it' % Node.split('|')[-1]})
+	return Problems
+
+@RigOperation('fix rig problems')
+def FixRigProblems(*args):
+	""" fix everything Lint can, in one undo step. Returns the problems left """
+	Problems = Lint()
+	Fixed = 0
+	for Problem in Problems:
+		if Problem['fix'] and all(cmds.objExists(Node) for Node in Problem['nodes']):
+			Function, Arguments = Problem['fix']
+			Function(*Arguments)
+			Fixed += 1
+	Left = Lint()
+	print('Fixed %d rig problems, %d left' % (Fixed, len(Left)))
+	return Left
+
+#--------------------------------------------------------------------------------------------------#
+
+def RigReport(Top=5):
+	""" the cost report and the lint problems as text """
+	Builds = ToolNodes()
+	Costs = RigCost(Builds)
+	Lines = ['%-30s %7s %12s %8s' % ('build', 'nodes', 'connections', 'longest')]
+	for Name in sorted(Builds) + ['total']:
+		Cost = Costs[Name]
+		Lines.append('%-30s %7d %12d %8d' % (Name, Cost['nodes'], Cost['connections'], Cost['longest']))
+	Path = [Node.split('|')[-1] for Node in Costs['total']['path']]
+	if len(Path) > 2*Top:
+		Path = Path[:Top] + ['...'] + Path[-Top:]
+	Lines.append('longest path: ' + ' > '.join(Path))
+	Problems = Lint(Builds)
+	Lines.append('%d problems, %d can be fixed' % (len(Problems), len([Problem for Problem in Problems if Problem['fix']])))
+	for Problem in Problems:
+		Lines.append('\t%s: %s' % (Problem['rule'], Problem['message']))
+	return '\n'.join(Lines)
+
+def PrintRigReport(*args):
+	""" print the report, and show it in the window when it is open """
+	Text = RigReport()
+	print(Text)
+	if not cmds.about(batch=True) and cmds.scrollField('RigReport', exists=True):
+		cmds.scrollField('RigReport', edit=True, text=Text)
+	return Text
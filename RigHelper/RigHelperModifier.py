@@ -0,0 +1,35 @@
+""" A Maya plugin with one command, rigHelperModifier, which runs the OpenMaya modifier a build has
+queued in RigHelper.Graph. Changes made by a modifier from a script are not on the undo queue, made
+by a command they are, so the build still undoes in one step. RigHelper.Graph loads it when needed """
+
+import maya.api.OpenMaya as om
+
+maya_useNewAPI = True
+
+CommandName = 'rigHelperModifier'
+
+class ModifierCommand(om.MPxCommand):
+
+	def __init__(self):
+		om.MPxCommand.__init__(self)
+		self.Modifier = None
+
+	def doIt(self, args):
+		from RigHelper import Graph
+		self.Modifier = Graph.Pending.pop(0)
+		self.Modifier.doIt()
+
+	def redoIt(self):
+		self.Modifier.doIt()
+
+	def undoIt(self):
+		self.Modifier.undoIt()
+
+	def isUndoable(self):
+		return True
+
+def initializePlugin(Plugin):
+	om.MFnPlugin(Plugin).registerCommand(CommandName, ModifierCommand)
+
+def uninitializePlugin(Plugin):
+	om.MFnPlugin(Plugin).deregisterCommand(CommandName)
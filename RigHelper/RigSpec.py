@@ -0,0 +1,355 @@
+""" Building a whole character from a rig spec, and rebuilding only what changed """
+
+import hashlib
+import json
+import os
+import maya.cmds as cmds
+
+from .Hierarchy import GetSkeletonIndex, ResetSkeletonIndex, ShortName
+from .Session import BuildContext, RigOperation
+from .Builders import BuildFK, BuildIK, BuildSwitch, BuildAddToSwitch, BuildTwist, BuildFootRoll
+from .Registry import DeleteCreated, Existing
+from . import Session
+
+#--------------------------------------------------------------------------------------------------#
+# Building a whole character from a rig spec
+#
+# A rig spec lists the builds for a character by joint name, in the order they should run:
+#
+#	{"rig": [
+#		{"name": "L_arm", "builder": "switch", "root": "L_shoulder", "end": "L_wrist"},
+#		{"name": "L_leg", "builder": "ik", "root": "L_hip", "end": "L_ankle"},
+#		{"builder": "footroll", "root": "L_ankle", "end": "L_toe", "ik": "L_leg"},
+#		{"builder": "addtoswitch", "root": "L_index_01", "end": "L_index_03", "switch": "L_arm"},
+#		{"builder": "twist", "joints": ["L_elbow"]},
+#		{"builder": "fk", "root": "spine_01", "ignore_leaf": true}
+#	]}
+#
+# Joints are given as a root and end, a root alone for its whole hierarchy, or a list of joints.
+# fk and ik take "duplicate", fk takes "ignore_leaf" and "matrix", and switch and addtoswitch take
+# "blend_matrix", like the window's checkboxes. "ik" and "switch" name an earlier build, or a node
+# already in the scene, and footroll also takes "anim" and "expression". twist takes "segments",
+# the number of twist joints along each joint.
+
+SpecBuilders = ('fk', 'ik', 'switch', 'addtoswitch', 'twist', 'footroll')
+
+def LoadRigSpec(Path):
+	""" read a rig spec from a JSON or YAML file """
+	with open(Path) as File:
+		if os.path.splitext(Path)[1].lower() in ('.yaml', '.yml'):
+			try:
+				import yaml
+			except ImportError:
+				raise ValueError('PyYAML is needed to read %s, or save the spec as JSON' % Path)
+			Spec = yaml.safe_load(File)
+		else:
+			Spec = json.load(File)
+	if isinstance(Spec, list):
+		Spec = {'rig': Spec}
+	return Spec
+
+def SkeletonKey(Skeleton):
+	""" fingerprint of the joint hierarchy a plan was compiled against """
+	return hashlib.sha1('\n'.join(sorted(Skeleton.Lookup)).encode('utf-8')).hexdigest()
+
+def ResolveSpecJoint(Skeleton, Name, Label, Problems):
+	if '|' not in Name and len(Skeleton.ShortNames.get(Name, [])) > 1:
+		Problems.append('%s: more than one joint is called %s, give more of its path' % (Label, Name))
+		return None
+	Joint = Skeleton.Resolve(Name)
+	if Joint is None:
+		Problems.append('%s: there is no joint called %s' % (Label, Name))
+	return Joint
+
+def ResolveSpecJoints(Skeleton, Entry, Label, Problems):
+	""" the joints a spec entry names, and whether it named a single hierarchy by its root """
+	if 'joints' in Entry:
+		if not isinstance(Entry['joints'], list):
+			Problems.append('%s: joints should be a list of joint names' % Label)
+			return [], False
+		Joints = [ResolveSpecJoint(Skeleton, Name, Label, Problems) for Name in Entry['joints']]
+		return [Joint for Joint in Joints if Joint], False
+	if 'root' not in Entry:
+		Problems.append('%s: needs a root joint, or a list of joints' % Label)
+		return [], False
+	Root = ResolveSpecJoint(Skeleton, Entry['root'], Label, Problems)
+	if 'end' not in Entry or Root is None:
+		return [Root] if Root else [], True
+	End = ResolveSpecJoint(Skeleton, Entry['end'], Label, Problems)
+	if End is None:
+		return [], False
+	Chain = Skeleton.Chain(Root, End)
+	if Chain is None:
+		Problems.append('%s: %s is not below %s' % (Label, Entry['end'], Entry['root']))
+		return [], False
+	return Chain, False
+
+def SpecReference(Entry, Key, Builders, Steps, Label, Problems):
+	""" an earlier build named by the entry, or a node in the scene """
+	Name = Entry.get(Key)
+	if not Name:
+		return None
+	for Step in Steps:
+		if Step['name'] == Name:
+			if Step['builder'] not in Builders:
+				Problems.append('%s: %s is a %s build, %s needs one of %s' % (Label, Name, Step['builder'], Key, ', '.join(Builders)))
+			return {'step': Name}
+	if not cmds.ls(Name):
+		Problems.append('%s: %s is neither an earlier build nor a node in the scene' % (Label, Name))
+	return {'node': Name}
+
+def CompileRigSpec(Spec):
+	""" check a rig spec against the skeleton and turn it into a plan: the builds in order, with
+	every joint resolved to its long name. Nothing in the scene is changed. Plans are cached for
+	as long as the joint hierarchy stays the same """
+	if Session.Current.Depth == 0:
+		ResetSkeletonIndex()
+	Skeleton = GetSkeletonIndex()
+	Key = (json.dumps(Spec, sort_keys=True), SkeletonKey(Skeleton))
+	if Key in Session.Current.PlanCache:
+		return Session.Current.PlanCache[Key]
+
+	Entries = Spec.get('rig') if isinstance(Spec, dict) else None
+	if not isinstance(Entries, list):
+		raise ValueError('a rig spec needs a "rig" list of builds')
+	Problems = []
+	Steps = []
+	Driven = {}
+	for i, Entry in enumerate(Entries):
+		Label = 'build %d' % (i+1)
+		if not isinstance(Entry, dict) or Entry.get('builder') not in SpecBuilders:
+			Problems.append('%s: builder should be one of %s' % (Label, ', '.join(SpecBuilders)))
+			continue
+		Builder = Entry['builder']
+		Name = str(Entry.get('name', '%s%d' % (Builder, i+1)))
+		Label = '%s (%s)' % (Label, Name)
+		Joints, WholeHierarchy = ResolveSpecJoints(Skeleton, Entry, Label, Problems)
+		if not Joints:
+			continue
+		Step = {'name': Name, 'builder': Builder, 'joints': Joints, 'drives': []}
+		Duplicate = bool(Entry.get('duplicate', False))
+
+		if Builder == 'fk':
+			Step['duplicate'] = Duplicate
+			Step['selected_only'] = not WholeHierarchy
+			Step['ignore_leaf'] = bool(Entry.get('ignore_leaf', False))
+			if Entry.get('matrix'): # left out otherwise, so rigs built before it keep their fingerprints
+				Step['matrix'] = True
+			if not Duplicate:
+				Controlled = Joints
+				if WholeHierarchy:
+					Controlled = Joints + [Joint for Joint in Skeleton.Descendants(Joints[0])
+						if Skeleton.ChildrenOf(Joint) or not Step['ignore_leaf']]
+				for Joint in Controlled:
+					Step['drives'] += [Joint+'.rotate', Joint+'.translate']
+		elif Builder in ('ik', 'switch'):
+			if len(Joints) != 3:
+				Problems.append('%s: %s needs a chain of three joints, not %d' % (Label, Builder, len(Joints)))
+				continue
+			Step['joints'] = [Joints[0], Joints[-1]]
+			if Builder == 'ik':
+				Step['duplicate'] = Duplicate
+			if Builder == 'switch' or not Duplicate:
+				Step['drives'] = [Joint+'.rotate' for Joint in Joints]
+			if Builder == 'switch' and Entry.get('blend_matrix'):
+				Step['blend_matrix'] = True
+		elif Builder == 'addtoswitch':
+			Step['switch'] = SpecReference(Entry, 'switch', ('switch',), Steps, Label, Problems)
+			if Step['switch'] is None:
+				Problems.append('%s: needs the switch to add to' % Label)
+			Step['joints'] = [Joints[0], Joints[-1]]
+			Step['drives'] = [Joint+'.rotate' for Joint in Joints]
+			if Entry.get('blend_matrix'):
+				Step['blend_matrix'] = True
+		elif Builder == 'twist':
+			Segments = Entry.get('segments', 1)
+			if not isinstance(Segments, int) or Segments < 1:
+				Problems.append('%s: segments should be a whole number of twist joints, not %r' % (Label, Segments))
+			elif Segments > 1: # left out otherwise, like matrix
+				Step['segments'] = Segments
+		elif Builder == 'footroll':
+			Step['ik'] = SpecReference(Entry, 'ik', ('ik', 'switch'), Steps, Label, Problems)
+			if Step['ik'] is None:
+				for Earlier in Steps:
+					if Earlier['builder'] == 'ik' and not Earlier['duplicate'] and Earlier['joints'][-1] == Joints[0]:
+						Step['ik'] = {'step': Earlier['name']}
+				if Step['ik'] is None and not cmds.listConnections(Joints[0], source=False, type='ikEffector'):
+					Problems.append('%s: there is no IK handle on %s, name one with "ik"' % (Label, ShortName(Joints[0])))
+			Step['anim'] = Entry.get('anim') or 0
+			if Entry.get('expression'):
+				Step['expression'] = True
+			if Step['anim'] and not cmds.ls(Step['anim']):
+				Problems.append('%s: there is no anim called %s' % (Label, Step['anim']))
+			if len(Joints) > 1:
+				Step['joints'] = [Joints[0], Joints[-1]]
+			LegIK = list((Step['ik'] or {'ankle': Joints[0]}).values())[0]
+			Step['drives'] = [LegIK+'.parent']
+
+		if any(Step['name'] == Earlier['name'] for Earlier in Steps):
+			Problems.append('%s: there is already a build called %s' % (Label, Step['name']))
+		for Plug in Step['drives']:
+			if Plug in Driven:
+				Problems.append('%s: %s is already driven by %s' % (Label, ShortName(Plug), Driven[Plug]))
+			Driven[Plug] = Name
+		Steps.append(Step)
+
+	if Problems:
+		raise ValueError('the rig spec has %d problems:\n\t%s' % (len(Problems), '\n\t'.join(Problems)))
+	Plan = {'skeleton': Key[1], 'steps': Steps}
+	Session.Current.PlanCache[Key] = Plan
+	return Plan
+
+@RigOperation('build rig')
+def ExecuteRigPlan(Plan, Rebuild=False):
+	""" run the builds in a compiled plan, as one undo step. A build already in the scene from the
+	same joints and options is kept, others are torn down and built again, or everything is with
+	Rebuild. Returns what each build made, by name """
+	Skeleton = GetSkeletonIndex()
+	if Plan['skeleton'] != SkeletonKey(Skeleton):
+		raise ValueError('the joints have changed since the rig plan was compiled')
+	Records = ReadRigRecords()
+	Later = set(Step['name'] for Step in Plan['steps'])
+	for Name in list(Records):
+		if Name not in Later:
+			TearDownStep(Records.pop(Name))
+			ResetSkeletonIndex()
+	Owners = {}
+	for Name in Records:
+		for Node in Records[Name]['nodes']:
+			Owners[Node] = Name
+
+	Made = {}
+	Fingerprints = {}
+	Kept = 0
+	for Step in Plan['steps']:
+		Name = Step['name']
+		Later.discard(Name)
+		Fingerprints[Name] = StepFingerprint(Step, GetSkeletonIndex(), Fingerprints, Owners, Later)
+		Record = Records.get(Name)
+		if Record and Record['fingerprint'] == Fingerprints[Name] and not Rebuild:
+			Made[Name] = Record['made']
+			Kept += 1
+			continue
+		if Record:
+			TearDownStep(Record)
+			ResetSkeletonIndex()
+		First = len(Session.Current.Recorder.Created)
+		Made[Name] = RunPlanStep(Step, Made)
+		Created = Existing(Session.Current.Recorder.Uuids(First))
+		RecordStep(Step, Fingerprints[Name], Created, Made[Name])
+		for Node in Created:
+			Owners[Node] = Name
+	print('Rig built, %d builds made and %d unchanged' % (len(Plan['steps'])-Kept, Kept))
+	return Made
+
+def RunPlanStep(Step, Made):
+	Builder = Step['builder']
+	Joints = Step['joints']
+	if Builder == 'fk':
+		return BuildFK(Joints, Step['duplicate'], Step['selected_only'], Step['ignore_leaf'], Step.get('matrix', False))
+	elif Builder == 'ik':
+		return BuildIK(Joints, Step['duplicate'])
+	elif Builder == 'switch':
+		return BuildSwitch(Joints, Step.get('blend_matrix', False))
+	elif Builder == 'addtoswitch':
+		return BuildAddToSwitch(Joints, PlanNode(Step['switch'], Made, 1), Step.get('blend_matrix', False))
+	elif Builder == 'twist':
+		return BuildTwist(Joints, Step.get('segments', 1))
+	elif Builder == 'footroll':
+		LegIK = PlanNode(Step['ik'], Made, 2) if Step['ik'] else None
+		return BuildFootRoll(Joints, LegIK, Step['anim'], Step.get('expression', False))
+
+def PlanNode(Reference, Made, Index):
+	""" the node a plan step refers to: something an earlier build returned, or a scene node """
+	if 'node' in Reference:
+		return Reference['node']
+	return Made[Reference['step']][Index]
+
+def BuildRig(Spec, Rebuild=False):
+	""" build a whole character from a rig spec, or the path of one, in a single undo step.
+	Running it again only rebuilds what the changes to the joints or the spec affect """
+	if not isinstance(Spec, dict):
+		Spec = LoadRigSpec(Spec)
+	with BuildContext('build rig'):
+		return ExecuteRigPlan(CompileRigSpec(Spec), Rebuild)
+
+#--------------------------------------------------------------------------------------------------#
+# Keeping track of what each build of a rig spec made
+#
+# Every build gets a network node, RigStep_<name>, holding a fingerprint of what it was built
+# from and message connections to every node it made, so it can be torn down on its own
+
+def StepInputs(Step, Skeleton):
+	""" every joint a build reads """
+	Joints = Step['joints']
+	if Step['builder'] == 'fk' and not Step['selected_only'] or Step['builder'] == 'footroll' and len(Joints) == 1:
+		return Joints[:1] + Skeleton.Descendants(Joints[0])
+	if Step['builder'] == 'fk':
+		return list(Joints)
+	if Step['builder'] == 'twist':
+		Inputs = []
+		for Joint in Joints:
+			Inputs += [Joint] + Skeleton.ChildrenOf(Joint)[:1]
+		return Inputs
+	return Skeleton.Chain(Joints[0], Joints[-1]) or list(Joints)
+
+def StepFingerprint(Step, Skeleton, Fingerprints, Owners, Later):
+	""" hash of everything a build depends on: its options, the names, hierarchy and rest transforms
+	of its joints, and the fingerprints of the builds it uses or whose joints it reads.
+	Joints made by builds later in the plan are left out, they were not there the first time """
+	Data = [Step['builder']]
+	for Key in ('duplicate', 'selected_only', 'ignore_leaf', 'matrix', 'blend_matrix', 'anim', 'expression', 'segments'):
+		if Key in Step:
+			Data.append([Key, Step[Key]])
+	for Key in ('ik', 'switch'):
+		Reference = Step.get(Key)
+		if Reference:
+			Data.append([Key, Fingerprints.get(Reference.get('step')) or Reference.get('node')])
+	for Joint in StepInputs(Step, Skeleton):
+		Owner = Owners.get(Joint)
+		if Owner in Later:
+			continue
+		Rest = cmds.getAttr(Joint+'.translate')[0] + cmds.getAttr(Joint+'.jointOrient')[0]
+		Data.append([Joint, Fingerprints.get(Owner), [round(Value, 4) for Value in Rest]])
+	return hashlib.sha1(json.dumps(Data).encode('utf-8')).hexdigest()
+
+def RecordStep(Step, Fingerprint, Created, Made):
+	""" make the record of a build: its fingerprint, the nodes it made, and the switch anim and
+	IK handle it returned, for later builds to use """
+	Record = cmds.createNode('network', name='RigStep_'+''.join(c if c.isalnum() else '_' for c in Step['name']), skipSelect=True)
+	cmds.addAttr(Record, longName='rigStep', dataType='string')
+	cmds.setAttr(Record+'.rigStep', Step['name'], type='string')
+	cmds.addAttr(Record, longName='rigFingerprint', dataType='string')
+	cmds.setAttr(Record+'.rigFingerprint', Fingerprint, type='string')
+	cmds.addAttr(Record, longName='rigNodes', attributeType='message', multi=True)
+	cmds.addAttr(Record, longName='rigMade', attributeType='message', multi=True)
+	for i, Node in enumerate(Created):
+		cmds.connectAttr(Node+'.message', '%s.rigNodes[%d]' % (Record, i))
+	if isinstance(Made, tuple):
+		for i in (1, 2):
+			if isinstance(Made[i], str):
+				cmds.connectAttr(Made[i]+'.message', '%s.rigMade[%d]' % (Record, i))
+	return Record
+
+def ReadRigRecords():
+	""" the record of every build in the scene, by build name """
+	Records = {}
+	for Record in cmds.ls('RigStep_*', type='network') or []:
+		if not cmds.attributeQuery('rigFingerprint', node=Record, exists=True):
+			continue
+		Nodes = cmds.listConnections(Record+'.rigNodes', source=True, destination=False, shapes=True) or []
+		Made = [None, None, None]
+		for i in (1, 2):
+			Made[i] = (cmds.listConnections('%s.rigMade[%d]' % (Record, i), source=True, destination=False) or [None])[0]
+		Records[cmds.getAttr(Record+'.rigStep')] = {
+			'record': Record,
+			'fingerprint': cmds.getAttr(Record+'.rigFingerprint'),
+			'nodes': cmds.ls(Nodes, long=True) or [],
+			'made': tuple(Made),
+			}
+	return Records
+
+def TearDownStep(Record):
+	""" delete everything a build made, and its record """
+	DeleteCreated(Record['nodes'])
+	cmds.delete(Record['record'])
@@ -0,0 +1,517 @@
+""" What the Rig Helper keeps between builds, and the context every build runs in: one undo step,
+performance mode, the build options, the profiler and the record of what each build made. Long
+builds run a chunk at a time from the idle queue, with a progress bar and a cancel button, and a
+build can be traced to play it again on another skeleton """
+
+import contextlib
+import functools
+import getpass
+import json
+import os
+import re
+import socket
+import sys
+import time
+import maya.cmds as cmds
+
+from .Registry import CreatingCommands, CreationRecorder, RecordBuild, RollBack
+
+class Session(object):
+	""" Everything the tool remembers during a Maya session. Reloading the tool starts a new one """
+
+	def __init__(self):
+		self.Skeleton = None
+		self.Depth = 0
+		self.BuildTimes = {}
+		self.Options = {}
+		self.PlanCache = {}
+		self.WhiteList = []
+		self.Resizing = None # the resize slider drag in progress
+		self.Shapes = None # the control shape library, read on first use
+		self.Recorder = None # what the build running now has made
+		self.Chunked = None # the build running from the idle queue, if one is
+		self.Restore = None # the values the build running now has set, as they were, when it is chunked
+		self.Tracer = None # the trace of the build running now, when builds are traced
+		self.Traces = [] # the traces of the builds made since the tool was loaded, oldest first
+		self.ProfileLog = os.environ.get('RIG_HELPER_PROFILE_LOG')
+
+Current = Session()
+
+def GetOption(Name, Default):
+	""" value of a build option: set by a batch job, or the checkbox or slider in the window, or the
+	default when neither is there """
+	if Name in Current.Options:
+		return Current.Options[Name]
+	if not cmds.about(batch=True):
+		if cmds.checkBox(Name, exists=True):
+			return cmds.checkBox(Name, query=True, value=True)
+		if cmds.intSliderGrp(Name, exists=True):
+			return cmds.intSliderGrp(Name, query=True, value=True)
+	return Default
+
+class BuildCancelled(Exception):
+	""" thrown into a chunked build when it is cancelled, to roll it back like a failed one """
+
+@contextlib.contextmanager
+def BuildContext(Name, Chunked=False):
+	""" Runs a build as a single undo step, leaving the selection as it was. In performance mode the
+	viewport does not refresh and the evaluation manager is in DG mode until the build finishes, or fails.
+	A Chunked build keeps the viewport refreshing, since it is drawn between the chunks.
+	The nodes the build makes are added to the scene's registry, or deleted again if it fails, when
+	the values it kept with KeepValues are put back too """
+	Current.Depth += 1
+	Outer = Current.Depth == 1
+	Fast = Outer and GetOption('PerfMode', True)
+	Suspend = Fast and not Chunked
+	EvaluationMode = None
+	Profiler = None
+	Recorder = None
+	Tracer = None
+	Failed = False
+	Selection = None
+	Start = time.perf_counter()
+	if Outer:
+		Recorder = StartRecording()
+		Current.Restore = []
+		if GetOption('TraceBuilds', False):
+			Tracer = StartTracing()
+		if GetOption('Profile', False):
+			Profiler = StartProfiling()
+		Current.Skeleton = None
+		Selection = cmds.ls(selection=True, uuid=True) or []
+		cmds.undoInfo(openChunk=True, chunkName='Rig Helper: '+Name)
+	try:
+		if Fast:
+			if Suspend:
+				cmds.refresh(suspend=True)
+			if GetOption('PauseEvaluation', True):
+				EvaluationMode = (cmds.evaluationManager(query=True, mode=True) or ['off'])[0]
+				if EvaluationMode != 'off':
+					cmds.evaluationManager(mode='off')
+		yield
+	except BuildCancelled:
+		Failed = 'cancelled'
+		raise
+	except:
+		Failed = 'failed'
+		raise
+	finally:
+		Current.Depth -= 1
+		if Outer:
+			try:
+				if Tracer:
+					# the registry and the selection being put back are not part of the build
+					Tracer.Active = False
+					if not Failed and Tracer.Entries:
+						Current.Traces.append(Tracer.Trace(Name))
+				if Failed:
+					Report = '%s %s, deleted the %d nodes it made' % (Name, Failed, RollBack(Recorder))
+					if Current.Restore:
+						Report += ' and put back the %d values it set' % PutBack(Current.Restore)
+					print(Report)
+				else:
+					RecordBuild(Name, Recorder.Uuids())
+				RestoreSelection(Selection)
+				if EvaluationMode and EvaluationMode != 'off':
+					cmds.evaluationManager(mode=EvaluationMode)
+				if Suspend:
+					cmds.refresh(suspend=False)
+			finally:
+				try:
+					cmds.undoInfo(closeChunk=True)
+				finally:
+					if Profiler:
+						StopProfiling(Profiler)
+					if Tracer:
+						StopTracing(Tracer)
+					StopRecording(Recorder)
+					Current.Restore = None
+	if Outer:
+		ReportBuildTime(Name, Fast, time.perf_counter() - Start)
+		if Profiler:
+			ReportProfile(Name, Profiler, time.perf_counter() - Start)
+
+def KeepValues(Plugs):
+	""" keep what Plugs are set to before a chunked build sets them, so they are put back if it is
+	cancelled or fails part way. A build run in one go is one undo step, which takes it all back """
+	if Current.Chunked is not None and Current.Restore is not None:
+		Current.Restore += [(Plug, cmds.getAttr(Plug)[0]) for Plug in Plugs]
+
+def PutBack(Values):
+	""" set the values KeepValues kept again, the last first, returning how many there were """
+	for Plug, Value in reversed(Values):
+		cmds.setAttr(Plug, *Value)
+	return len(Values)
+
+def RestoreSelection(Selection):
+	""" select again what was selected before a build, as far as it still exists, when the build
+	has changed the selection. Selection is a list of UUIDs, so renamed nodes are still found """
+	if (cmds.ls(selection=True, uuid=True) or []) == Selection:
+		return
+	Nodes = cmds.ls(Selection, long=True) if Selection else []
+	if Nodes:
+		cmds.select(Nodes, replace=True)
+	else:
+		cmds.select(clear=True)
+
+def RigOperation(Name):
+	""" decorator for the tool's entry points, running them inside BuildContext. They do nothing
+	while a chunked build is waiting for its next chunk """
+	def Decorate(Function):
+		@functools.wraps(Function)
+		def Build(*args, **kwargs):
+			if Busy():
+				return None
+			with BuildContext(Name):
+				return Function(*args, **kwargs)
+		return Build
+	return Decorate
+
+def ReportBuildTime(Name, Fast, Seconds):
+	""" print how long a build took, against the last build of the same kind in the other mode """
+	Current.BuildTimes[(Name, Fast)] = Seconds
+	Report = '%s took %.2fs' % (Name, Seconds)
+	Other = Current.BuildTimes.get((Name, not Fast))
+	if Fast and Other is not None:
+		Report += ', %.2fs without performance mode last time (%.2fs saved)' % (Other, Other - Seconds)
+	elif Other is not None:
+		Report += ', %.2fs in performance mode last time' % Other
+	print(Report)
+	if not cmds.about(batch=True) and cmds.text('BuildTime', exists=True):
+		cmds.text('BuildTime', edit=True, label=Report)
+
+#--------------------------------------------------------------------------------------------------#
+# Long builds, run a chunk at a time from the idle queue
+
+class ChunkedBuild(object):
+	""" A build run from maya's idle queue, so the window and the viewport keep going while it works.
+	Work is a generator that does the build a joint at a time, yielding the joints done and the total
+	after each one. Every idle call runs it for Joints joints, shows how far it has got and queues the
+	next call. Chunks are a number of joints rather than a time, so a build is cut the same way, and
+	makes the same calls, on any machine. It is in BuildContext from the first chunk to the last, so
+	it is still one undo step, and cancelling it deletes what it had made like a failed build """
+
+	Joints = 50 # joints built between redraws
+
+	def __init__(self, Name, Work):
+		self.Name = Name
+		self.Work = Work
+		self.Context = None
+		self.Running = False # in a chunk, rather than waiting for the next one
+		self.Cancelled = False
+		self.Done = 0
+		self.Total = 0
+
+	def Start(self):
+		self.Context = BuildContext(self.Name, Chunked=True)
+		self.Context.__enter__()
+		Current.Chunked = self
+		self.ShowProgress(True)
+		cmds.evalDeferred(self.Step, lowestPriority=True)
+
+	def Step(self):
+		if Current.Chunked is not self:
+			return
+		if self.Cancelled:
+			self.End(BuildCancelled(self.Name+' was cancelled'))
+			return
+		self.Running = True
+		try:
+			for Joint in range(self.Joints):
+				self.Done, self.Total = next(self.Work)
+		except StopIteration:
+			self.Running = False
+			self.End(None)
+			return
+		except Exception as Error:
+			self.Running = False
+			self.End(Error)
+			raise
+		self.Running = False
+		self.ShowProgress(True)
+		cmds.evalDeferred(self.Step, lowestPriority=True)
+
+	def Cancel(self):
+		""" stop before the next chunk, and delete what the build has made """
+		self.Cancelled = True
+
+	def End(self, Error):
+		""" leave BuildContext, which records the build, or rolls it back when there is an Error """
+		Current.Chunked = None
+		self.ShowProgress(False)
+		if Error is None:
+			self.Context.__exit__(None, None, None)
+		else:
+			self.Work.close()
+			self.Context.__exit__(type(Error), Error, Error.__traceback__)
+
+	def ShowProgress(self, Running):
+		if cmds.about(batch=True):
+			return
+		if cmds.progressBar('BuildProgress', exists=True):
+			cmds.progressBar('BuildProgress', edit=True, maxValue=max(self.Total, 1), progress=self.Done if Running else 0)
+		if cmds.button('CancelBuild', exists=True):
+			cmds.button('CancelBuild', edit=True, enable=Running)
+		if Running and cmds.text('BuildTime', exists=True):
+			cmds.text('BuildTime', edit=True, label='%s: %d of %d joints' % (self.Name, self.Done, self.Total))
+
+def RunChunked(Name, Work):
+	""" run a build's Work generator as a ChunkedBuild, or in one go in batch, inside another build,
+	or when "Long builds in chunks" is off. Returns the ChunkedBuild, or None once it has run """
+	if Busy():
+		return None
+	if cmds.about(batch=True) or Current.Depth or not GetOption('ChunkedBuilds', True):
+		with BuildContext(Name):
+			for Progress in Work:
+				pass
+		return None
+	Build = ChunkedBuild(Name, Work)
+	Build.Start()
+	return Build
+
+def Busy():
+	""" True, saying so, while a chunked build is waiting for its next chunk """
+	if Current.Chunked and not Current.Chunked.Running:
+		print('%s is still running, let it finish or cancel it first' % Current.Chunked.Name)
+		return True
+	return False
+
+#--------------------------------------------------------------------------------------------------#
+# Profiling the cmds calls a build makes, when Profile is ticked
+
+class CommandProfiler(object):
+	""" Stands in for maya.cmds while a build is profiled. Every command is passed on to maya.cmds,
+	and counted and timed against the tool function that called it """
+
+	def __init__(self, Commands):
+		self.Commands = Commands
+		self.Calls = {}
+
+	def __getattr__(self, Command):
+		Function = getattr(self.Commands, Command)
+		if not callable(Function):
+			return Function
+		Calls = self.Calls
+		def Profiled(*args, **kwargs):
+			Code = sys._getframe(1).f_code
+			Start = time.perf_counter()
+			try:
+				return Function(*args, **kwargs)
+			finally:
+				Seconds = time.perf_counter() - Start
+				Caller = getattr(Code, 'co_qualname', Code.co_name)
+				Entry = Calls.get((Caller, Command))
+				if Entry is None:
+					Entry = Calls[(Caller, Command)] = [0, 0.0]
+				Entry[0] += 1
+				Entry[1] += Seconds
+		# kept on the profiler, so each command is only looked up once
+		setattr(self, Command, Profiled)
+		return Profiled
+
+#--------------------------------------------------------------------------------------------------#
+# Recording the nodes a build makes
+
+def StartRecording():
+	""" send the tool's cmds calls through a CreationRecorder until StopRecording. It goes in
+	before the profiler, which then profiles through it """
+	Recorder = CreationRecorder(cmds)
+	for Module in ToolModules():
+		if getattr(Module, 'cmds', None) is Recorder.Commands:
+			Module.cmds = Recorder
+	Current.Recorder = Recorder
+	return Recorder
+
+def StopRecording(Recorder):
+	Current.Recorder = None
+	for Module in ToolModules():
+		if getattr(Module, 'cmds', None) is Recorder:
+			Module.cmds = Recorder.Commands
+
+def ToolModules():
+	""" the modules of this package that are loaded """
+	Package = __name__.rpartition('.')[0]
+	return [Module for Name, Module in list(sys.modules.items()) if Module and Name.startswith(Package+'.')]
+
+def StartProfiling():
+	""" send the tool's cmds calls through a CommandProfiler until StopProfiling """
+	Profiler = CommandProfiler(cmds)
+	for Module in ToolModules():
+		if getattr(Module, 'cmds', None) is Profiler.Commands:
+			Module.cmds = Profiler
+	return Profiler
+
+def StopProfiling(Profiler):
+	for Module in ToolModules():
+		if getattr(Module, 'cmds', None) is Profiler:
+			Module.cmds = Profiler.Commands
+
+def ReportProfile(Name, Profiler, Seconds, Top=15):
+	""" show where a profiled build's time went, in the window and the output, and add it to the
+	profile log """
+	Commands = {}
+	Callers = {}
+	for (Caller, Command), (Count, Time) in Profiler.Calls.items():
+		Total = Commands.setdefault(Command, [0, 0.0])
+		Total[0] += Count
+		Total[1] += Time
+		Callers.setdefault(Caller, {})[Command] = [Count, round(Time, 6)]
+	Calls = sum(Count for Count, Time in Commands.values())
+	Time = sum(Time for Count, Time in Commands.values())
+	Lines = ['%s: %d cmds calls taking %.3fs of %.3fs' % (Name, Calls, Time, Seconds)]
+	for (Caller, Command), (Count, CallTime) in sorted(Profiler.Calls.items(), key=lambda Item: -Item[1][1])[:Top]:
+		Lines.append('%8.3fs %7d  %-20s %s' % (CallTime, Count, Command, Caller))
+	Report = '\n'.join(Lines)
+	print(Report)
+	if not cmds.about(batch=True) and cmds.scrollField('ProfileReport', exists=True):
+		cmds.scrollField('ProfileReport', edit=True, text=Report)
+
+	Record = {
+		'operation': Name,
+		'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+		'seconds': round(Seconds, 6),
+		'user': getpass.getuser(),
+		'host': socket.gethostname(),
+		'maya': cmds.about(version=True),
+		'scene': cmds.file(query=True, sceneName=True),
+		'calls': Calls,
+		'commands': dict((Command, [Count, round(CallTime, 6)]) for Command, (Count, CallTime) in Commands.items()),
+		'callers': Callers,
+		}
+	Path = Current.ProfileLog or os.path.join(cmds.internalVar(userAppDir=True), 'RigHelperProfile.jsonl')
+	try:
+		with open(Path, 'a') as File:
+			File.write(json.dumps(Record, sort_keys=True)+'\n')
+	except (IOError, OSError) as Error:
+		print('could not write the profile log %s: %s' % (Path, Error))
+
+
+#--------------------------------------------------------------------------------------------------#
+# Tracing the commands a build changes the scene with, when "Record build traces" is ticked
+
+# the commands that change the scene, which a trace keeps
+ChangingCommands = CreatingCommands + ('setAttr', 'connectAttr', 'disconnectAttr', 'addAttr', 'deleteAttr',
+	'parent', 'rename', 'delete', 'xform', 'matchTransform', 'makeIdentity', 'rotate', 'move', 'scale',
+	'select', 'setKeyframe')
+# after these a name can be of another node, or of none. An empty group moves nothing
+PathCommands = ('parent', 'rename', 'delete', 'group')
+# the commands that make nodes under the ones they return, like a curve's shape, which are numbered too
+ParentingCommands = ('curve', 'circle', 'sphere', 'nurbsSquare', 'spaceLocator', 'duplicate')
+# flags given names to make, types or text, rather than nodes
+TextFlags = frozenset(('name', 'n', 'type', 'typ', 'attributeType', 'at', 'dataType', 'dt', 'longName', 'ln',
+	'shortName', 'sn', 'niceName', 'nn', 'enumName', 'en', 'string', 's', 'solver', 'sol'))
+NodeName = re.compile(r'^[\w:|]+$')
+
+class TraceRecorder(object):
+	""" Stands in for maya.cmds while a build is traced, like the profiler. The commands that change
+	the scene are passed on and kept in order, with each node in their arguments given as the number
+	of the node the build made, or the long name of a node that was already there. Queries are not
+	kept: the numbers a build worked out from the skeleton are kept as how it did, given by Derived """
+
+	def __init__(self, Commands):
+		self.Commands = Commands
+		self.Active = True
+		self.Entries = []
+		self.Made = {} # the number of each node made, by UUID
+		self.Known = {} # what names were found to be, until a command moves or renames something
+		self.Recipe = None # how the numbers of the commands run now were worked out, inside Derived
+
+	def __getattr__(self, Command):
+		Function = getattr(self.Commands, Command)
+		if Command not in ChangingCommands:
+			setattr(self, Command, Function)
+			return Function
+		def Traced(*args, **kwargs):
+			if not self.Active or kwargs.get('query') or kwargs.get('q'):
+				return Function(*args, **kwargs)
+			if Command == 'rename' and args:
+				# the new name is text
+				Arguments = self.Encode(args[:-1]) + [args[-1]]
+			else:
+				Arguments = self.Encode(args)
+			Flags = dict((Flag, Value if Flag in TextFlags else self.Encode(Value)) for Flag, Value in kwargs.items())
+			Result = Function(*args, **kwargs)
+			Entry = [Command, Arguments, Flags]
+			if Command in PathCommands and (Command != 'group' or args):
+				self.Known = {}
+			if Result and Command in CreatingCommands and not (kwargs.get('edit') or kwargs.get('e')):
+				self.Number(Command, [Result] if isinstance(Result, str) else Result)
+				Entry.append(len(self.Made))
+			elif self.Recipe:
+				Entry.append(self.Recipe)
+			self.Entries.append(Entry)
+			return Result
+		setattr(self, Command, Traced)
+		return Traced
+
+	def Encode(self, Value):
+		""" arguments with the node and plug names in them swapped for references to the nodes """
+		if isinstance(Value, (list, tuple)):
+			return [self.Encode(Item) for Item in Value]
+		if not isinstance(Value, str):
+			return Value
+		Reference = self.Known.get(Value)
+		if Reference is None:
+			Reference = self.Find(Value)
+			if Reference is None:
+				return Value
+			self.Known[Value] = Reference
+		return Reference
+
+	def Find(self, Name):
+		""" {'made': number} or {'node': long name}, with the 'attr' of a plug, or None for text """
+		Node, Dot, Attr = Name.partition('.')
+		Uuids = (NodeName.match(Node) and self.Commands.ls(Node, uuid=True)) or []
+		if len(Uuids) != 1:
+			return None
+		if Uuids[0] in self.Made:
+			Reference = {'made': self.Made[Uuids[0]]}
+		else:
+			Reference = {'node': self.Commands.ls(Uuids[0], long=True)[0]}
+		if Dot:
+			Reference['attr'] = Attr
+		return Reference
+
+	def Number(self, Command, Nodes):
+		""" number the nodes a command made, then anything made under them, from one ls of them and
+		everything below. A duplicated chain is in both """
+		Uuids = [self.Commands.ls(Node, uuid=True)[0] for Node in Nodes]
+		if Command in ParentingCommands:
+			Uuids += self.Commands.ls(Nodes, dag=True, uuid=True) or []
+		for Uuid in Uuids:
+			if Uuid not in self.Made:
+				self.Made[Uuid] = len(self.Made)
+
+	def Trace(self, Name):
+		return {'operation': Name, 'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commands': self.Entries}
+
+@contextlib.contextmanager
+def Derived(Kind, *From):
+	""" the numbers given to the commands run inside were worked out from the nodes in From the way
+	Kind says, one of Trace.Replay's Derivations. A traced build keeps that in place of the numbers,
+	so playing the trace on another skeleton works them out again from its joints """
+	Tracer = Current.Tracer
+	if Tracer is None or not Tracer.Active:
+		yield
+		return
+	Tracer.Recipe = {'derived': Kind, 'from': Tracer.Encode(From)}
+	try:
+		yield
+	finally:
+		Tracer.Recipe = None
+
+def StartTracing():
+	""" send the tool's cmds calls through a TraceRecorder until StopTracing. It goes in after the
+	recorder and before the profiler """
+	Tracer = TraceRecorder(cmds)
+	for Module in ToolModules():
+		if getattr(Module, 'cmds', None) is Tracer.Commands:
+			Module.cmds = Tracer
+	Current.Tracer = Tracer
+	return Tracer
+
+def StopTracing(Tracer):
+	Current.Tracer = None
+	for Module in ToolModules():
+		if getattr(Module, 'cmds', None) is Tracer:
+			Module.cmds = Tracer.Commands
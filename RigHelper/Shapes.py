@@ -0,0 +1,72 @@
+""" The control shape library. Each shape is a list of curves, each with its degree, its points and
+whether it is periodic, drawn a unit in size facing down X. The shapes are read from Shapes.json
+beside this module, then from any files listed in RIG_HELPER_SHAPES, so a studio can add its own
+shapes or replace these. A control is made with one curve command for each of its curves and has
+no construction history:
+
+	{"name": [{"degree": 3, "periodic": true, "points": [[x, y, z], ...]}, ...]}
+
+Periodic curves list each point once, the curve command is given the first ones again to close it.
+Open curves can give their own "knots", otherwise they are spread evenly and clamped at the ends """
+
+import json
+import os
+import maya.cmds as cmds
+
+from . import Session
+
+LibraryPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Shapes.json')
+
+def LoadShapes():
+	""" every shape in the library, read on first use in a session """
+	if Session.Current.Shapes is None:
+		Shapes = {}
+		Paths = [LibraryPath] + [Path for Path in os.environ.get('RIG_HELPER_SHAPES', '').split(os.pathsep) if Path]
+		for Path in Paths:
+			with open(Path) as File:
+				Found = json.load(File)
+			for Name, Curves in Found.items():
+				for Curve in Curves:
+					if len(Curve.get('points', [])) <= Curve.get('degree', 0):
+						raise ValueError('%s: the shape %r needs more points than its degree' % (Path, Name))
+			Shapes.update(Found)
+		Session.Current.Shapes = Shapes
+	return Session.Current.Shapes
+
+def ShapeCurves(Shape, Size=1.0, Normal=(1, 0, 0)):
+	""" the curves of a shape scaled to Size and turned to face the Normal axis, as (points, degree,
+	knots, periodic) for the curve command """
+	Shapes = LoadShapes()
+	if Shape not in Shapes:
+		raise ValueError('unknown control shape %r, expected one of %s' % (Shape, ', '.join(sorted(Shapes))))
+	# a turn that takes X to the normal's axis and keeps the points' handedness
+	Axis = max(range(3), key=lambda i: abs(Normal[i]))
+	Curves = []
+	for Curve in Shapes[Shape]:
+		Degree = Curve['degree']
+		Points = [[Point[(i - Axis) % 3] * Size for i in range(3)] for Point in Curve['points']]
+		Periodic = bool(Curve.get('periodic'))
+		if Periodic:
+			Points += Points[:Degree]
+			Knots = list(range(1 - Degree, len(Points)))
+		else:
+			Knots = Curve.get('knots')
+			if Knots is None:
+				Spans = len(Points) - Degree
+				Knots = [0] * (Degree - 1) + list(range(Spans + 1)) + [Spans] * (Degree - 1)
+		Curves.append((Points, Degree, Knots, Periodic))
+	return Curves
+
+def MakeShape(Name, Shape, Size=1.0, Normal=(1, 0, 0)):
+	""" a control called Name drawn as Shape. Returns its transform """
+	Control = None
+	for Index, (Points, Degree, Knots, Periodic) in enumerate(ShapeCurves(Shape, Size, Normal)):
+		Curve = cmds.curve(name=Name, degree=Degree, point=Points, knot=Knots, periodic=Periodic)
+		if Control is None:
+			Control = Curve
+			continue
+		# the other curves are shapes under the first one's transform, numbered after its own shape
+		Moved = cmds.parent(cmds.listRelatives(Curve, shapes=True, fullPath=True), Control, shape=True, relative=True)
+		cmds.delete(Curve)
+		cmds.rename(Moved[0], '%sShape%d' % (Control.split('|')[-1], Index))
+	return Control
@@ -0,0 +1,582 @@
+""" Build traces: the commands a traced build changed the scene with, played again on another
+skeleton with the same joints under other names. Playing a trace does none of the finding and
+sorting of joints the build did, only its commands.
+
+Tick "Record build traces" and build as usual, then save the traces of the builds to a file:
+
+	{"traces": [{"operation": "generate FK", "time": ..., "commands": [[command, args, flags, made], ...]}]}
+
+A node in the arguments is {"made": n}, the n'th node the build made, or {"node": long name} for a
+node that was already there, like a joint, with the "attr" of a plug. A creating command ends with
+how many nodes the build had made after it, which replaying checks. A name map from the traced
+skeleton's names to the other one's swaps whole names in those long names, and in the names and
+text the build gave, so FK_L_arm is made as FK_Left_arm:
+
+	{"L_arm": "Left_arm", "L_elbow": "Left_elbow"}
+
+A command given numbers the build worked out from the skeleton, like where a control goes or a
+twist joint's translate, ends with how instead, {"derived": way, "from": [nodes and numbers]}, one
+of the Derivations of Replay. Its numbers are worked out that way again from the other skeleton,
+so the controls line up with its joints whatever its proportions. matchTransform is worked out
+again by maya.
+
+With OpenMaya the nodes, connections and values a trace makes are queued in one modifier, and
+made with a single command each time a command that cannot be queued, like a constraint, comes
+next. Without it every command is run as it was traced """
+
+import bisect
+import json
+import re
+import maya.cmds as cmds
+
+try:
+	import maya.api.OpenMaya as om
+except ImportError: # mayapy without the API, or the benchmarks' stand-in
+	om = None
+
+from .Session import RigOperation, PathCommands, ParentingCommands
+from .Hierarchy import GetSkeletonIndex, ResetSkeletonIndex, ShortName
+from .Graph import ModifierGraph, LoadModifierCommand
+from .Transforms import TransformCache, RestOffset
+from .Builders import FlippedJoints
+from . import Session
+
+# the ways a traced build works out numbers from the skeleton, each a method of Replay
+Derivations = ('Placement', 'Offset', 'Attr', 'RestOffset', 'Flipped')
+
+# where a whole name can start in a string, and where it can end: before anything but a small
+# letter or a number, and before a capital unless the name ends in one too, as in L_armShape
+NameStarts = re.compile('(?<![A-Za-z0-9])')
+NameEnds = re.compile('(?![a-z0-9])(?<![A-Z](?=[A-Z]))')
+
+def NameMapper(NameMap):
+	""" a function swapping the names in NameMap for their new names in a string, where they are
+	whole names. The string is cut where names can start and end, and from each start the pieces up
+	to each end no further than the longest name are looked up, longer first, so a trace's
+	thousands of names cost no more than a few. What each string became is kept, as a trace gives
+	the same names over and over, and a long name is swapped a node at a time, as long names share
+	the nodes above them """
+	if not NameMap:
+		return lambda Text: Text
+	Longest = max(len(Name) for Name in NameMap)
+	ByNode = not any('|' in Name for Name in NameMap)
+	Swapped = {}
+	def Rename(Text):
+		if Text in Swapped:
+			return Swapped[Text]
+		if ByNode and '|' in Text:
+			Swapped[Text] = '|'.join(Rename(Node) for Node in Text.split('|'))
+			return Swapped[Text]
+		Ends = [Match.start() for Match in NameEnds.finditer(Text)]
+		Parts = []
+		Done = 0
+		for Match in NameStarts.finditer(Text):
+			Start = Match.start()
+			if Start < Done:
+				continue
+			for End in reversed(Ends[bisect.bisect_right(Ends, Start):bisect.bisect_right(Ends, Start+Longest)]):
+				if Text[Start:End] in NameMap:
+					Parts += [Text[Done:Start], NameMap[Text[Start:End]]]
+					Done = End
+					break
+		Swapped[Text] = ''.join(Parts) + Text[Done:]
+		return Swapped[Text]
+	return Rename
+
+class NameCache(object):
+	""" The names of UUIDs, without the API: what the commands making the nodes called them, or ls
+	found. When a command renames, moves or deletes a node, the names going through its old name
+	are worked out again from its new one, and the ones that cannot be are forgotten, found through
+	the parts of the names rather than by going through them all """
+
+	def __init__(self):
+		self.Names = {}
+		self.Through = {} # the UUIDs whose names have a short name above their own, by it
+		self.Ending = {} # the UUIDs whose names end in a short name, by it
+
+	def get(self, Handle):
+		return self.Names.get(Handle)
+
+	def Set(self, Handle, Name):
+		""" Handle is called Name, which makes any other node called by its short name alone ambiguous """
+		Parts = Name.split('|')
+		for Other in self.Ending.get(Parts[-1], ()):
+			Called = self.Names.get(Other)
+			if Other != Handle and Called and not Called.startswith('|') and ShortName(Called) == Parts[-1]:
+				del self.Names[Other]
+		self.Names[Handle] = Name
+		for Part in Parts[:-1]:
+			if Part:
+				self.Through.setdefault(Part, set()).add(Handle)
+		self.Ending.setdefault(Parts[-1], set()).add(Handle)
+
+	def Move(self, Handle, Old, New=None, Path=None):
+		""" the node called Old is now called New, with the long name Path when that is known, or
+		was deleted or moved somewhere not known when New is None """
+		Short = ShortName(Old)
+		for Other in self.Through.pop(Short, set()) | self.Ending.pop(Short, set()):
+			Name = self.Names.get(Other)
+			if Name is None or Other == Handle:
+				continue
+			if Path and Old.startswith('|') and Name.startswith(Old+'|'):
+				self.Set(Other, Path + Name[len(Old):])
+			elif ShortName(Name) == Short or ('|'+Short+'|') in ('|'+Name):
+				del self.Names[Other]
+		self.Names.pop(Handle, None)
+		if New:
+			self.Set(Handle, New)
+
+class Replay(object):
+	""" One playing of traces. The nodes it makes are kept as MObjectHandles when OpenMaya is there
+	and as UUIDs when not, like the registry's recorder, so they are found again after being renamed
+	or moved. The nodes that were there are found once for each trace, before it changes anything,
+	and the joints its placements are worked out from are read in one pass then """
+
+	def __init__(self, NameMap=None):
+		self.Rename = NameMapper(NameMap)
+		self.Made = [] # the nodes the trace playing now has made, by number
+		self.Found = {} # the nodes that were there, by their name in the trace
+		self.Names = NameCache() # the names of the nodes, by UUID without the API
+		self.Transforms = TransformCache() # the world matrices of the trace playing now
+		self.Flips = {} # the joints each flipped top joint has under it, with how they flip
+		self.Graph = None # the modifier commands are queued in, with OpenMaya
+		self.Used = set() # the numbers of the made nodes the trace playing now uses
+		self.Queued = set() # the nodes made in it, by hash code
+		self.Waiting = 0 # how many commands are queued in it
+		self.DagTypes = {}
+		if Session.Current.Tracer is None and LoadModifierCommand():
+			self.Graph = ModifierGraph()
+
+	def Play(self, Trace):
+		self.Made = []
+		self.Transforms = TransformCache()
+		self.Flips = {}
+		Entries = Trace['commands']
+		Names = []
+		self.Used = set()
+		References([Entry[1:] for Entry in Entries], Names, self.Used)
+		self.FindNodes(Names)
+		Placed = []
+		for Entry in Entries:
+			if len(Entry) > 3 and isinstance(Entry[3], dict) and Entry[3]['derived'] in ('Placement', 'Offset'):
+				Placed += [Value for Value in Entry[3]['from'] if isinstance(Value, dict) and 'node' in Value]
+		self.Transforms.Fetch(self.Decode(Placed))
+		for Entry in Entries:
+			Command, Arguments, Flags = Entry[:3]
+			if len(Entry) > 3 and isinstance(Entry[3], dict):
+				Arguments, Flags = self.Derive(Entry[3], Arguments, Flags)
+			if not self.Queue(Command, Arguments, Flags):
+				self.Flush()
+				self.Run(Command, Arguments, Flags, Entry[3] if len(Entry) > 3 and not isinstance(Entry[3], dict) else None)
+			if len(Entry) > 3 and not isinstance(Entry[3], dict) and len(self.Made) != Entry[3]:
+				raise ValueError('%s made %d nodes where the traced build had made %d, the trace of %s does not fit this skeleton'
+					% (Command, len(self.Made), Entry[3], Trace['operation']))
+		self.Flush()
+
+	def Run(self, Command, Arguments, Flags, Count=None):
+		""" run a traced command, numbering what it made when it made something, up to Count """
+		Start = len(Session.Current.Recorder.Created)
+		Moving = []
+		if om is None and Command in PathCommands and (Command != 'group' or Arguments):
+			Moving = self.Nodes(Arguments)
+			Moving = list(zip(Moving, [self.NameOf(Handle) for Handle in Moving]))
+		Result = getattr(cmds, Command)(*self.Decode(Arguments), **dict((Flag, self.Decode(Value)) for Flag, Value in Flags.items()))
+		if Moving:
+			self.Moved(Command, Arguments, Flags, Moving, Result)
+		if Count is not None:
+			self.Number(Command, [Result] if isinstance(Result, str) else Result or [], Start, Count)
+
+	def Moved(self, Command, Arguments, Flags, Moving, Result):
+		""" keep the names of the nodes right after a command renamed, moved or deleted the handles
+		and old names in Moving. rename and parent return the new names of what they renamed and
+		moved, which are their names from now on, and give their long names under the old parent or
+		the new one for the names of the nodes under them """
+		Parent = None
+		if Command == 'parent' and not (Flags.get('world') or Flags.get('w')):
+			Parent = Moving.pop()[1] if IsNode(Arguments[-1]) else self.Decode(Arguments[-1])
+		Results = [Result] if isinstance(Result, str) else Result or []
+		if Command not in ('rename', 'parent') or len(Results) != len(Moving):
+			Results = [None] * len(Moving)
+		for (Handle, Old), New in zip(Moving, Results):
+			Path = None
+			if New is None:
+				pass
+			elif Command == 'parent' and (Parent is None or Parent.startswith('|')):
+				Path = (Parent or '') + '|' + ShortName(New)
+			elif Command == 'rename' and Old.startswith('|'):
+				Path = Old.rpartition('|')[0] + '|' + ShortName(New)
+			self.Names.Move(Handle, Old, New, Path)
+
+	def FindNodes(self, Names):
+		""" find the nodes the trace's commands use that it did not make, by their mapped names.
+		Joints are found in the skeleton index by long name or unique short name, and anything else
+		by long name, then short name """
+		Names = [Name for Name in dict.fromkeys(Names) if Name not in self.Found]
+		if not Names:
+			return
+		ResetSkeletonIndex()
+		Skeleton = GetSkeletonIndex()
+		Joints = []
+		for Name in Names:
+			Mapped = self.Rename(Name)
+			Path = Skeleton.Resolve(Mapped)
+			if Path:
+				Joints.append((Name, Path))
+				continue
+			for Candidate in (Mapped, ShortName(Mapped)):
+				Matches = cmds.ls(Candidate, long=True) or []
+				if len(Matches) == 1:
+					Path = Matches[0]
+					break
+			if not Path:
+				raise ValueError('nothing called %s to play the trace onto, it was %s when traced' % (Mapped, Name))
+			self.Found[Name] = self.Handles([Path])[0]
+		if om is None:
+			# the index reads the joints' UUIDs in one ls call
+			Handles = [Handle.Uuid for Handle in Skeleton.Handles([Path for Name, Path in Joints])]
+			for Handle, (Name, Path) in zip(Handles, Joints):
+				self.Names.Set(Handle, Path)
+		else:
+			Handles = self.Handles([Path for Name, Path in Joints])
+		self.Found.update((Name, Handle) for (Name, Path), Handle in zip(Joints, Handles))
+
+	def Decode(self, Value):
+		""" arguments with the nodes in them named as they are now, and the names in text mapped """
+		if isinstance(Value, list):
+			if PlainTypes.issuperset(map(type, Value)):
+				return Value
+			return [self.Decode(Item) if isinstance(Item, (list, dict, str)) else Item for Item in Value]
+		if isinstance(Value, str):
+			return self.Rename(Value)
+		if not isinstance(Value, dict):
+			return Value
+		Name = self.NameOf(self.Handle(Value))
+		if 'attr' in Value:
+			return Name+'.'+Value['attr']
+		return Name
+
+	def Handle(self, Reference):
+		return self.Made[Reference['made']] if 'made' in Reference else self.Found[Reference['node']]
+
+	def Nodes(self, Value):
+		""" the handles of the nodes in arguments, in order """
+		if isinstance(Value, list):
+			return [Handle for Item in Value for Handle in self.Nodes(Item)]
+		if isinstance(Value, dict) and 'attr' not in Value:
+			return [self.Handle(Value)]
+		return []
+
+	def Number(self, Command, Nodes, Start, Count):
+		""" number the nodes a command made, and anything made under them, as the trace did, which
+		had Count nodes after. The registry's recorder has kept what the command returned from Start
+		on, in order unless it kept UUIDs of more than one node, which ls gives in its own order """
+		Nodes = list(Nodes)
+		Handles = Session.Current.Recorder.Created[Start:]
+		if om is None and len(Nodes) > 1:
+			Handles = self.InOrder(Nodes)
+		elif om is None:
+			# what the command called it
+			for Handle, Node in zip(Handles, Nodes):
+				self.Names.Set(Handle, Node)
+		Numbered = set()
+		self.Add(Handles, Numbered)
+		if Command not in ParentingCommands:
+			return
+		if not self.Used.intersection(range(len(self.Made), Count)):
+			# nothing in the trace uses what was made under them, so they are only counted
+			self.Made += [None] * (Count - len(self.Made))
+		elif om is None:
+			# them and everything below them, in one ls call
+			self.Add(cmds.ls(Nodes, dag=True, uuid=True) or [], Numbered)
+		else:
+			self.Add(self.Handles(cmds.ls(Nodes, dag=True, long=True) or []), Numbered)
+
+	def Add(self, Handles, Numbered):
+		""" number the handles not yet in Numbered """
+		for Handle in Handles:
+			if Key(Handle) not in Numbered:
+				Numbered.add(Key(Handle))
+				self.Made.append(Handle)
+
+	def InOrder(self, Nodes):
+		""" the UUIDs of the nodes a command returned, in its order, from the UUIDs and long names
+		of them all, which ls gives in the same order as each other. Each returned name is the end of
+		one long name, which is kept too """
+		Paths = {}
+		for Handle, Path in zip(cmds.ls(Nodes, uuid=True), cmds.ls(Nodes, long=True)):
+			Paths.setdefault(ShortName(Path), []).append((Path, Handle))
+		Handles = []
+		for Node in Nodes:
+			Found = [(Path, Handle) for Path, Handle in Paths.get(ShortName(Node), []) if Path == Node or Path.endswith('|'+Node)]
+			if len(Found) != 1:
+				Found = [(cmds.ls(Node, long=True)[0], self.Handles([Node])[0])]
+			self.Names.Set(Found[0][1], Found[0][0])
+			Handles.append(Found[0][1])
+		return Handles
+
+	def Handles(self, Nodes):
+		if om is None:
+			return [cmds.ls(Node, uuid=True)[0] for Node in Nodes]
+		Handles = []
+		for Node in Nodes:
+			Selection = om.MSelectionList()
+			Selection.add(Node)
+			Handles.append(om.MObjectHandle(Selection.getDependNode(0)))
+		return Handles
+
+	def NameOf(self, Handle):
+		if om is not None:
+			Node = Handle.object()
+			if Node.hasFn(om.MFn.kDagNode):
+				return om.MFnDagNode(Node).fullPathName()
+			return om.MFnDependencyNode(Node).name()
+		Name = self.Names.get(Handle)
+		if Name is None:
+			Name = cmds.ls(Handle, long=True)[0]
+			self.Names.Set(Handle, Name)
+		return Name
+
+	#----------------------------------------------------------------------------------------------#
+	# Numbers worked out from the skeleton
+
+	def Derive(self, Recipe, Arguments, Flags):
+		""" a command's arguments and flags with their numbers worked out again the way Recipe says,
+		in the order they come in """
+		if Recipe['derived'] not in Derivations:
+			raise ValueError('a trace cannot work out numbers by %r, only by %s' % (Recipe['derived'], ', '.join(Derivations)))
+		if self.Graph and UsesMade(Recipe['from']):
+			# nodes made by the trace are read from the scene, so what is queued is made first
+			self.Flush()
+		Numbers = Flatten(getattr(self, Recipe['derived'])(*self.Decode(Recipe['from'])))
+		Traced = Flatten([Arguments, list(Flags.values())])
+		if len(Numbers) != len(Traced):
+			raise ValueError('%s gave %d numbers where the traced build had %d' % (Recipe['derived'], len(Numbers), len(Traced)))
+		Numbers = iter(Numbers)
+		return Renumber(Arguments, Numbers), dict((Flag, Renumber(Value, Numbers)) for Flag, Value in Flags.items())
+
+	def Placement(self, Node, Parent=None):
+		""" where a control lined up with Node goes under one lined up with Parent """
+		return self.Transforms.LocalPlacement(Node, Parent)
+
+	def Offset(self, Node, Parent, Share):
+		""" Share of the way from Parent to Node, in Parent's space """
+		return [Value * Share for Value in self.Transforms.LocalPositions([Node], [Parent])[0]]
+
+	def Attr(self, Plug, Mask=None):
+		""" a plug's value now, with a 0 for each value Mask has a 0 for """
+		Values = Flatten(cmds.getAttr(Plug))
+		if Mask:
+			return [Value if Keep else 0.0 for Value, Keep in zip(Values, Mask)]
+		return Values
+
+	def RestOffset(self, Node):
+		""" the rest of a transform without its rotateX, as Builders.FoldRestIntoOffset folds it """
+		return RestOffset(cmds.xform(Node, query=True, rotation=True), cmds.xform(Node, query=True, translation=True))
+
+	def Flipped(self, Top, Joint, Part):
+		""" Joint's jointOrient, Part 0, or translate, Part 1, once the joints under Top are flipped,
+		worked out for them all when Top's own orient is asked for, before any of them is changed """
+		if (Joint == Top and Part == 0) or Top not in self.Flips:
+			self.Flips[Top] = dict((Flip[0], Flip[1:]) for Flip in FlippedJoints(Top) or [])
+		if Joint not in self.Flips[Top]:
+			raise ValueError('%s is not a joint under %s with only joints below it, as it was when traced' % (Joint, Top))
+		return self.Flips[Top][Joint][Part]
+
+	#----------------------------------------------------------------------------------------------#
+	# Queueing in a modifier
+
+	def Queue(self, Command, Arguments, Flags):
+		""" queue a command in the modifier rather than running it, when the modifier can do what it
+		does. True when it was queued """
+		if self.Graph is None or Command not in Queueable:
+			return False
+		Flags = dict((LongFlags.get(Flag, Flag), Value) for Flag, Value in Flags.items())
+		Made = getattr(self, Queueable[Command])(Arguments, Flags)
+		if Made is False:
+			return False
+		self.Waiting += 1
+		for Node in Made:
+			Handle = om.MObjectHandle(Node)
+			self.Queued.add(Key(Handle))
+			self.Made.append(Handle)
+		return True
+
+	# each of these queues a command and gives the nodes it made, or False when it cannot
+
+	def CreateNode(self, Arguments, Flags):
+		if len(Arguments) != 1 or not set(Flags) <= set(('name', 'parent', 'skipSelect')):
+			return False
+		Type = self.Rename(Arguments[0])
+		if IsNode(Flags.get('parent')):
+			return [self.Graph.CreateDagNode(Type, self.Text(Flags.get('name')), self.Object(Flags['parent']))]
+		if Flags.get('parent') or self.IsDag(Type):
+			return False
+		return [self.Graph.CreateNode(Type, self.Text(Flags.get('name')))]
+
+	def Group(self, Arguments, Flags):
+		""" an empty group """
+		Parent = Flags.get('parent')
+		if Arguments or not Flags.get('empty') or not set(Flags) <= set(('empty', 'name', 'parent')) or (Parent and not IsNode(Parent)):
+			return False
+		return [self.Graph.CreateDagNode('transform', self.Text(Flags.get('name')), self.Object(Parent) if Parent else None)]
+
+	def Curve(self, Arguments, Flags):
+		if Arguments or set(Flags) != set(('name', 'degree', 'point', 'knot', 'periodic')):
+			return False
+		return self.Graph.Curve(self.Text(Flags['name']), Flags['point'], Flags['degree'], Flags['knot'], Flags['periodic'])
+
+	def ConnectAttr(self, Arguments, Flags):
+		if Flags or len(Arguments) != 2 or not all(IsPlug(Value) for Value in Arguments):
+			return False
+		self.Graph.Connect(self.Object(Arguments[0]), Arguments[0]['attr'], self.Object(Arguments[1]), Arguments[1]['attr'])
+		return []
+
+	def SetAttr(self, Arguments, Flags):
+		""" numbers, or a matrix """
+		if not Arguments or not IsPlug(Arguments[0]):
+			return False
+		Plug, Values = Arguments[0], Arguments[1:]
+		if Flags == {'type': 'matrix'} and len(Values) == 1 and isinstance(Values[0], list) and len(Values[0]) == 16:
+			self.Graph.SetMatrix(self.Object(Plug), Plug['attr'], Values[0])
+			return []
+		if Flags or not Values or not all(isinstance(Value, (int, float)) for Value in Values):
+			return False
+		Found = self.Graph.Plug(self.Object(Plug), Plug['attr'])
+		if len(Values) == 1:
+			self.Graph.SetPlug(Found, Values[0])
+			return []
+		if not Found.isCompound or Found.numChildren() != len(Values):
+			return False
+		for Index, Value in enumerate(Values):
+			self.Graph.SetPlug(Found.child(Index), Value)
+		return []
+
+	def Parent(self, Arguments, Flags):
+		""" parent -relative """
+		if Flags != {'relative': True} or len(Arguments) < 2 or not all(IsNode(Value) for Value in Arguments):
+			return False
+		for Node in Arguments[:-1]:
+			self.Graph.Reparent(self.Object(Node), self.Object(Arguments[-1]))
+		return []
+
+	def Xform(self, Arguments, Flags):
+		""" xform -matrix of a node made in the modifier, so nothing but its channels is in its matrix """
+		if set(Flags) != set(('matrix',)) or len(Arguments) != 1 or not IsNode(Arguments[0]) \
+			or Key(self.Handle(Arguments[0])) not in self.Queued:
+			return False
+		self.Graph.Place(self.Object(Arguments[0]), Flags['matrix'])
+		return []
+
+	def Flush(self):
+		""" make what is queued with one command, and start a new modifier """
+		if self.Graph and self.Waiting:
+			self.Graph.Finish()
+			self.Graph = ModifierGraph()
+			self.Queued = set()
+			self.Waiting = 0
+
+	def Object(self, Reference):
+		return self.Handle(Reference).object()
+
+	def Text(self, Value):
+		return Value and self.Rename(Value)
+
+	def IsDag(self, Type):
+		if Type not in self.DagTypes:
+			self.DagTypes[Type] = 'dagNode' in (cmds.nodeType(Type, isTypeName=True, inherited=True) or [])
+		return self.DagTypes[Type]
+
+# the commands a replay can queue in a modifier, and the methods of Replay queueing them
+Queueable = {'createNode': 'CreateNode', 'group': 'Group', 'curve': 'Curve', 'connectAttr': 'ConnectAttr',
+	'setAttr': 'SetAttr', 'parent': 'Parent', 'xform': 'Xform'}
+# the short flags of those commands, by their long names
+LongFlags = {'n': 'name', 'p': 'parent', 'ss': 'skipSelect', 'em': 'empty', 'r': 'relative', 'm': 'matrix',
+	'd': 'degree', 'k': 'knot', 'per': 'periodic', 'typ': 'type'}
+# what a list holds when there is nothing in it to decode, like a curve's point or a matrix, and
+# when each item in it is a number to flatten or renumber
+PlainTypes = set((int, float, bool, type(None)))
+NumberTypes = set((int, float))
+
+def Key(Handle):
+	""" what a node is known by in a set: its UUID, or its MObjectHandle's hash code """
+	return Handle if om is None else Handle.hashCode()
+
+def IsNode(Value):
+	return isinstance(Value, dict) and 'attr' not in Value
+
+def IsPlug(Value):
+	return isinstance(Value, dict) and 'attr' in Value
+
+def UsesMade(Value):
+	""" whether arguments have a node the trace made in them """
+	if isinstance(Value, list):
+		return any(UsesMade(Item) for Item in Value)
+	return isinstance(Value, dict) and 'made' in Value
+
+def Flatten(Value):
+	""" the numbers in a value, in order, as getAttr gives a compound's as a list of one tuple """
+	if isinstance(Value, (list, tuple)):
+		if NumberTypes.issuperset(map(type, Value)):
+			return list(Value)
+		return [Number for Item in Value for Number in Flatten(Item)]
+	if isinstance(Value, (int, float)) and not isinstance(Value, bool):
+		return [Value]
+	return []
+
+def Renumber(Value, Numbers):
+	""" Value with each number in it swapped for the next of Numbers """
+	if isinstance(Value, list):
+		if NumberTypes.issuperset(map(type, Value)):
+			return [next(Numbers) for Item in Value]
+		return [Renumber(Item, Numbers) for Item in Value]
+	if isinstance(Value, (int, float)) and not isinstance(Value, bool):
+		return next(Numbers)
+	return Value
+
+def References(Value, Names, Numbers):
+	""" add the names of the nodes in trace entries, a list or dict of them, that their build did
+	not make to Names, and the numbers of the ones it made to Numbers """
+	for Item in Value.values() if isinstance(Value, dict) else Value:
+		if isinstance(Item, dict):
+			if 'made' in Item:
+				Numbers.add(Item['made'])
+			elif 'node' in Item:
+				Names.append(Item['node'])
+			else:
+				References(Item, Names, Numbers)
+		elif isinstance(Item, list) and not PlainTypes.issuperset(map(type, Item)):
+			# a curve's points or a matrix are many numbers, which are not looked at one by one
+			References(Item, Names, Numbers)
+
+@RigOperation('replay build traces')
+def ReplayTraces(Traces, NameMap=None):
+	""" make again what the traced builds made, in order, on the skeleton NameMap maps the traced
+	one's names to. One undo step and one build in the registry for them all """
+	Player = Replay(NameMap)
+	for Trace in Traces:
+		Player.Play(Trace)
+	print('Replayed %d builds, %d commands' % (len(Traces), sum(len(Trace['commands']) for Trace in Traces)))
+	return Traces
+
+#--------------------------------------------------------------------------------------------------#
+# Trace and name map files
+
+def SaveTraces(Path, Traces=None):
+	""" write traces to a file, the ones traced since the tool was loaded by default """
+	if Traces is None:
+		Traces = Session.Current.Traces
+	with open(Path, 'w') as File:
+		json.dump({'traces': Traces}, File, separators=(',', ':'))
+	return len(Traces)
+
+def LoadTraces(Path):
+	with open(Path) as File:
+		return json.load(File)['traces']
+
+def LoadNameMap(Path):
+	""" a name map file, a JSON object of the traced names and the names to use instead """
+	with open(Path) as File:
+		NameMap = json.load(File)
+	if not isinstance(NameMap, dict) or not all(isinstance(Name, str) for Name in NameMap.values()):
+		raise ValueError('%s: a name map is an object of names and the names to use instead' % Path)
+	return NameMap
@@ -0,0 +1,184 @@
+""" World matrices read from the scene once for a build, and the placement maths done on them.
+Matrices are lists of 16 values, row by row as maya gives them. The maths is done on NumPy arrays,
+a whole batch of matrices at a time, when mayapy has NumPy, and one matrix at a time when not """
+
+import math
+import maya.cmds as cmds
+
+try:
+	import numpy
+except ImportError: # mayapy without numpy
+	numpy = None
+
+try:
+	import maya.api.OpenMaya as om
+except ImportError: # mayapy without the API, or the benchmarks' stand-in
+	om = None
+
+Identity = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+
+def ReadWorldMatrices(Nodes):
+	""" the world matrix of each node, through one selection list when OpenMaya is there """
+	if om is None:
+		return [cmds.xform(Node, query=True, matrix=True, worldSpace=True) for Node in Nodes]
+	Selection = om.MSelectionList()
+	for Node in Nodes:
+		Selection.add(Node)
+	return [list(Selection.getDagPath(i).inclusiveMatrix()) for i in range(len(Nodes))]
+
+def Placements(Worlds):
+	""" the world matrices with the scale taken out of their axes, which is where a control goes to
+	line up with a node """
+	if numpy is None:
+		return [PlacementEach(World) for World in Worlds]
+	Matrices = numpy.array(Worlds, dtype=float).reshape(-1, 4, 4)
+	Lengths = numpy.linalg.norm(Matrices[:, :3, :3], axis=2, keepdims=True)
+	Matrices[:, :3, :3] /= numpy.where(Lengths > 0.0, Lengths, 1.0)
+	return Matrices.reshape(-1, 16).tolist()
+
+def PlacementEach(World):
+	Placement = list(World)
+	for Row in range(3):
+		Length = math.sqrt(sum(Value*Value for Value in World[Row*4:Row*4+3])) or 1.0
+		for Column in range(3):
+			Placement[Row*4+Column] = World[Row*4+Column] / Length
+	return Placement
+
+def Multiply(A, B):
+	""" A then B, for row by row matrices """
+	return [sum(A[Row*4+k] * B[k*4+Column] for k in range(4)) for Row in range(4) for Column in range(4)]
+
+def RigidInverse(M):
+	""" the inverse of a matrix with no scale or shear """
+	Inverse = [M[0], M[4], M[8], 0.0, M[1], M[5], M[9], 0.0, M[2], M[6], M[10], 0.0, 0.0, 0.0, 0.0, 1.0]
+	for Column in range(3):
+		Inverse[12+Column] = -sum(M[12+k] * Inverse[k*4+Column] for k in range(3))
+	return Inverse
+
+def MatrixToEuler(M):
+	""" xyz rotation in degrees from a matrix with no scale """
+	Y = math.asin(max(-1.0, min(1.0, -M[2])))
+	if abs(math.cos(Y)) > 1e-9:
+		X = math.atan2(M[6], M[10])
+		Z = math.atan2(M[1], M[0])
+	else:
+		X = math.atan2(-M[9], M[5])
+		Z = 0.0
+	return [math.degrees(X), math.degrees(Y), math.degrees(Z)]
+
+def RestOffset(Rotation, Translation):
+	""" the matrix of an xyz rotation in degrees with its X left out, then a translation, which is
+	what a transform's rest is without its rotateX """
+	SinY, CosY = math.sin(math.radians(Rotation[1])), math.cos(math.radians(Rotation[1]))
+	SinZ, CosZ = math.sin(math.radians(Rotation[2])), math.cos(math.radians(Rotation[2]))
+	return [CosY*CosZ, CosY*SinZ, -SinY, 0.0,
+		-SinZ, CosZ, 0.0, 0.0,
+		SinY*CosZ, SinY*SinZ, CosY, 0.0,
+		Translation[0], Translation[1], Translation[2], 1.0]
+
+def LocalPositions(Worlds, ParentWorlds):
+	""" where each node is in its parent's space, which is a joint's translate. The axes of the
+	parents are at right angles, so each offset is its projection on them """
+	if numpy is None:
+		return [LocalPositionEach(World, Parent) for World, Parent in zip(Worlds, ParentWorlds)]
+	Matrices = numpy.array(Worlds, dtype=float).reshape(-1, 4, 4)
+	Parents = numpy.array(ParentWorlds, dtype=float).reshape(-1, 4, 4)
+	Axes = Parents[:, :3, :3]
+	Offsets = Matrices[:, 3, :3] - Parents[:, 3, :3]
+	return (numpy.einsum('nj,nij->ni', Offsets, Axes) / (Axes * Axes).sum(axis=2)).tolist()
+
+def LocalPositionEach(World, Parent):
+	return Project([World[12+i] - Parent[12+i] for i in range(3)], Parent)
+
+def Project(Vector, Parent):
+	""" a world direction in the space of a matrix whose axes are at right angles """
+	Axes = [Parent[Row*4:Row*4+3] for Row in range(3)]
+	return [sum(a*b for a, b in zip(Vector, Axis)) / (sum(b*b for b in Axis) or 1.0) for Axis in Axes]
+
+def FlippedLocals(Worlds, Parents, TopParent):
+	""" the jointOrient and translate of each joint once all of them are turned 180 degrees about
+	their own Y axes, with nothing left in rotate. Worlds are the joints' world matrices, Parents the
+	index of each joint's parent in Worlds, or -1 for a joint under TopParent """
+	if numpy is None:
+		return FlippedLocalsEach(Worlds, Parents, TopParent)
+	# turning about Y reverses the X and Z axes, the rows of a world matrix
+	Flipped = numpy.array(Worlds, dtype=float).reshape(-1, 4, 4)
+	Flipped[:, (0, 2), :3] *= -1
+	Parent = numpy.concatenate([Flipped, numpy.array(TopParent, dtype=float).reshape(1, 4, 4)])[Parents]
+	# the axes are at right angles, so each row in the parent's space is its projection on the parent's axes
+	Axes = Parent[:, :3, :3]
+	Rows = numpy.concatenate([Flipped[:, :3, :3], (Flipped[:, 3, :3] - Parent[:, 3, :3])[:, None, :]], axis=1)
+	Local = numpy.einsum('nrj,nij->nri', Rows, Axes) / (Axes * Axes).sum(axis=2)[:, None, :]
+	Rotation = Local[:, :3] / numpy.linalg.norm(Local[:, :3], axis=2, keepdims=True)
+
+	Y = numpy.arcsin(numpy.clip(-Rotation[:, 0, 2], -1.0, 1.0))
+	Locked = numpy.abs(numpy.cos(Y)) <= 1e-9
+	X = numpy.where(Locked, numpy.arctan2(-Rotation[:, 2, 1], Rotation[:, 1, 1]),
+		numpy.arctan2(Rotation[:, 1, 2], Rotation[:, 2, 2]))
+	Z = numpy.where(Locked, 0.0, numpy.arctan2(Rotation[:, 0, 1], Rotation[:, 0, 0]))
+	return numpy.degrees(numpy.stack([X, Y, Z], axis=1)).tolist(), Local[:, 3].tolist()
+
+def FlippedLocalsEach(Worlds, Parents, TopParent):
+	""" FlippedLocals one joint at a time """
+	Flipped = []
+	for World in Worlds:
+		Flipped.append([-Value for Value in World[0:4]] + list(World[4:8]) + [-Value for Value in World[8:12]] + list(World[12:16]))
+	Orients = []
+	Translates = []
+	for World, Index in zip(Flipped, Parents):
+		Parent = Flipped[Index] if Index >= 0 else TopParent
+		Local = []
+		for Row in range(3):
+			Local += Project(World[Row*4:Row*4+3], Parent) + [0.0]
+		Orients.append(MatrixToEuler(PlacementEach(Local + [0.0, 0.0, 0.0, 1.0])))
+		Translates.append(LocalPositionEach(World, Parent))
+	return Orients, Translates
+
+class TransformCache(object):
+	""" World matrices of the nodes a build places things by, read in one pass for a whole chain or
+	skeleton when first asked for and kept for the rest of the build. The places of nodes the build
+	makes are remembered rather than read back """
+
+	def __init__(self, Nodes=None):
+		self.Worlds = {}
+		self.Places = {}
+		if Nodes:
+			self.Fetch(Nodes)
+
+	def Fetch(self, Nodes):
+		""" read the world matrices of any of Nodes not already read """
+		New = [Node for Node in dict.fromkeys(Nodes) if Node not in self.Worlds]
+		if not New:
+			return
+		Worlds = ReadWorldMatrices(New)
+		for Node, World, Place in zip(New, Worlds, Placements(Worlds)):
+			self.Worlds[Node] = World
+			self.Places[Node] = Place
+
+	def Remember(self, Node, Place):
+		""" where a node made during the build was put """
+		self.Places[Node] = Place
+
+	def World(self, Node):
+		self.Fetch([Node])
+		return self.Worlds[Node]
+
+	def Placement(self, Node):
+		""" the world matrix of Node without scale, where a control lines up with it """
+		if Node not in self.Places:
+			self.Fetch([Node])
+		return self.Places[Node]
+
+	def Position(self, Node):
+		return self.Placement(Node)[12:15]
+
+	def LocalPlacement(self, Node, Parent=None):
+		""" where a control lined up with Node goes under one lined up with Parent """
+		if not Parent:
+			return self.Placement(Node)
+		return Multiply(self.Placement(Node), RigidInverse(self.Placement(Parent)))
+
+	def LocalPositions(self, Nodes, Parents):
+		""" the translate each of Nodes would have under the matching one of Parents """
+		self.Fetch(list(Nodes) + list(Parents))
+		return LocalPositions([self.Worlds[Node] for Node in Nodes], [self.Worlds[Parent] for Parent in Parents])
@@ -0,0 +1,252 @@
+""" The Rig Helper window, and the tools in it that work on the selection """
+
+import maya.cmds as cmds
+
+from .Builders import (StartFK, StartIK, StartSwitch, StartSwitches, AddToSwitch, StartTwist, StartFootRoll,
+	StartFlipJoints)
+from .Report import PrintRigReport, FixRigProblems
+from .Registry import TearDownBuild, TearDownAll
+from .Trace import ReplayTraces, SaveTraces, LoadTraces, LoadNameMap
+from .Session import RigOperation
+from . import Session
+
+WindowName = 'RigHelperWindow'
+
+def MakeWindow():
+	""" open the window, replacing it if it is already open """
+	CloseWindow()
+	windowEditor = cmds.window(WindowName, title='Rig Helper Tool', widthHeight=(600, 560))
+	cmds.columnLayout(adjustableColumn=True)
+	cmds.separator(height=20, style='in')
+	Ann='Reverses the X direction for joints, useful for joints mirrored by behaviour'
+	cmds.button(label='Flip joint orientations', command= StartFlipJoints, ann=Ann)
+	cmds.separator(height=20, style='in')
+	Ann='Duplicates the selected joint chain before making FK or IK controls'
+	cmds.checkBox('Duplicate', label='Duplicate joints', ann=Ann)
+	Ann='Creates FK controls on only the selected joints, rather than the whole hierarchy'
+	cmds.checkBox('SelOnly', label='Selected joints only', ann=Ann)
+	cmds.checkBox('IgnoreLeaf', label='Ignore leaf joints')
+	Ann='FK anims drive their joints through offsetParentMatrix instead of constraints, for faster playback'
+	cmds.checkBox('MatrixFK', label='Matrix FK, no constraints', ann=Ann)
+	Ann='IK/FK switches blend whole joint matrices with blendMatrix instead of rotations with blendColors'
+	cmds.checkBox('BlendMatrix', label='Blend switches by matrix', ann=Ann)
+	Ann='Gives each chain of a multi-chain switch build its own switch anim, rather than one for them all'
+	cmds.checkBox('SwitchPerChain', label='A switch anim for each chain', ann=Ann)
+	Ann='Builds as one undo step, without refreshing the viewport while building'
+	cmds.checkBox('PerfMode', label='Performance build mode', value=True, ann=Ann)
+	Ann='Switches the evaluation manager to DG while building, then back again'
+	cmds.checkBox('PauseEvaluation', label='Pause parallel evaluation while building', value=True, ann=Ann)
+	Ann='Makes the nodes of FK and switch builds with one OpenMaya modifier instead of a command each'
+	cmds.checkBox('Modifier', label='Build with OpenMaya modifiers', ann=Ann)
+	Ann='Runs FK and flip builds a little at a time while maya is idle, so they can be watched and cancelled'
+	cmds.checkBox('ChunkedBuilds', label='Long builds in chunks', value=True, ann=Ann)
+	cmds.text('BuildTime', label='', align='left')
+	cmds.progressBar('BuildProgress', maxValue=1, progress=0)
+	Ann='Stops the build running in chunks and deletes what it has made'
+	cmds.button('CancelBuild', label='cancel build', command= CancelBuild, enable=False, ann=Ann)
+	Ann='Counts and times every maya command a build makes, and adds it to the profile log'
+	cmds.checkBox('Profile', label='Profile builds', ann=Ann)
+	cmds.scrollField('ProfileReport', editable=False, wordWrap=False, height=90, text='')
+	Ann='Keeps the commands each build changes the scene with, to play them again on another skeleton'
+	cmds.checkBox('TraceBuilds', label='Record build traces', ann=Ann)
+	Ann='Saves the traces of the builds made since the tool was loaded'
+	cmds.button(label='save build traces', command= SaveBuildTraces, ann=Ann)
+	Ann='Plays saved traces again, on the skeleton a name map file gives the joint names of'
+	cmds.button(label='replay build traces', command= ReplayBuildTraces, ann=Ann)
+	cmds.button(label='generate FK', command= StartFK)
+	Ann='Select the uppermost, then lowermost joints for the IK'
+	cmds.button(label='generate IK', command= StartIK, ann=Ann)
+	cmds.separator(height=20, style='in')
+	cmds.button(label='generate IK/FK switch', command= StartSwitch, ann=Ann+'/FK switch')
+	Ann='Select the start and end joint of every chain, and optionally the switch anim they all share'
+	cmds.button(label='generate IK/FK switches', command= StartSwitches, ann=Ann)
+	ATSann='Select the joints to be added, and the switch anim to control them'
+	cmds.button(label='add to existing IK/FK switch', command= AddToSwitch, ann=ATSann)
+	Ann='Select the joints to twist, each gets this many twist joints spread along it'
+	cmds.button(label='generate twist joint', command= StartTwist, ann=Ann)
+	cmds.intSliderGrp('TwistSegments', label='twist joints', field=True, minValue=1, maxValue=8, value=1, ann=Ann)
+	cmds.separator(height=20, style='in')
+	FRann='select the ankle joint, the leg IK and optionally the anim to hold the attribute'
+	FRann=FRann+'\n after running, hold d and move the heel group to the heel pivot point'
+	cmds.button(label='Add foot roll', command= StartFootRoll, ann=FRann)
+	Ann='Drives the foot roll groups with a single expression instead of utility nodes'
+	cmds.checkBox('FootRollExpression', label='Foot roll as one expression', ann=Ann)
+	cmds.separator(height=20, style='in')
+	cmds.button(label='recolour', command= Recolour)
+	cmds.colorSliderGrp('colourslider', label='colour')
+	cmds.floatSlider('Resize', min=0, max=20, dragCommand = ReSize, changeCommand = FinishReSize)
+	cmds.separator(height=20, style='in')
+	cmds.button(label='Match Transforms', command= MatchTransforms)
+	cmds.button(label='Match Position', command= MatchOnlyPosition)
+	cmds.button(label='Offset Parent Matrix', command= ParentOffset)
+	cmds.separator(height=20, style='in')
+	Ann='Lists the longest dependency chain of each build, and what holds back parallel evaluation'
+	cmds.button(label='report rig cost', command= PrintRigReport, ann=Ann)
+	Ann='Breaks cycles, swaps constraint stacks for matrices and deletes nodes nothing reads'
+	cmds.button(label='fix rig problems', command= FixRigProblems, ann=Ann)
+	cmds.scrollField('RigReport', editable=False, wordWrap=False, height=90, text='')
+	cmds.separator(height=20, style='in')
+	Ann='Keeps the selected nodes when everything the tool made is deleted'
+	cmds.button(label='add to white list', command= AddToWhiteList, ann=Ann)
+	Ann='Deletes the nodes the last build made, even after the scene has been saved and opened again'
+	cmds.button(label='delete last build', command= DeleteLastBuild, ann=Ann)
+	Ann='Deletes every node the tool has made in this scene, apart from the white list'
+	cmds.button(label='delete all builds', command= ClearAll, ann=Ann)
+	cmds.showWindow( windowEditor )
+
+def IsOpen():
+	return bool(cmds.window(WindowName, exists=True))
+
+def CloseWindow():
+	if IsOpen():
+		cmds.deleteUI(WindowName, window=True)
+
+def CancelBuild(*args):
+	if Session.Current.Chunked:
+		Session.Current.Chunked.Cancel()
+
+def SaveBuildTraces(*args):
+	if not Session.Current.Traces:
+		print('No build traces to save, tick "Record build traces" and build first')
+		return
+	Paths = cmds.fileDialog2(fileFilter='Build traces (*.json)', dialogStyle=2, fileMode=0, caption='Save build traces')
+	if Paths:
+		print('Saved %d build traces to %s' % (SaveTraces(Paths[0]), Paths[0]))
+
+def ReplayBuildTraces(*args):
+	""" replay a trace file, with the names in a name map file, or as they were when it is cancelled """
+	Paths = cmds.fileDialog2(fileFilter='Build traces (*.json)', dialogStyle=2, fileMode=1, caption='Build traces to replay')
+	if not Paths:
+		return
+	Maps = cmds.fileDialog2(fileFilter='Name maps (*.json)', dialogStyle=2, fileMode=1, caption='Name map, or cancel to keep the names')
+	ReplayTraces(LoadTraces(Paths[0]), LoadNameMap(Maps[0]) if Maps else None)
+
+def AddToWhiteList(*args):
+	selected = cmds.ls(sl=True,long=True) or []
+	if selected:
+		for i in range(len(selected)):
+			Session.Current.WhiteList.append(selected[i])
+			
+@RigOperation('delete all builds')
+def ClearAll(*args):
+	Deleted = TearDownAll(Session.Current.WhiteList)
+	print('Deleted %d nodes made by the tool, kept %d on the white list' % (Deleted, len(Session.Current.WhiteList)))
+
+@RigOperation('delete last build')
+def DeleteLastBuild(*args):
+	Build = TearDownBuild()
+	if Build:
+		print('Deleted what %s made at %s' % (Build['operation'], Build['time']))
+	else:
+		print('No builds recorded in this scene')
+			
+def Recolour(*args):
+	selected = cmds.ls(sl=True,long=True) or []
+	colour = cmds.colorSliderGrp('colourslider', query=True, rgb=True)
+
+	R = colour[0]
+	G = colour[1]
+	B = colour[2]
+	for curve in selected:
+		try:
+			shape = cmds.listRelatives(curve, fullPath=True, shapes=True)
+			print(shape)
+			for i in range(len(shape)):
+				# Trun on overrides
+				cmds.setAttr(shape[i] + ".overrideEnabled", 1)
+				cmds.setAttr(shape[i] + ".overrideRGBColors",1)
+				cmds.setAttr(shape[i] + ".overrideColorRGB", R ,G ,B)
+		except:
+			pass
+			
+class ResizeDrag(object):
+	""" One drag of the resize slider, which sets the size of the selected controls: the radius of a
+	circle, or half the side of a square. The controls' curve shapes are found and measured once when
+	the drag starts, each drag tick only keeps the slider's value, and the CVs are scaled about each
+	control's pivot once per screen refresh from the idle queue. The whole drag is one undo step.
+	Works on any curve control, with or without construction history """
+
+	Smallest = 0.01 # scaling to nothing could not be scaled back
+
+	def __init__(self):
+		self.Controls = []
+		self.Sizes = []
+		self.Value = None
+		self.Waiting = False
+		cmds.undoInfo(openChunk=True, chunkName='Rig Helper: resize')
+		selected = cmds.ls(sl=True,long=True,type='transform') or []
+		Shapes = {}
+		for Shape in (selected and cmds.listRelatives(selected, shapes=True, fullPath=True, type='nurbsCurve')) or []:
+			Shapes.setdefault(Shape.rsplit('|', 1)[0], []).append(Shape)
+		for Control in selected:
+			if Control not in Shapes:
+				continue
+			Pivot = cmds.xform(Control, query=True, rotatePivot=True, objectSpace=True)
+			Size = max(CurveSize(Shape, Pivot) for Shape in Shapes[Control])
+			if Size > 0:
+				World = cmds.xform(Control, query=True, rotatePivot=True, worldSpace=True)
+				self.Controls.append(([Shape+'.cv[*]' for Shape in Shapes[Control]], World))
+				self.Sizes.append(Size)
+
+	def Drag(self, Value):
+		""" keep the latest value, and scale to it when maya is next idle """
+		self.Value = Value
+		if not self.Waiting:
+			self.Waiting = True
+			cmds.evalDeferred(self.Apply, lowestPriority=True)
+
+	def Apply(self):
+		self.Waiting = False
+		if self.Value is None:
+			return
+		Size = max(self.Value, self.Smallest)
+		self.Value = None
+		for i in range(len(self.Controls)):
+			Factor = Size / self.Sizes[i]
+			if abs(Factor - 1.0) > 1e-6:
+				Components, Pivot = self.Controls[i]
+				cmds.scale(Factor, Factor, Factor, Components, pivot=Pivot, relative=True)
+				self.Sizes[i] = Size
+
+	def Finish(self, Value):
+		self.Value = Value
+		self.Apply()
+		cmds.undoInfo(closeChunk=True)
+
+def CurveSize(Shape, Pivot):
+	""" the largest distance of a curve from Pivot along any of its axes, which is the radius of a
+	circle. A cubic curve is measured where it passes its knots, rather than at its CVs which lie
+	outside it """
+	Cvs = cmds.getAttr(Shape+'.cv[*]')
+	Points = Cvs
+	if len(Cvs) > 2 and cmds.getAttr(Shape+'.degree') == 3:
+		if cmds.getAttr(Shape+'.form') == 2: # periodic, the last three CVs are the first three again
+			Cvs = Cvs[:-3]
+			Points = [[(Cvs[i-1][k] + 4*Cvs[i][k] + Cvs[(i+1) % len(Cvs)][k]) / 6.0 for k in range(3)] for i in range(len(Cvs))]
+		else:
+			Points = [Cvs[0]] + [[(Cvs[i-1][k] + 4*Cvs[i][k] + Cvs[i+1][k]) / 6.0 for k in range(3)] for i in range(1, len(Cvs)-1)] + [Cvs[-1]]
+	return max(abs(Point[k] - Pivot[k]) for Point in Points for k in range(3))
+
+def ReSize(*args):
+	""" the resize slider's drag command, starting a drag on the first tick """
+	if Session.Current.Resizing is None:
+		Session.Current.Resizing = ResizeDrag()
+	Session.Current.Resizing.Drag(cmds.floatSlider('Resize', query=True, value=True))
+
+def FinishReSize(*args):
+	""" the resize slider's change command, when it is let go or clicked """
+	Drag = Session.Current.Resizing or ResizeDrag()
+	Session.Current.Resizing = None
+	Drag.Finish(cmds.floatSlider('Resize', query=True, value=True))
+
+def MatchTransforms(*args):
+	cmds.matchTransform(pivots=False, scale=False, rot=True, pos=True)
+	
+def MatchOnlyPosition(*args):
+	cmds.matchTransform(pivots=False, scale=False, rot=False, pos=True)
+	
+def ParentOffset(*args):
+	selected = cmds.ls(sl=True,long=True) or []
+	if len(selected)==2:
+		cmds.connectAttr('%s.worldMatrix[0]' %selected[1], '%s.offsetParentMatrix' %selected[0]) 
+
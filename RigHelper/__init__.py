@@ -0,0 +1,42 @@
+""" Rig Helper, a tool to streamline the process of rigging a character.
+
+	import RigHelper
+	RigHelper.ShowWindow()
+
+Importing the package loads nothing and changes nothing in the scene. The modules are:
+	Hierarchy	the skeleton index, UUID node handles and joint lookups
+	Builders	the builds behind the window's buttons, callable from a script or a batch job
+	RigSpec		building a whole character from a rig spec
+	Report		the cost of each build's node graph, and what holds back parallel evaluation
+	Trace		playing a traced build again on another skeleton, with its joint names mapped
+	Window		the window, only loaded when it is opened
+	Session		build options, undo steps, the profiler and what is remembered between builds
+	Registry	what each build made, kept in the scene to delete it again or take back a failed build
+	Graph		making a build's nodes with maya commands, or in one OpenMaya modifier
+	Transforms	world matrices read once for a build, and the placement maths on them
+	Shapes		the control shape library, read from Shapes.json
+
+After editing the tool in a session, RigHelper.Reload() picks up the changes """
+
+import importlib
+import sys
+
+# in the order they import each other
+Modules = ('Registry', 'Session', 'Transforms', 'Shapes', 'Graph', 'Hierarchy', 'Builders', 'RigSpec', 'Report', 'Trace', 'Window')
+
+def ShowWindow(*args):
+	""" open the Rig Helper window, loading the window module the first time """
+	from . import Window
+	Window.MakeWindow()
+
+def Reload(*args):
+	""" reload the tool's modules after editing them, starting a new session, and reopen the window
+	if it was open """
+	Window = sys.modules.get(__name__+'.Window')
+	Open = Window is not None and Window.IsOpen()
+	for Name in Modules:
+		Module = sys.modules.get(__name__+'.'+Name)
+		if Module is not None:
+			importlib.reload(Module)
+	if Open:
+		ShowWindow()
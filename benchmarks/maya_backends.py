@@ -0,0 +1,169 @@
+""" Compares the ways the FK and switch builds can make their nodes, in Maya:
+
+	mayapy benchmarks/maya_backends.py
+	mayapy benchmarks/maya_backends.py --sizes 100 1000 10000 --json backends.json
+
+Each build runs on a fresh synthetic skeleton twice, once with maya commands and once with an OpenMaya
+modifier. The FK and switch builds are also traced with commands and the trace replayed on a fresh
+skeleton, which queues it in one modifier. The report gives the time of each, and whether they made
+the same scene graph: the same nodes, with the same types, parents, connections and world matrices.
+Each modifier build and replay is then undone, to check it still undoes in one step. Unlike
+run_benchmarks.py this needs Maya, and the exit code is 1 when the graphs differ or an undo leaves
+anything behind """
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+Here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, Here)
+sys.path.insert(0, os.path.dirname(Here))
+
+import run_benchmarks
+import skeletons
+
+Benchmarks = {
+	'fk': run_benchmarks.BenchFK,
+	'switch': run_benchmarks.BenchSwitch,
+	'addtoswitch': run_benchmarks.BenchAddToSwitch,
+	}
+
+# the builds whose trace is only their own; addtoswitch's would hold the switch it adds to as well
+Replayed = set(('fk', 'switch'))
+
+def Snapshot(cmds, Before):
+	""" everything made since Before, a set of UUIDs: node names and types, connections, and the
+	world matrices of the transforms, rounded so float noise between the two builds does not count """
+	Nodes = cmds.ls([Uuid for Uuid in cmds.ls(uuid=True) if Uuid not in Before], long=True) or []
+	Typed = cmds.ls(Nodes, long=True, showType=True) or []
+	Connections = set()
+	for Direction in ({'source': False}, {'destination': False}):
+		Plugs = []
+		if Nodes:
+			Plugs = cmds.listConnections(Nodes, connections=True, plugs=True, **Direction) or []
+		for i in range(0, len(Plugs), 2):
+			Pair = (Plugs[i], Plugs[i+1]) if 'source' in Direction else (Plugs[i+1], Plugs[i])
+			Connections.add(Pair)
+	Matrices = {}
+	for Node in cmds.ls(Nodes, long=True, type='transform') or []:
+		Matrices[Node] = [round(Value, 3) for Value in cmds.xform(Node, query=True, matrix=True, worldSpace=True)]
+	return {
+		'nodes': sorted(zip(Typed[::2], Typed[1::2])),
+		'connections': sorted(Connections),
+		'matrices': Matrices,
+		}
+
+def Differences(Commands, Modifier, Top=5):
+	""" the first few ways two snapshots differ """
+	Found = []
+	for Key in ('nodes', 'connections'):
+		Old, New = set(map(tuple, Commands[Key])), set(map(tuple, Modifier[Key]))
+		Found += ['only with commands: %s %s' % (Key, Item) for Item in sorted(Old - New)[:Top]]
+		Found += ['only with the modifier: %s %s' % (Key, Item) for Item in sorted(New - Old)[:Top]]
+	for Node, Matrix in sorted(Commands['matrices'].items()):
+		if Node in Modifier['matrices'] and Modifier['matrices'][Node] != Matrix:
+			Found.append('%s is placed differently' % Node)
+	return Found[:Top]
+
+def RunBuild(cmds, Tool, Name, Size, FingerLength, Modifier):
+	""" time one build on a fresh skeleton, returning the time, a snapshot of what it made, and for
+	a modifier build whether undo removed all of it """
+	cmds.file(new=True, force=True)
+	Roles = skeletons.Character(cmds, Size, FingerLength)
+	Tool.Session.Current.Options['Modifier'] = Modifier
+	with contextlib.redirect_stdout(io.StringIO()):
+		Build = Benchmarks[Name](cmds, Tool, Roles)
+		Before = set(cmds.ls(uuid=True))
+		Start = time.perf_counter()
+		Build()
+		Seconds = time.perf_counter() - Start
+	Made = Snapshot(cmds, Before)
+	Undone = None
+	if Modifier:
+		cmds.undo()
+		Undone = set(cmds.ls(uuid=True)) == Before
+	return Seconds, Made, Undone
+
+def RunReplay(cmds, Tool, Name, Size, FingerLength):
+	""" trace one build made with commands, then time replaying the trace on a fresh skeleton,
+	returning the time, a snapshot of what the replay made, and whether undo removed all of it """
+	from RigHelper import Trace
+	cmds.file(new=True, force=True)
+	Roles = skeletons.Character(cmds, Size, FingerLength)
+	Tool.Session.Current.Options.update(Modifier=False, TraceBuilds=True, ChunkedBuilds=False)
+	try:
+		with contextlib.redirect_stdout(io.StringIO()):
+			Benchmarks[Name](cmds, Tool, Roles)()
+	finally:
+		del Tool.Session.Current.Options['TraceBuilds'], Tool.Session.Current.Options['ChunkedBuilds']
+	Traces = Tool.Session.Current.Traces[-1:]
+	cmds.file(new=True, force=True)
+	skeletons.Character(cmds, Size, FingerLength)
+	Before = set(cmds.ls(uuid=True))
+	with contextlib.redirect_stdout(io.StringIO()):
+		Start = time.perf_counter()
+		Trace.ReplayTraces(Traces)
+		Seconds = time.perf_counter() - Start
+	Made = Snapshot(cmds, Before)
+	cmds.undo()
+	return Seconds, Made, set(cmds.ls(uuid=True)) == Before
+
+def Main(Arguments=None):
+	Parser = argparse.ArgumentParser(description='Compare building with maya commands and with OpenMaya modifiers, in Maya.')
+	Parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000], help='joint counts')
+	Parser.add_argument('--benchmarks', nargs='+', choices=list(Benchmarks), default=list(Benchmarks))
+	Parser.add_argument('--finger-length', type=int, default=3, help='joints per finger, larger gives deeper chains')
+	Parser.add_argument('--json', help='save the results to this file')
+	Args = Parser.parse_args(Arguments)
+
+	import maya.standalone
+	maya.standalone.initialize(name='python')
+	try:
+		import maya.cmds as cmds
+		from RigHelper import Builders, Graph
+		if not Graph.LoadModifierCommand():
+			print('OpenMaya could not be loaded, there is nothing to compare against')
+			return 2
+		cmds.undoInfo(state=True, infinity=True)
+
+		Results = []
+		Failed = False
+		print('%-12s %7s %10s %10s %8s %10s %8s  %s' % ('benchmark', 'joints', 'commands', 'modifier', 'speedup',
+			'replay', 'speedup', 'graph'))
+		for Name in Args.benchmarks:
+			for Size in Args.sizes:
+				CommandTime, CommandGraph, Undone = RunBuild(cmds, Builders, Name, Size, Args.finger_length, False)
+				ModifierTime, ModifierGraph, Undone = RunBuild(cmds, Builders, Name, Size, Args.finger_length, True)
+				Problems = Differences(CommandGraph, ModifierGraph)
+				if not Undone:
+					Problems.append('undo left part of the modifier build behind')
+				ReplayTime = None
+				if Name in Replayed:
+					ReplayTime, ReplayGraph, Undone = RunReplay(cmds, Builders, Name, Size, Args.finger_length)
+					Problems += ['replay: '+Problem for Problem in Differences(CommandGraph, ReplayGraph)]
+					if not Undone:
+						Problems.append('undo left part of the replay behind')
+				Failed = Failed or bool(Problems)
+				Replay = '%10s %8s' % ('-', '-')
+				if ReplayTime is not None:
+					Replay = '%9.3fs %7.1fx' % (ReplayTime, CommandTime / max(ReplayTime, 1e-9))
+				print('%-12s %7d %9.3fs %9.3fs %7.1fx %s  %s' % (Name, Size, CommandTime, ModifierTime,
+					CommandTime / max(ModifierTime, 1e-9), Replay, 'same' if not Problems else 'DIFFERENT'))
+				for Problem in Problems:
+					print('\t'+Problem)
+				Results.append({'benchmark': Name, 'size': Size, 'commands': CommandTime, 'modifier': ModifierTime,
+					'replay': ReplayTime, 'problems': Problems})
+	finally:
+		maya.standalone.uninitialize()
+
+	if Args.json:
+		with open(Args.json, 'w') as File:
+			json.dump(Results, File, indent=1, sort_keys=True)
+	return 1 if Failed else 0
+
+if __name__ == '__main__':
+	sys.exit(Main())
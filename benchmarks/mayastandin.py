@@ -0,0 +1,1520 @@
+""" A recording stand-in for maya.cmds and maya.mel, so the rig tool can be run and timed without Maya.
+The scene is an in-memory DAG of joints, transforms, shapes and DG nodes with attributes and connections.
+Only the commands and flags the tool uses are implemented, and every call is counted per command name """
+
+import fnmatch
+import math
+import os
+import sys
+import tempfile
+import time
+import types
+import uuid as UUID
+
+#--------------------------------------------------------------------------------------------------#
+# matrix helpers, row vectors like Maya, so World = Local * ParentWorld
+
+def Identity():
+	return [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]]
+
+def MatMul(A, B):
+	B0, B1, B2, B3 = B
+	Result = []
+	for a0, a1, a2, a3 in A:
+		Result.append([a0*B0[j] + a1*B1[j] + a2*B2[j] + a3*B3[j] for j in (0, 1, 2, 3)])
+	return Result
+
+def MatInverse(M):
+	""" general 4x4 inverse by Gauss-Jordan elimination """
+	A = [list(M[i]) + Identity()[i] for i in range(4)]
+	for col in range(4):
+		pivot = max(range(col, 4), key=lambda row: abs(A[row][col]))
+		A[col], A[pivot] = A[pivot], A[col]
+		div = A[col][col]
+		if abs(div) < 1e-12:
+			return Identity()
+		A[col] = [value/div for value in A[col]]
+		for row in range(4):
+			if row != col and A[row][col] != 0.0:
+				factor = A[row][col]
+				A[row] = [A[row][i] - factor*A[col][i] for i in range(8)]
+	return [A[i][4:] for i in range(4)]
+
+def EulerToMatrix(Rotation):
+	""" xyz rotate order in degrees """
+	x, y, z = [math.radians(value) for value in Rotation]
+	cx, sx, cy, sy, cz, sz = math.cos(x), math.sin(x), math.cos(y), math.sin(y), math.cos(z), math.sin(z)
+	return [[cy*cz, cy*sz, -sy, 0.0],
+		[sx*sy*cz - cx*sz, sx*sy*sz + cx*cz, sx*cy, 0.0],
+		[cx*sy*cz + sx*sz, cx*sy*sz - sx*cz, cx*cy, 0.0],
+		[0.0, 0.0, 0.0, 1.0]]
+
+def MatrixToEuler(M):
+	""" xyz rotate order in degrees, from a matrix without scale """
+	sy = max(-1.0, min(1.0, -M[0][2]))
+	y = math.asin(sy)
+	if abs(math.cos(y)) > 1e-9:
+		x = math.atan2(M[1][2], M[2][2])
+		z = math.atan2(M[0][1], M[0][0])
+	else:
+		x = math.atan2(-M[2][1], M[1][1])
+		z = 0.0
+	return [math.degrees(x), math.degrees(y), math.degrees(z)]
+
+def Translation(Position):
+	M = Identity()
+	M[3][0], M[3][1], M[3][2] = Position
+	return M
+
+def Scaling(Scale):
+	M = Identity()
+	M[0][0], M[1][1], M[2][2] = Scale
+	return M
+
+def RotationPart(M):
+	""" the matrix with translation removed and the axes normalised """
+	R = Identity()
+	for i in range(3):
+		length = math.sqrt(sum(M[i][j]*M[i][j] for j in range(3))) or 1.0
+		for j in range(3):
+			R[i][j] = M[i][j]/length
+	return R
+
+def Flatten(M):
+	return [M[i][j] for i in range(4) for j in range(4)]
+
+def Unflatten(Values):
+	return [list(Values[i*4:i*4+4]) for i in range(4)]
+
+def ParseAngle(Value):
+	if isinstance(Value, str):
+		if Value.endswith('deg'):
+			return float(Value[:-3])
+		if Value.endswith('rad'):
+			return math.degrees(float(Value[:-3]))
+	return float(Value)
+
+#--------------------------------------------------------------------------------------------------#
+# node types and their attributes
+
+Inherits = {
+	'transform': 'dagNode', 'joint': 'transform', 'ikHandle': 'transform', 'ikEffector': 'transform',
+	'constraint': 'transform', 'orientConstraint': 'constraint', 'pointConstraint': 'constraint',
+	'parentConstraint': 'constraint', 'poleVectorConstraint': 'constraint',
+	'shape': 'dagNode', 'nurbsCurve': 'shape', 'nurbsSurface': 'shape', 'dagNode': 'node',
+}
+
+Vector = ('X', 'Y', 'Z')
+Colour = ('R', 'G', 'B')
+
+def Compound(Long, Short, Suffixes, ShortSuffixes=None):
+	ShortSuffixes = ShortSuffixes or [suffix.lower() for suffix in Suffixes]
+	return (Long, Short, [(Long+suffix, Short+short) for suffix, short in zip(Suffixes, ShortSuffixes)])
+
+CommonAttrs = [
+	('message', 'msg', None), ('caching', 'cch', None), ('isHistoricallyInteresting', 'ihi', None),
+]
+DagAttrs = [
+	('visibility', 'v', None), ('worldMatrix', 'wm', None), ('worldInverseMatrix', 'wim', None),
+	('parentMatrix', 'pm', None), ('matrix', 'm', None), ('inverseMatrix', 'im', None),
+	('overrideEnabled', 'ove', None), ('overrideRGBColors', 'ovrgbf', None),
+	Compound('overrideColorRGB', 'ovrgb', Colour),
+]
+TransformAttrs = [
+	Compound('translate', 't', Vector), Compound('rotate', 'r', Vector), Compound('scale', 's', Vector),
+	Compound('rotatePivot', 'rp', Vector), Compound('scalePivot', 'sp', Vector), Compound('rotateAxis', 'ra', Vector),
+	('rotateOrder', 'ro', None), ('offsetParentMatrix', 'opm', None), ('xformMatrix', 'xm', None),
+	('inheritsTransform', 'it', None), ('parentInverseMatrix', 'pim', None),
+]
+JointAttrs = [
+	Compound('jointOrient', 'jo', Vector), Compound('preferredAngle', 'pa', Vector),
+	('segmentScaleCompensate', 'ssc', None), ('inverseScale', 'is', None), ('radius', 'radi', None),
+	('drawStyle', 'ds', None),
+]
+ShapeAttrs = [
+	('create', 'cr', None), ('local', 'l', None), ('worldSpace', 'ws', None),
+	('controlPoints', 'cp', None), ('cv', 'cv', None), ('intermediateObject', 'io', None),
+	('lineWidth', 'lw', None),
+]
+ConstraintAttrs = [
+	('target', 'tg', [('targetParentMatrix', 'tpm'), ('targetRotate', 'tr'), ('targetTranslate', 'tt')]),
+	Compound('constraintRotate', 'cr', Vector), Compound('constraintTranslate', 'ct', Vector),
+	('constraintParentInverseMatrix', 'cpim', None), ('offset', 'o', None),
+	Compound('constraintTranslateOut', 'cto', Vector), ('constraintRotateOrder', 'cro', None),
+]
+IkHandleAttrs = [
+	('startJoint', 'hsj', None), ('endEffector', 'hee', None), Compound('poleVector', 'pv', Vector),
+	('ikSolver', 'hsv', None), ('twist', 'twi', None),
+]
+EffectorAttrs = [('handlePath', 'hp', None)]
+
+DGAttrs = {
+	'blendColors': [('blender', 'b', None), Compound('color1', 'c1', Colour), Compound('color2', 'c2', Colour),
+		Compound('output', 'op', Colour)],
+	'plusMinusAverage': [('operation', 'op', None), ('input1D', 'i1', None),
+		('input2D', 'i2', [('input2Dx', 'i2x'), ('input2Dy', 'i2y')]),
+		('input3D', 'i3', [('input3Dx', 'i3x'), ('input3Dy', 'i3y'), ('input3Dz', 'i3z')]),
+		('output1D', 'o1', None), ('output2D', 'o2', [('output2Dx', 'o2x'), ('output2Dy', 'o2y')]),
+		('output3D', 'o3', [('output3Dx', 'o3x'), ('output3Dy', 'o3y'), ('output3Dz', 'o3z')])],
+	'clamp': [Compound('min', 'mn', Colour, ['r', 'g', 'b']), Compound('max', 'mx', Colour, ['r', 'g', 'b']),
+		Compound('input', 'ip', Colour, ['r', 'g', 'b']), Compound('output', 'op', Colour, ['r', 'g', 'b'])],
+	'multiplyDivide': [('operation', 'op', None), Compound('input1', 'i1', Vector),
+		Compound('input2', 'i2', Vector), Compound('output', 'o', Vector)],
+	'reverse': [Compound('input', 'i', Vector), Compound('output', 'o', Vector)],
+	'blendWeighted': [('input', 'i', None), ('weight', 'w', None), ('output', 'o', None)],
+	'remapValue': [('inputValue', 'i', None), ('inputMin', 'imn', None), ('inputMax', 'imx', None),
+		('outputMin', 'omn', None), ('outputMax', 'omx', None), ('outValue', 'ov', None)],
+	'pickMatrix': [('inputMatrix', 'imat', None), ('outputMatrix', 'omat', None), ('useTranslate', 'ut', None),
+		('useRotate', 'ur', None), ('useScale', 'us', None), ('useShear', 'ush', None)],
+	'multMatrix': [('matrixIn', 'i', None), ('matrixSum', 'o', None)],
+	'decomposeMatrix': [('inputMatrix', 'imat', None), Compound('outputTranslate', 'ot', Vector),
+		Compound('outputRotate', 'or', Vector), Compound('outputScale', 'os', Vector),
+		Compound('outputShear', 'osh', Vector), ('inputRotateOrder', 'ro', None)],
+	'composeMatrix': [Compound('inputTranslate', 'it', Vector), Compound('inputRotate', 'ir', Vector),
+		Compound('inputScale', 'is', Vector), ('outputMatrix', 'omat', None)],
+	'blendMatrix': [('inputMatrix', 'imat', None), ('target', 'tgt', [('targetMatrix', 'tmat'), ('weight', 'wgt'),
+		('useMatrix', 'umt'), ('translateWeight', 'tw'), ('rotateWeight', 'rw'), ('scaleWeight', 'sw'),
+		('shearWeight', 'shw')]), ('outputMatrix', 'omat', None), ('envelope', 'env', None)],
+	'makeNurbCircle': [('radius', 'r', None), Compound('normal', 'nr', Vector), Compound('center', 'c', Vector),
+		('sections', 's', None), ('degree', 'd', None), ('outputCurve', 'oc', None), ('sweep', 'sw', None)],
+	'makeNurbsSquare': [('sideLength1', 'sl1', None), ('sideLength2', 'sl2', None),
+		Compound('normal', 'nr', Vector), Compound('center', 'c', Vector), ('degree', 'd', None),
+		('spansPerSide', 'sps', None), ('outputCurve1', 'oc1', None), ('outputCurve2', 'oc2', None),
+		('outputCurve3', 'oc3', None), ('outputCurve4', 'oc4', None)],
+	'makeNurbSphere': [('radius', 'r', None), Compound('axis', 'ax', Vector), ('outputSurface', 'os', None)],
+	'expression': [('input', 'in', None), ('output', 'out', None), ('expression', 'exp', None)],
+	'network': [],
+	'unitConversion': [('input', 'i', None), ('output', 'o', None), ('conversionFactor', 'cf', None)],
+}
+
+def TypeChain(Type):
+	Chain = [Type]
+	while Chain[-1] in Inherits:
+		Chain.append(Inherits[Chain[-1]])
+	if Chain[-1] != 'node':
+		Chain.append('node')
+	return Chain
+
+def AttrSpecs(Type):
+	Chain = TypeChain(Type)
+	Specs = list(CommonAttrs)
+	if 'dagNode' in Chain:
+		Specs += DagAttrs
+	if 'transform' in Chain:
+		Specs += TransformAttrs
+	if 'joint' in Chain:
+		Specs += JointAttrs
+	if 'shape' in Chain:
+		Specs += ShapeAttrs
+	if 'constraint' in Chain:
+		Specs += ConstraintAttrs
+	if 'ikHandle' in Chain:
+		Specs += IkHandleAttrs
+	if 'ikEffector' in Chain:
+		Specs += EffectorAttrs
+	Specs += DGAttrs.get(Type, [])
+	return Specs
+
+Defaults = {
+	'visibility': 1.0, 'scaleX': 1.0, 'scaleY': 1.0, 'scaleZ': 1.0, 'radius': 1.0, 'sideLength1': 1.0,
+	'sideLength2': 1.0, 'normalZ': 1.0, 'blender': 0.5, 'input2X': 1.0, 'input2Y': 1.0, 'input2Z': 1.0,
+	'operation': 1, 'inheritsTransform': 1, 'useTranslate': 1, 'useRotate': 1, 'useScale': 1, 'useShear': 1,
+	'degree': 3, 'sections': 8, 'segmentScaleCompensate': 1, 'sweep': 360.0, 'envelope': 1.0,
+	'outputMax': 1.0, 'inputMax': 1.0,
+}
+
+#--------------------------------------------------------------------------------------------------#
+
+class Node(object):
+	""" one node in the stand-in scene """
+	__slots__ = ('Name', 'Type', 'Parent', 'Children', 'Values', 'Dynamic', 'Uuid', 'Cvs', 'Degree',
+		'Knots', 'Alive', 'Specs', 'Children_', 'Longs', 'Shorts')
+
+	def __init__(self, Name, Type):
+		self.Name = Name
+		self.Type = Type
+		self.Parent = None
+		self.Children = []
+		self.Values = {}
+		self.Dynamic = {}
+		self.Uuid = str(UUID.uuid4()).upper()
+		self.Cvs = []
+		self.Degree = 3
+		self.Knots = []
+		self.Alive = True
+		self.Longs = {}
+		self.Shorts = {}
+		for spec in AttrSpecs(Type):
+			self.AddSpec(spec[0], spec[1], spec[2])
+
+	def AddSpec(self, Long, Short, Children):
+		self.Longs[Long] = Children
+		self.Shorts[Short] = Long
+		if Children:
+			for childLong, childShort in Children:
+				self.Longs[childLong] = None
+				self.Shorts[childShort] = childLong
+
+	def IsA(self, Type):
+		return Type in TypeChain(self.Type)
+
+	def IsDag(self):
+		return self.IsA('dagNode')
+
+	def Path(self):
+		if not self.IsDag():
+			return self.Name
+		Names = []
+		node = self
+		while node is not None:
+			Names.append(node.Name)
+			node = node.Parent
+		return '|' + '|'.join(reversed(Names))
+
+
+class StandInError(RuntimeError):
+	""" raised where Maya would raise a RuntimeError or ValueError """
+
+
+class Scene(object):
+	""" the scene graph behind the stand-in cmds module """
+
+	def __init__(self):
+		self.Batch = False
+		self.Reset()
+
+	def Reset(self):
+		self.Nodes = []
+		self.ByName = {}
+		self.ByUuid = {}
+		self.FreeNumbers = {}
+		self.Roots = []
+		self.Selection = []
+		self.Incoming = {}
+		self.Outgoing = {}
+		self.NodeIncoming = {}
+		self.NodeOutgoing = {}
+		self.Widgets = {}
+		self.Counts = {}
+		self.Times = {}
+		self.UndoChunks = []
+		self.UndoOpen = 0
+		self.UndoState = True
+		self.RefreshSuspended = False
+		self.EvaluationMode = 'parallel'
+		self.Callbacks = []
+		self.IdleQueue = []
+
+	#----------------------------------------------------------------------------------------------#
+	# names
+
+	def NewNode(self, Name, Type, Parent=None, Unique=True):
+		Name = Name.strip('|').replace('|', '_')
+		if Unique:
+			Name = self.UniqueName(Name)
+		node = Node(Name, Type)
+		self.Nodes.append(node)
+		self.ByUuid[node.Uuid] = node
+		self.ByName.setdefault(Name, []).append(node)
+		if node.IsDag():
+			self.Attach(node, Parent)
+		return node
+
+	def UniqueName(self, Name, Siblings=None):
+		""" Maya appends or increments a trailing number when a name is taken """
+		if Name.endswith('#'):
+			Name = Name[:-1] + '1'
+		if not self.NameTaken(Name, Siblings):
+			return Name
+		Base = Name.rstrip('0123456789')
+		Number = int(Name[len(Base):]) + 1 if Base != Name else 1
+		Hint = self.FreeNumbers.get(Base, 1) if Siblings is None else None
+		if Hint == Number - 1:
+			Hint = Number
+		Known = Hint is not None and Number <= Hint
+		if Known:
+			Number = Hint
+		while self.NameTaken(Base+str(Number), Siblings):
+			Number += 1
+		if Known:
+			self.FreeNumbers[Base] = Number + 1
+		return Base + str(Number)
+
+	def NameFreed(self, Name):
+		""" a numbered name is free again, UniqueName knows every lower number is taken """
+		Base = Name.rstrip('0123456789')
+		if Base != Name and Base in self.FreeNumbers:
+			self.FreeNumbers[Base] = min(self.FreeNumbers[Base], int(Name[len(Base):]))
+
+	def NameTaken(self, Name, Siblings=None):
+		Nodes = [node for node in self.ByName.get(Name, []) if node.Alive]
+		if Siblings is None:
+			return bool(Nodes)
+		return any(node in Siblings or not node.IsDag() for node in Nodes)
+
+	def SetName(self, node, Name):
+		self.NameFreed(node.Name)
+		self.ByName[node.Name].remove(node)
+		node.Name = Name
+		self.ByName.setdefault(Name, []).append(node)
+
+	def Attach(self, node, Parent):
+		if node.Parent is not None:
+			node.Parent.Children.remove(node)
+		elif node in self.Roots:
+			self.Roots.remove(node)
+		node.Parent = Parent
+		if Parent is None:
+			self.Roots.append(node)
+		else:
+			Parent.Children.append(node)
+
+	def Find(self, Name, Quiet=False):
+		""" resolve a long, partial or short name, raising like Maya when it does not match one node """
+		if not isinstance(Name, str):
+			if isinstance(Name, (list, tuple)) and len(Name) == 1:
+				return self.Find(Name[0], Quiet)
+			raise StandInError('Invalid name: %r' % (Name,))
+		Name = Name.split('.')[0]
+		if Name in self.ByUuid and self.ByUuid[Name].Alive:
+			return self.ByUuid[Name]
+		Leaf = Name.split('|')[-1]
+		Matches = []
+		for node in self.ByName.get(Leaf, []):
+			if not node.Alive:
+				continue
+			if '|' not in Name:
+				Matches.append(node)
+			elif Name.startswith('|'):
+				if node.Path() == Name:
+					Matches.append(node)
+			elif node.Path().endswith('|'+Name):
+				Matches.append(node)
+		if len(Matches) == 1:
+			return Matches[0]
+		if Quiet:
+			return None
+		if Matches:
+			raise StandInError('More than one object matches name: %s' % Name)
+		raise StandInError('No object matches name: %s' % Name)
+
+	def Exists(self, Name):
+		try:
+			return self.Find(Name, Quiet=True) is not None
+		except StandInError:
+			return False
+
+	def Short(self, node):
+		""" the shortest unique name, like Maya returns from most commands """
+		if not node.IsDag():
+			return node.Name
+		Alive = [other for other in self.ByName.get(node.Name, []) if other.Alive]
+		if len(Alive) == 1:
+			return node.Name
+		Names = node.Path().split('|')[1:]
+		for depth in range(2, len(Names)+1):
+			Partial = '|'.join(Names[-depth:])
+			Count = 0
+			for other in Alive:
+				if other.Path().endswith('|'+Partial):
+					Count += 1
+			if Count == 1:
+				return Partial if depth < len(Names) else '|' + Partial
+		return node.Path()
+
+	def NameOf(self, node, Long=False):
+		if Long:
+			return node.Path()
+		return self.Short(node)
+
+	#----------------------------------------------------------------------------------------------#
+	# attributes
+
+	def SplitPlug(self, Plug):
+		if '.' not in Plug:
+			raise StandInError('Invalid plug: %s' % Plug)
+		NodeName, Attr = Plug.split('.', 1)
+		return self.Find(NodeName), Attr
+
+	def LongAttr(self, node, Attr):
+		""" normalise an attribute path to long names, checking it exists on the node """
+		Parts = []
+		for part in Attr.split('.'):
+			Index = ''
+			if '[' in part:
+				part, Index = part[:part.index('[')], part[part.index('['):]
+			if part in node.Shorts and part not in node.Longs:
+				part = node.Shorts[part]
+			elif part not in node.Longs and part not in node.Dynamic:
+				if part in node.Shorts:
+					part = node.Shorts[part]
+				else:
+					raise StandInError('No object matches name: %s.%s' % (node.Name, Attr))
+			Parts.append(part + Index)
+		return '.'.join(Parts)
+
+	def Children(self, node, Attr):
+		""" child attributes of a compound, for connecting and setting compounds """
+		Base = Attr.split('.')[-1]
+		Index = ''
+		if '[' in Base:
+			Base, Index = Base[:Base.index('[')], Base[Base.index('['):]
+		Specs = node.Longs.get(Base)
+		if not Specs:
+			return []
+		Prefix = Attr[:len(Attr)-len(Base+Index)]
+		return [Prefix + Base + Index + '.' + child for child, short in Specs] if Index else \
+			[Prefix + child for child, short in Specs]
+
+	def Get(self, node, Attr):
+		if Attr in ('worldMatrix', 'worldMatrix[0]'):
+			return Flatten(self.WorldMatrix(node))
+		if Attr in ('worldInverseMatrix', 'worldInverseMatrix[0]'):
+			return Flatten(MatInverse(self.WorldMatrix(node)))
+		if Attr == 'matrix':
+			return Flatten(self.LocalMatrix(node))
+		if Attr == 'inverseMatrix':
+			return Flatten(MatInverse(self.LocalMatrix(node)))
+		if Attr in ('parentMatrix', 'parentMatrix[0]'):
+			return Flatten(self.WorldMatrix(node.Parent) if node.Parent else Identity())
+		Children = self.Children(node, Attr)
+		if Children:
+			return [tuple(self.Get(node, child) for child in Children)]
+		if Attr in node.Values:
+			return node.Values[Attr]
+		Base = Attr.split('.')[-1].split('[')[0]
+		if Base in node.Dynamic:
+			return node.Dynamic[Base].get('dv', 0.0)
+		if Base == 'offsetParentMatrix':
+			return Flatten(Identity())
+		return Defaults.get(Base, 0.0)
+
+	def Set(self, node, Attr, Values):
+		Children = self.Children(node, Attr)
+		if Children and len(Values) == len(Children):
+			for child, value in zip(Children, Values):
+				node.Values[child] = value
+		elif len(Values) == 1:
+			node.Values[Attr] = Values[0]
+		else:
+			node.Values[Attr] = list(Values)
+
+	def Vector3(self, node, Attr):
+		return [float(self.Get(node, Attr+axis)) for axis in Vector]
+
+	def SetVector3(self, node, Attr, Values):
+		for axis, value in zip(Vector, Values):
+			node.Values[Attr+axis] = float(value)
+
+	#----------------------------------------------------------------------------------------------#
+	# transforms
+
+	def LocalMatrix(self, node):
+		if not node.IsA('transform'):
+			return Identity()
+		M = MatMul(Scaling(self.Vector3(node, 'scale')), EulerToMatrix(self.Vector3(node, 'rotate')))
+		if node.IsA('joint'):
+			M = MatMul(M, EulerToMatrix(self.Vector3(node, 'jointOrient')))
+		M = MatMul(M, Translation(self.Vector3(node, 'translate')))
+		if 'offsetParentMatrix' in node.Values:
+			M = MatMul(M, Unflatten(node.Values['offsetParentMatrix']))
+		return M
+
+	def WorldMatrix(self, node):
+		M = Identity()
+		while node is not None:
+			M = MatMul(M, self.LocalMatrix(node))
+			node = node.Parent
+		return M
+
+	def ParentWorld(self, node):
+		return self.WorldMatrix(node.Parent) if node.Parent is not None else Identity()
+
+	def SetWorldMatrix(self, node, World, Position=True, Rotation=True):
+		""" solve translate and rotate (or jointOrient for joints with no rotate) for a world matrix """
+		Local = MatMul(World, MatInverse(self.ParentWorld(node)))
+		if 'offsetParentMatrix' in node.Values:
+			Local = MatMul(Local, MatInverse(Unflatten(node.Values['offsetParentMatrix'])))
+		if Position:
+			self.SetVector3(node, 'translate', Local[3][:3])
+		if Rotation:
+			Rot = RotationPart(Local)
+			if node.IsA('joint'):
+				Rot = MatMul(Rot, MatInverse(EulerToMatrix(self.Vector3(node, 'jointOrient'))))
+			self.SetVector3(node, 'rotate', MatrixToEuler(Rot))
+
+	def KeepWorld(self, node, World):
+		""" after reparenting, keep the node where it was, joints take the difference in jointOrient """
+		Local = MatMul(World, MatInverse(self.ParentWorld(node)))
+		self.SetVector3(node, 'translate', Local[3][:3])
+		Rot = RotationPart(Local)
+		if node.IsA('joint'):
+			Orient = MatMul(MatInverse(EulerToMatrix(self.Vector3(node, 'rotate'))), Rot)
+			self.SetVector3(node, 'jointOrient', MatrixToEuler(Orient))
+		else:
+			self.SetVector3(node, 'rotate', MatrixToEuler(Rot))
+
+	#----------------------------------------------------------------------------------------------#
+	# connections
+
+	def Connect(self, Source, Destination, Force=False):
+		SourceNode, SourceAttr = self.SplitPlug(Source)
+		DestNode, DestAttr = self.SplitPlug(Destination)
+		SourceAttr = self.LongAttr(SourceNode, SourceAttr)
+		DestAttr = self.LongAttr(DestNode, DestAttr)
+		Key = (DestNode, DestAttr)
+		if Key in self.Incoming:
+			if not Force:
+				Old = self.Incoming[Key]
+				raise StandInError('%s.%s is already connected from %s.%s' % (
+					DestNode.Name, DestAttr, Old[0].Name, Old[1]))
+			self.Disconnect(self.Incoming[Key], Key)
+		self.Incoming[Key] = (SourceNode, SourceAttr)
+		self.Outgoing.setdefault((SourceNode, SourceAttr), []).append(Key)
+		self.NodeIncoming.setdefault(DestNode, {})[DestAttr] = None
+		self.NodeOutgoing.setdefault(SourceNode, {})[SourceAttr] = None
+
+	def Disconnect(self, SourceKey, DestKey):
+		if self.Incoming.get(DestKey) == SourceKey:
+			del self.Incoming[DestKey]
+			del self.NodeIncoming[DestKey[0]][DestKey[1]]
+			self.Outgoing[SourceKey].remove(DestKey)
+			if not self.Outgoing[SourceKey]:
+				del self.Outgoing[SourceKey]
+				del self.NodeOutgoing[SourceKey[0]][SourceKey[1]]
+
+	def Connections(self, node, Attr=None, Source=True, Destination=True):
+		""" (plug on node, other node, other attr, incoming) for each connection """
+		Found = []
+		if Source:
+			for destAttr in list(self.NodeIncoming.get(node, ())):
+				if Attr is None or self.SameAttr(destAttr, Attr):
+					src, srcAttr = self.Incoming[(node, destAttr)]
+					Found.append((destAttr, src, srcAttr, True))
+		if Destination:
+			for srcAttr in list(self.NodeOutgoing.get(node, ())):
+				if Attr is None or self.SameAttr(srcAttr, Attr):
+					for dest, destAttr in self.Outgoing[(node, srcAttr)]:
+						Found.append((srcAttr, dest, destAttr, False))
+		return Found
+
+	def SameAttr(self, Attr, Query):
+		return Attr == Query or Attr.startswith(Query+'.') or Attr.startswith(Query+'[') or \
+			Attr.rstrip('XYZ') == Query and len(Attr) == len(Query)+1
+
+	def Delete(self, node):
+		if not node.Alive:
+			return
+		for child in list(node.Children):
+			self.Delete(child)
+		for plug, other, otherAttr, incoming in self.Connections(node):
+			if incoming:
+				self.Disconnect((other, otherAttr), (node, plug))
+			else:
+				self.Disconnect((node, plug), (other, otherAttr))
+		node.Alive = False
+		if node.IsDag():
+			if node.Parent is not None:
+				node.Parent.Children.remove(node)
+			elif node in self.Roots:
+				self.Roots.remove(node)
+		self.ByName[node.Name].remove(node)
+		self.NameFreed(node.Name)
+		if node in self.Selection:
+			self.Selection.remove(node)
+
+	def History(self, node):
+		""" upstream DG nodes feeding a node, as deleted by delete -constructionHistory """
+		Found = []
+		Stack = [node]
+		while Stack:
+			current = Stack.pop()
+			for plug, other, otherAttr, incoming in self.Connections(current, Destination=False):
+				if not other.IsDag() and other not in Found:
+					Found.append(other)
+					Stack.append(other)
+		return Found
+
+	#----------------------------------------------------------------------------------------------#
+	# reporting
+
+	def Live(self):
+		return [node for node in self.Nodes if node.Alive]
+
+	def Graph(self):
+		""" a name based description of the scene, for comparing two builds """
+		Nodes = sorted((node.Path(), node.Type) for node in self.Live())
+		Edges = sorted((src.Path()+'.'+srcAttr, dest.Path()+'.'+destAttr)
+			for (dest, destAttr), (src, srcAttr) in self.Incoming.items())
+		return Nodes, Edges
+
+
+#--------------------------------------------------------------------------------------------------#
+# the cmds module
+
+Current = Scene()
+
+def Recorded(Function):
+	""" count and time every call to a stand-in command """
+	Name = Function.__name__
+
+	def Wrapper(*args, **kwargs):
+		Start = time.perf_counter()
+		try:
+			return Function(*args, **kwargs)
+		finally:
+			Current.Counts[Name] = Current.Counts.get(Name, 0) + 1
+			Current.Times[Name] = Current.Times.get(Name, 0.0) + time.perf_counter() - Start
+	Wrapper.__name__ = Name
+	Wrapper.__doc__ = Function.__doc__
+	return Wrapper
+
+def Flag(kwargs, *Names, **Default):
+	for name in Names:
+		if name in kwargs:
+			return kwargs[name]
+	return Default.get('default')
+
+def Objects(args, Selection=True):
+	""" the nodes named in args, or the selection if none are given """
+	Names = []
+	for arg in args:
+		if isinstance(arg, (list, tuple)):
+			Names.extend(arg)
+		elif arg is not None:
+			Names.append(arg)
+	if not Names and Selection:
+		return list(Current.Selection)
+	return [Current.Find(name) for name in Names]
+
+def Names(Nodes, Long=False):
+	return [Current.NameOf(node, Long) for node in Nodes]
+
+def Select(Nodes):
+	Current.Selection = list(Nodes)
+
+def CurveShape(Transform, Name, Cvs, Degree=3, Knots=None):
+	Shape = Current.NewNode(Name, 'nurbsCurve', Transform)
+	Shape.Cvs = [list(cv) for cv in Cvs]
+	Shape.Degree = Degree
+	Shape.Knots = list(Knots or range(len(Cvs) + Degree - 1))
+	return Shape
+
+def CirclePoints(Radius, Normal, Sections=8):
+	""" the CVs of a cubic circle, which lie outside it so the curve passes through Radius """
+	Radius *= 1.1081941875
+	Points = []
+	for i in range(Sections):
+		angle = 2*math.pi*i/Sections
+		a, b = Radius*math.cos(angle), Radius*math.sin(angle)
+		if abs(Normal[0]) > 0.5:
+			Points.append([0.0, a, b])
+		elif abs(Normal[1]) > 0.5:
+			Points.append([a, 0.0, b])
+		else:
+			Points.append([a, b, 0.0])
+	return Points + Points[:3]
+
+@Recorded
+def ls(*args, **kwargs):
+	Long = Flag(kwargs, 'long', 'l')
+	Type = Flag(kwargs, 'type', 'typ')
+	if Flag(kwargs, 'selection', 'sl'):
+		Nodes = list(Current.Selection)
+	elif args:
+		Nodes = []
+		for name in Flatten1(args):
+			if '*' in name:
+				Nodes += [node for node in Current.Live() if fnmatch.fnmatchcase(node.Name, name)]
+			elif Current.Exists(name):
+				Nodes.append(Current.Find(name))
+		if Flag(kwargs, 'dag'):
+			# the nodes and everything below them
+			Stack = list(reversed(Nodes))
+			Nodes = []
+			Seen = set()
+			while Stack:
+				node = Stack.pop()
+				if id(node) not in Seen:
+					Seen.add(id(node))
+					Nodes.append(node)
+				Stack.extend(reversed(node.Children))
+	elif Flag(kwargs, 'dag'):
+		Nodes = []
+		Stack = list(reversed(Current.Roots))
+		while Stack:
+			node = Stack.pop()
+			Nodes.append(node)
+			Stack.extend(reversed(node.Children))
+	else:
+		Nodes = Current.Live()
+	if Type:
+		Types = Type if isinstance(Type, (list, tuple)) else [Type]
+		Nodes = [node for node in Nodes if any(node.IsA(t) for t in Types)]
+	if Flag(kwargs, 'uuid', 'uid'):
+		return [node.Uuid for node in Nodes]
+	if Flag(kwargs, 'showType', 'st'):
+		return [Entry for node in Nodes for Entry in (Current.NameOf(node, Long), node.Type)]
+	return Names(Nodes, Long)
+
+def Flatten1(args):
+	Found = []
+	for arg in args:
+		if isinstance(arg, (list, tuple)):
+			Found.extend(arg)
+		else:
+			Found.append(arg)
+	return Found
+
+@Recorded
+def objExists(Name):
+	return Current.Exists(Name)
+
+@Recorded
+def nodeType(Name):
+	return Current.Find(Name).Type
+
+@Recorded
+def listRelatives(*args, **kwargs):
+	Nodes = Objects(args)
+	Long = Flag(kwargs, 'fullPath', 'f')
+	Type = Flag(kwargs, 'type')
+	Found = []
+	for node in Nodes:
+		if Flag(kwargs, 'parent', 'p'):
+			Candidates = [node.Parent] if node.Parent is not None else []
+		elif Flag(kwargs, 'allDescendents', 'ad'):
+			Candidates = []
+			Stack = list(node.Children)
+			while Stack:
+				current = Stack.pop(0)
+				Candidates.append(current)
+				Stack[0:0] = current.Children
+			Candidates.reverse()
+		else:
+			Candidates = list(node.Children)
+		if Flag(kwargs, 'shapes', 's'):
+			Candidates = [child for child in Candidates if child.IsA('shape')]
+		if Type:
+			Types = Type if isinstance(Type, (list, tuple)) else [Type]
+			Candidates = [child for child in Candidates if any(child.IsA(t) for t in Types)]
+		for child in Candidates:
+			if child not in Found:
+				Found.append(child)
+	if not Found:
+		return None
+	return Names(Found, Long)
+
+@Recorded
+def listConnections(*args, **kwargs):
+	Source = Flag(kwargs, 'source', 's', default=True)
+	Destination = Flag(kwargs, 'destination', 'd', default=True)
+	Shapes = Flag(kwargs, 'shapes', 'sh')
+	Type = Flag(kwargs, 'type', 't')
+	Plugs = Flag(kwargs, 'plugs', 'p')
+	Pairs = Flag(kwargs, 'connections', 'c')
+	Found = []
+	for arg in Flatten1(args):
+		node = Current.Find(arg)
+		Attr = Current.LongAttr(node, arg.split('.', 1)[1]) if '.' in arg else None
+		for plug, other, otherAttr, incoming in Current.Connections(node, Attr, Source, Destination):
+			if not Shapes and other.IsA('shape') and other.Parent is not None:
+				other = other.Parent
+			if Type and not other.IsA(Type):
+				continue
+			Entry = Current.NameOf(other) + '.' + otherAttr if Plugs else Current.NameOf(other)
+			if Pairs:
+				Found += [Current.NameOf(node) + '.' + plug, Entry]
+			elif Plugs or Entry not in Found:
+				Found.append(Entry)
+	return Found or None
+
+@Recorded
+def select(*args, **kwargs):
+	if Flag(kwargs, 'clear', 'cl'):
+		Current.Selection = []
+		return
+	Nodes = Objects(args, Selection=False)
+	if Flag(kwargs, 'add', 'af'):
+		for node in Nodes:
+			if node not in Current.Selection:
+				Current.Selection.append(node)
+	elif Flag(kwargs, 'deselect', 'd'):
+		Current.Selection = [node for node in Current.Selection if node not in Nodes]
+	else:
+		Current.Selection = Nodes
+	for callback in Current.Callbacks:
+		callback()
+
+@Recorded
+def createNode(Type, name=None, n=None, parent=None, p=None, skipSelect=False, ss=False):
+	Name = name or n or (Type + '1')
+	Parent = parent or p
+	node = Current.NewNode(Name, Type, Current.Find(Parent) if Parent else None)
+	if not (skipSelect or ss):
+		Select([node])
+	return Current.NameOf(node)
+
+@Recorded
+def rename(*args, **kwargs):
+	if len(args) == 1:
+		node, NewName = Current.Selection[0], args[0]
+	else:
+		node, NewName = Current.Find(args[0]), args[1]
+	NewName = NewName.split('|')[-1]
+	Siblings = None
+	if node.IsDag():
+		Siblings = [other for other in (node.Parent.Children if node.Parent else Current.Roots) if other is not node]
+	if NewName.endswith('#') or Current.NameTaken(NewName, Siblings):
+		NewName = Current.UniqueName(NewName, Siblings)
+	Current.SetName(node, NewName)
+	return Current.NameOf(node)
+
+@Recorded
+def group(*args, **kwargs):
+	Name = Flag(kwargs, 'name', 'n', default='group1')
+	Parent = Flag(kwargs, 'parent', 'p')
+	node = Current.NewNode(Name, 'transform', Current.Find(Parent) if Parent else None)
+	if not Flag(kwargs, 'empty', 'em'):
+		for child in Objects(args):
+			World = Current.WorldMatrix(child)
+			Current.Attach(child, node)
+			Current.KeepWorld(child, World)
+	Select([node])
+	return Current.NameOf(node)
+
+@Recorded
+def parent(*args, **kwargs):
+	Nodes = Objects(args)
+	World = Flag(kwargs, 'world', 'w')
+	Relative = Flag(kwargs, 'relative', 'r')
+	if World:
+		NewParent = None
+		Children = Nodes
+	else:
+		if len(Nodes) < 2:
+			raise StandInError('parent needs a child and a parent')
+		NewParent, Children = Nodes[-1], Nodes[:-1]
+	Result = []
+	for child in Children:
+		if child.Parent is NewParent:
+			# Maya only warns here and leaves the node where it is
+			Result.append(child)
+			continue
+		Check = NewParent
+		while Check is not None:
+			if Check is child:
+				raise StandInError('Cannot parent %s under itself' % child.Name)
+			Check = Check.Parent
+		WorldMatrix = Current.WorldMatrix(child)
+		Siblings = NewParent.Children if NewParent else Current.Roots
+		if Current.NameTaken(child.Name, [node for node in Siblings if node is not child]):
+			Current.SetName(child, Current.UniqueName(child.Name, Siblings))
+		Current.Attach(child, NewParent)
+		if not Relative and child.IsA('transform'):
+			Current.KeepWorld(child, WorldMatrix)
+		Result.append(child)
+	Select(Result)
+	return Names(Result)
+
+@Recorded
+def duplicate(*args, **kwargs):
+	Nodes = Objects(args)
+	ParentOnly = Flag(kwargs, 'parentOnly', 'po')
+	Created = {}
+	Result = []
+
+	def Copy(node, Parent, Top):
+		Name = Current.UniqueName(node.Name) if Top or ParentOnly else node.Name
+		new = Current.NewNode(Name, node.Type, Parent, Unique=False)
+		new.Values = dict(node.Values)
+		new.Dynamic = dict((key, dict(value)) for key, value in node.Dynamic.items())
+		for key in new.Dynamic:
+			new.AddSpec(key, new.Dynamic[key].get('sn', key), None)
+		new.Cvs = [list(cv) for cv in node.Cvs]
+		new.Degree = node.Degree
+		new.Knots = list(node.Knots)
+		Created[node] = new
+		Result.append(new)
+		if not ParentOnly:
+			for child in node.Children:
+				if child.IsA('constraint') or child.IsA('ikEffector'):
+					continue
+				Copy(child, new, False)
+		return new
+
+	# duplicated nodes keep their hierarchy when their parent is duplicated in the same call
+	for node in sorted(Nodes, key=lambda node: node.Path().count('|')):
+		Copy(node, Created.get(node.Parent, node.Parent), True)
+	Tops = [Created[node] for node in Nodes]
+	Select(Tops)
+	if Flag(kwargs, 'returnRootsOnly', 'rr'):
+		return Names(Tops)
+	return Names(Result)
+
+@Recorded
+def delete(*args, **kwargs):
+	Nodes = Objects(args)
+	if Flag(kwargs, 'constructionHistory', 'ch'):
+		for node in Nodes:
+			Targets = [node] + [child for child in node.Children if child.IsA('shape')]
+			for target in Targets:
+				for history in Current.History(target):
+					Current.Delete(history)
+		return
+	for node in Nodes:
+		Current.Delete(node)
+
+@Recorded
+def setAttr(Plug, *Values, **kwargs):
+	node, Attr = Current.SplitPlug(Plug)
+	Attr = Current.LongAttr(node, Attr)
+	if (node, Attr) in Current.Incoming:
+		raise StandInError('setAttr: %s is connected' % Plug)
+	Current.Set(node, Attr, Values)
+
+@Recorded
+def getAttr(Plug, **kwargs):
+	node, Attr = Current.SplitPlug(Plug)
+	if Attr.startswith('cv['):
+		return [tuple(cv) for cv in CvRange(node, Attr)]
+	if Attr in ('degree', 'spans', 'form'):
+		Shape = ShapeOf(node)
+		if Attr == 'degree':
+			return Shape.Degree
+		if Attr == 'spans':
+			return len(Shape.Cvs) - Shape.Degree
+		return 2 if Shape.Knots and Shape.Knots[0] < 0 else 0
+	Attr = Current.LongAttr(node, Attr)
+	return Current.Get(node, Attr)
+
+def ShapeOf(node):
+	if node.IsA('shape'):
+		return node
+	for child in node.Children:
+		if child.IsA('shape'):
+			return child
+	raise StandInError('%s has no shape' % node.Name)
+
+def CvRange(node, Attr):
+	Shape = ShapeOf(node)
+	Index = Attr[Attr.index('[')+1:Attr.index(']')]
+	if Index == '*':
+		return Shape.Cvs
+	if ':' in Index:
+		start, end = [int(i) for i in Index.split(':')]
+		return Shape.Cvs[start:end+1]
+	return [Shape.Cvs[int(Index)]]
+
+@Recorded
+def connectAttr(Source, Destination, **kwargs):
+	Current.Connect(Source, Destination, Flag(kwargs, 'force', 'f'))
+
+@Recorded
+def disconnectAttr(Source, Destination, **kwargs):
+	SourceNode, SourceAttr = Current.SplitPlug(Source)
+	DestNode, DestAttr = Current.SplitPlug(Destination)
+	Current.Disconnect((SourceNode, Current.LongAttr(SourceNode, SourceAttr)),
+		(DestNode, Current.LongAttr(DestNode, DestAttr)))
+
+@Recorded
+def isConnected(Source, Destination, **kwargs):
+	SourceNode, SourceAttr = Current.SplitPlug(Source)
+	DestNode, DestAttr = Current.SplitPlug(Destination)
+	return Current.Incoming.get((DestNode, Current.LongAttr(DestNode, DestAttr))) == \
+		(SourceNode, Current.LongAttr(SourceNode, SourceAttr))
+
+@Recorded
+def addAttr(*args, **kwargs):
+	if Flag(kwargs, 'query', 'q'):
+		node = Current.Find(args[0].split('.')[0])
+		Attr = args[0].split('.')[1] if '.' in args[0] else Flag(kwargs, 'longName', 'ln')
+		return Attr in node.Dynamic if Flag(kwargs, 'exists', 'ex') else None
+	Long = Flag(kwargs, 'longName', 'ln')
+	Short = Flag(kwargs, 'shortName', 'sn', default=Long)
+	DataType = Flag(kwargs, 'dataType', 'dt')
+	Default = Flag(kwargs, 'defaultValue', 'dv', default='' if DataType == 'string' else 0.0)
+	for node in Objects(args):
+		if Long in node.Dynamic or Long in node.Longs:
+			raise StandInError('Found attribute %s on %s already' % (Long, node.Name))
+		node.Dynamic[Long] = {'sn': Short, 'dv': Default, 'dt': DataType,
+			'min': Flag(kwargs, 'minValue', 'min'), 'max': Flag(kwargs, 'maxValue', 'max')}
+		node.AddSpec(Long, Short, None)
+
+@Recorded
+def deleteAttr(*args, **kwargs):
+	node, Attr = Current.SplitPlug(args[0])
+	node.Dynamic.pop(Attr, None)
+	node.Longs.pop(Attr, None)
+	node.Values.pop(Attr, None)
+
+@Recorded
+def attributeQuery(Attr, node=None, n=None, exists=False, ex=False, **kwargs):
+	target = Current.Find(node or n)
+	return Attr in target.Longs or Attr in target.Shorts or Attr in target.Dynamic
+
+@Recorded
+def xform(*args, **kwargs):
+	Query = Flag(kwargs, 'query', 'q')
+	WorldSpace = Flag(kwargs, 'worldSpace', 'ws')
+	Relative = Flag(kwargs, 'relative', 'r')
+	Names = Flatten1(args)
+	if Names and '.cv[' in str(Names[0]):
+		return CvXform(Names[0], Query, kwargs)
+	Nodes = Objects(args)
+	if Query:
+		node = Nodes[0]
+		if Flag(kwargs, 'matrix', 'm'):
+			return Flatten(Current.WorldMatrix(node) if WorldSpace else Current.LocalMatrix(node))
+		if Flag(kwargs, 'translation', 't'):
+			if WorldSpace:
+				return list(Current.WorldMatrix(node)[3][:3])
+			return Current.Vector3(node, 'translate')
+		if Flag(kwargs, 'rotation', 'ro'):
+			if WorldSpace:
+				Rot = RotationPart(Current.WorldMatrix(node))
+				if node.IsA('joint'):
+					Parent = Current.ParentWorld(node)
+					Rot = MatMul(EulerToMatrix(Current.Vector3(node, 'rotate')), RotationPart(Parent))
+				return MatrixToEuler(Rot)
+			return Current.Vector3(node, 'rotate')
+		if Flag(kwargs, 'scale', 's'):
+			return Current.Vector3(node, 'scale')
+		if Flag(kwargs, 'rotatePivot', 'rp'):
+			return list(Current.WorldMatrix(node)[3][:3]) if WorldSpace else [0.0, 0.0, 0.0]
+		return None
+	for node in Nodes:
+		Matrix = Flag(kwargs, 'matrix', 'm')
+		if Matrix:
+			if WorldSpace:
+				Current.SetWorldMatrix(node, Unflatten(Matrix))
+			else:
+				Local = Unflatten(Matrix)
+				Current.SetVector3(node, 'translate', Local[3][:3])
+				Current.SetVector3(node, 'rotate', MatrixToEuler(RotationPart(Local)))
+		Translate = Flag(kwargs, 'translation', 't')
+		if Translate is not None:
+			if Relative:
+				Current.SetVector3(node, 'translate',
+					[a+b for a, b in zip(Current.Vector3(node, 'translate'), Translate)])
+			elif WorldSpace:
+				World = Current.WorldMatrix(node)
+				World[3][0], World[3][1], World[3][2] = Translate
+				Current.SetWorldMatrix(node, World, Rotation=False)
+			else:
+				Current.SetVector3(node, 'translate', Translate)
+		Rotate = Flag(kwargs, 'rotation', 'ro')
+		if Rotate is not None:
+			if WorldSpace:
+				World = MatMul(EulerToMatrix(Rotate), Translation(Current.WorldMatrix(node)[3][:3]))
+				Current.SetWorldMatrix(node, World, Position=False)
+			else:
+				Current.SetVector3(node, 'rotate', Rotate)
+		Scale = Flag(kwargs, 'scale', 's')
+		if Scale is not None:
+			Current.SetVector3(node, 'scale', Scale)
+
+def CvXform(Name, Query, kwargs):
+	node = Current.Find(Name.split('.')[0])
+	Cvs = CvRange(node, Name.split('.', 1)[1])
+	if Query:
+		Points = []
+		for cv in Cvs:
+			Points.extend(cv)
+		return Points
+	Translate = Flag(kwargs, 'translation', 't')
+	if Translate is not None:
+		if Flag(kwargs, 'relative', 'r'):
+			for cv in Cvs:
+				for i in range(3):
+					cv[i] += Translate[i]
+		else:
+			for index, cv in enumerate(Cvs):
+				cv[:] = Translate[index*3:index*3+3] if len(Translate) > 3 else Translate
+	Scale = Flag(kwargs, 'scale', 's')
+	if Scale is not None:
+		Pivot = Flag(kwargs, 'pivot', 'p', default=(0.0, 0.0, 0.0))
+		for cv in Cvs:
+			for i in range(3):
+				cv[i] = Pivot[i] + (cv[i]-Pivot[i])*Scale[i]
+
+@Recorded
+def matchTransform(*args, **kwargs):
+	Nodes = Objects(args)
+	Target = Nodes[-1]
+	Position = Flag(kwargs, 'position', 'pos', default=True)
+	Rotation = Flag(kwargs, 'rotation', 'rot', default=True)
+	for node in Nodes[:-1]:
+		World = Current.WorldMatrix(Target)
+		if Rotation:
+			World = MatMul(RotationPart(World), Translation(World[3][:3]))
+		else:
+			World = MatMul(RotationPart(Current.WorldMatrix(node)), Translation(World[3][:3]))
+		if not Position:
+			World[3][0], World[3][1], World[3][2] = Current.WorldMatrix(node)[3][:3]
+		Current.SetWorldMatrix(node, World, Position=Position, Rotation=Rotation)
+
+@Recorded
+def makeIdentity(*args, **kwargs):
+	for node in Objects(args):
+		ApplyIdentity(node, Flag(kwargs, 'translate', 't'), Flag(kwargs, 'rotate', 'r'), Flag(kwargs, 'scale', 's'))
+
+def ApplyIdentity(node, Translate, Rotate, Scale):
+	""" freeze transforms, joints move their rotation into jointOrient, transforms bake into their shapes """
+	if node.IsA('joint'):
+		if Rotate:
+			Orient = MatMul(EulerToMatrix(Current.Vector3(node, 'rotate')),
+				EulerToMatrix(Current.Vector3(node, 'jointOrient')))
+			Current.SetVector3(node, 'jointOrient', MatrixToEuler(Orient))
+			Current.SetVector3(node, 'rotate', [0.0, 0.0, 0.0])
+		for child in node.Children:
+			if child.IsA('joint'):
+				ApplyIdentity(child, Translate, Rotate, Scale)
+		return
+	if not node.IsA('transform'):
+		return
+	Baked = Identity()
+	if Scale:
+		Baked = MatMul(Baked, Scaling(Current.Vector3(node, 'scale')))
+		Current.SetVector3(node, 'scale', [1.0, 1.0, 1.0])
+	if Rotate:
+		Baked = MatMul(Baked, EulerToMatrix(Current.Vector3(node, 'rotate')))
+		Current.SetVector3(node, 'rotate', [0.0, 0.0, 0.0])
+	if Translate:
+		Baked = MatMul(Baked, Translation(Current.Vector3(node, 'translate')))
+		Current.SetVector3(node, 'translate', [0.0, 0.0, 0.0])
+	for child in node.Children:
+		if child.IsA('shape'):
+			child.Cvs = [list(MatMul([list(cv)+[1.0], [0]*4, [0]*4, [0]*4], Baked)[0][:3]) for cv in child.Cvs]
+		elif child.IsA('transform'):
+			Local = MatMul(Current.LocalMatrix(child), Baked)
+			Current.SetVector3(child, 'translate', Local[3][:3])
+			if not child.IsA('joint'):
+				Current.SetVector3(child, 'rotate', MatrixToEuler(RotationPart(Local)))
+
+@Recorded
+def rotate(*args, **kwargs):
+	Values = [ParseAngle(value) for value in args[:3]]
+	Nodes = Objects(args[3:])
+	for node in Nodes:
+		Delta = EulerToMatrix(Values)
+		Rot = EulerToMatrix(Current.Vector3(node, 'rotate'))
+		if Flag(kwargs, 'relative', 'r') and Flag(kwargs, 'objectSpace', 'os'):
+			Rot = MatMul(Delta, Rot)
+		elif Flag(kwargs, 'relative', 'r'):
+			Rot = MatMul(Rot, Delta)
+		else:
+			Rot = Delta
+		Current.SetVector3(node, 'rotate', MatrixToEuler(Rot))
+
+@Recorded
+def scale(*args, **kwargs):
+	""" relative scaling of CVs about a world pivot, or of transforms """
+	Values = [float(value) for value in args[:3]]
+	Relative = Flag(kwargs, 'relative', 'r')
+	for Name in Flatten1(args[3:]):
+		if '.cv[' in Name:
+			if not Relative:
+				raise StandInError('scale: only relative scaling of CVs is supported')
+			node = Current.Find(Name.split('.')[0])
+			Shape = ShapeOf(node)
+			Pivot = Flag(kwargs, 'pivot', 'p', default=(0.0, 0.0, 0.0))
+			Pivot = MatMul([list(Pivot)+[1.0], [0.0]*4, [0.0]*4, [0.0]*4], MatInverse(Current.WorldMatrix(Shape.Parent)))[0][:3]
+			for cv in CvRange(node, Name.split('.', 1)[1]):
+				for i in range(3):
+					cv[i] = Pivot[i] + (cv[i]-Pivot[i])*Values[i]
+			continue
+		node = Current.Find(Name)
+		Old = Current.Vector3(node, 'scale')
+		Current.SetVector3(node, 'scale', [a*b for a, b in zip(Old, Values)] if Relative else Values)
+
+@Recorded
+def joint(*args, **kwargs):
+	if Flag(kwargs, 'edit', 'e'):
+		Nodes = Objects(args)
+		if Flag(kwargs, 'setPreferredAngles', 'spa'):
+			Stack = list(Nodes)
+			while Stack:
+				node = Stack.pop()
+				Current.SetVector3(node, 'preferredAngle', Current.Vector3(node, 'rotate'))
+				if Flag(kwargs, 'children', 'ch'):
+					Stack.extend(child for child in node.Children if child.IsA('joint'))
+		return
+	Parent = Current.Selection[0] if Current.Selection and Current.Selection[0].IsA('joint') else None
+	node = Current.NewNode(Flag(kwargs, 'name', 'n', default='joint1'), 'joint', Parent)
+	Position = Flag(kwargs, 'position', 'p')
+	if Position:
+		World = Translation(Position)
+		Current.SetWorldMatrix(node, World, Rotation=False)
+	Select([node])
+	return Current.NameOf(node)
+
+@Recorded
+def circle(**kwargs):
+	Name = Flag(kwargs, 'name', 'n', default='nurbsCircle1')
+	Normal = Flag(kwargs, 'normal', 'nr', default=(0, 0, 1))
+	Radius = Flag(kwargs, 'radius', 'r', default=1.0)
+	Transform = Current.NewNode(Name, 'transform')
+	Shape = CurveShape(Transform, Transform.Name+'Shape', CirclePoints(Radius, Normal), 3, range(-2, 11))
+	if Flag(kwargs, 'constructionHistory', 'ch', default=True):
+		Make = Current.NewNode('makeNurbCircle1', 'makeNurbCircle')
+		Current.Set(Make, 'radius', [Radius])
+		Current.Set(Make, 'normal', list(Normal))
+		Current.Connect(Make.Name+'.outputCurve', Current.NameOf(Shape)+'.create')
+		Select([Transform])
+		return [Current.NameOf(Transform), Make.Name]
+	Select([Transform])
+	return [Current.NameOf(Transform)]
+
+@Recorded
+def nurbsSquare(**kwargs):
+	Name = Flag(kwargs, 'name', 'n', default='nurbsSquare1')
+	Side1 = Flag(kwargs, 'sideLength1', 'sl1', default=1.0)
+	Side2 = Flag(kwargs, 'sideLength2', 'sl2', default=1.0)
+	Normal = Flag(kwargs, 'normal', 'nr', default=(0, 0, 1))
+	Transform = Current.NewNode(Name, 'transform')
+	Make = Current.NewNode('makeNurbsSquare1', 'makeNurbsSquare')
+	Current.Set(Make, 'sideLength1', [Side1])
+	Current.Set(Make, 'sideLength2', [Side2])
+	Current.Set(Make, 'normal', list(Normal))
+	a, b = Side1/2.0, Side2/2.0
+	Sides = [('top', [[-a, b], [a, b]]), ('left', [[-a, -b], [-a, b]]),
+		('bottom', [[a, -b], [-a, -b]]), ('right', [[a, b], [a, -b]])]
+	for index, (side, points) in enumerate(Sides):
+		Child = Current.NewNode(side+Transform.Name, 'transform', Transform)
+		if abs(Normal[0]) > 0.5:
+			Cvs = [[0.0, p[0], p[1]] for p in points]
+		elif abs(Normal[1]) > 0.5:
+			Cvs = [[p[0], 0.0, p[1]] for p in points]
+		else:
+			Cvs = [[p[0], p[1], 0.0] for p in points]
+		Shape = CurveShape(Child, side+Transform.Name+'Shape', Cvs, 1, [0, 1])
+		Current.Connect(Make.Name+'.outputCurve%d' % (index+1), Current.NameOf(Shape)+'.create')
+	Select([Transform])
+	return [Current.NameOf(Transform), Make.Name]
+
+@Recorded
+def sphere(**kwargs):
+	Name = Flag(kwargs, 'name', 'n', default='nurbsSphere1')
+	Transform = Current.NewNode(Name, 'transform')
+	Shape = Current.NewNode(Transform.Name+'Shape', 'nurbsSurface', Transform)
+	Make = Current.NewNode('makeNurbSphere1', 'makeNurbSphere')
+	Current.Set(Make, 'radius', [Flag(kwargs, 'radius', 'r', default=1.0)])
+	Current.Connect(Make.Name+'.outputSurface', Current.NameOf(Shape)+'.create')
+	Select([Transform])
+	return [Current.NameOf(Transform), Make.Name]
+
+@Recorded
+def curve(**kwargs):
+	Name = Flag(kwargs, 'name', 'n', default='curve1')
+	Points = Flag(kwargs, 'point', 'p')
+	Degree = Flag(kwargs, 'degree', 'd', default=3)
+	Knots = Flag(kwargs, 'knot', 'k')
+	Transform = Current.NewNode(Name, 'transform')
+	CurveShape(Transform, Transform.Name+'Shape', [list(point) for point in Points], Degree, Knots)
+	Select([Transform])
+	return Current.NameOf(Transform)
+
+def MakeConstraint(Type, args, kwargs, Connections):
+	Nodes = Objects(args)
+	Targets, Constrained = Nodes[:-1], Nodes[-1]
+	Name = Flag(kwargs, 'name', 'n', default='%s_%s1' % (Constrained.Name, Type))
+	node = Current.NewNode(Name, Type, Constrained)
+	for index, target in enumerate(Targets):
+		Current.Set(node, 'target[%d].targetName' % index, [target.Name])
+		Current.Connect(Current.NameOf(target)+'.parentMatrix', Current.NameOf(node)+'.target[%d].targetParentMatrix' % index)
+	Current.Connect(Current.NameOf(Constrained)+'.parentInverseMatrix', Current.NameOf(node)+'.constraintParentInverseMatrix')
+	for source, dest in Connections:
+		Current.Connect(Current.NameOf(node)+'.'+source, Current.NameOf(Constrained)+'.'+dest)
+	if Flag(kwargs, 'maintainOffset', 'mo'):
+		Current.Set(node, 'offset', [0.0])
+	return [Current.NameOf(node)]
+
+@Recorded
+def orientConstraint(*args, **kwargs):
+	return MakeConstraint('orientConstraint', args, kwargs,
+		[('constraintRotate'+axis, 'rotate'+axis) for axis in Vector])
+
+@Recorded
+def pointConstraint(*args, **kwargs):
+	return MakeConstraint('pointConstraint', args, kwargs,
+		[('constraintTranslate'+axis, 'translate'+axis) for axis in Vector])
+
+@Recorded
+def parentConstraint(*args, **kwargs):
+	return MakeConstraint('parentConstraint', args, kwargs,
+		[('constraintTranslate'+axis, 'translate'+axis) for axis in Vector] +
+		[('constraintRotate'+axis, 'rotate'+axis) for axis in Vector])
+
+@Recorded
+def poleVectorConstraint(*args, **kwargs):
+	return MakeConstraint('poleVectorConstraint', args, kwargs,
+		[('constraintTranslate'+axis, 'poleVector'+axis) for axis in Vector])
+
+@Recorded
+def ikHandle(*args, **kwargs):
+	Start = Flag(kwargs, 'startJoint', 'sj')
+	End = Flag(kwargs, 'endEffector', 'ee')
+	if Start and End:
+		Start, End = Current.Find(Start), Current.Find(End)
+	else:
+		Nodes = Objects(args) if args else list(Current.Selection)
+		Start, End = Nodes[0], Nodes[-1]
+	Check = End
+	while Check is not None and Check is not Start:
+		Check = Check.Parent
+	if Check is None:
+		raise StandInError('ikHandle: %s is not below %s' % (End.Name, Start.Name))
+	Handle = Current.NewNode(Flag(kwargs, 'name', 'n', default='ikHandle1'), 'ikHandle')
+	Effector = Current.NewNode('effector1', 'ikEffector', End.Parent)
+	Current.SetVector3(Handle, 'translate', Current.WorldMatrix(End)[3][:3])
+	Current.Set(Handle, 'ikSolver', [Flag(kwargs, 'solver', 'sol', default='ikRPsolver')])
+	Current.Connect(Current.NameOf(End)+'.translate', Current.NameOf(Effector)+'.translate')
+	Current.Connect(Current.NameOf(Effector)+'.handlePath[0]', Current.NameOf(Handle)+'.endEffector')
+	Current.Connect(Current.NameOf(Start)+'.message', Current.NameOf(Handle)+'.startJoint')
+	Select([Handle])
+	return [Current.NameOf(Handle), Current.NameOf(Effector)]
+
+@Recorded
+def expression(**kwargs):
+	node = Current.NewNode(Flag(kwargs, 'name', 'n', default='expression1'), 'expression')
+	Current.Set(node, 'expression', [Flag(kwargs, 'string', 's', default='')])
+	return node.Name
+
+#--------------------------------------------------------------------------------------------------#
+# undo, refresh and evaluation state, recorded so builds can check they restore it
+
+@Recorded
+def undoInfo(**kwargs):
+	if Flag(kwargs, 'openChunk', 'ock'):
+		Current.UndoOpen += 1
+		Current.UndoChunks.append(Flag(kwargs, 'chunkName', 'cn'))
+	elif Flag(kwargs, 'closeChunk', 'cck'):
+		Current.UndoOpen -= 1
+	elif Flag(kwargs, 'query', 'q'):
+		return Current.UndoState
+	elif 'state' in kwargs or 'st' in kwargs:
+		Current.UndoState = Flag(kwargs, 'state', 'st')
+
+@Recorded
+def refresh(**kwargs):
+	if 'suspend' in kwargs or 'su' in kwargs:
+		Current.RefreshSuspended = bool(Flag(kwargs, 'suspend', 'su'))
+	if Flag(kwargs, 'query', 'q'):
+		return Current.RefreshSuspended
+
+@Recorded
+def evaluationManager(**kwargs):
+	if Flag(kwargs, 'query', 'q'):
+		if Flag(kwargs, 'mode'):
+			return [Current.EvaluationMode]
+		return None
+	Mode = Flag(kwargs, 'mode')
+	if Mode:
+		Current.EvaluationMode = Mode
+
+@Recorded
+def evalDeferred(*args, **kwargs):
+	Current.IdleQueue.append(args[0] if args else kwargs.get('command'))
+
+@Recorded
+def about(**kwargs):
+	if Flag(kwargs, 'batch', 'b'):
+		return Current.Batch
+	return '2024'
+
+@Recorded
+def file(*args, **kwargs):
+	if Flag(kwargs, 'open', 'o'):
+		Current.Reset()
+		return args[0] if args else None
+	if Flag(kwargs, 'save', 's'):
+		return None
+	if Flag(kwargs, 'query', 'q'):
+		return ''
+	if Flag(kwargs, 'new', 'f'):
+		Current.Reset()
+
+@Recorded
+def internalVar(**kwargs):
+	return tempfile.gettempdir()+os.sep
+
+#--------------------------------------------------------------------------------------------------#
+# UI commands hold their values so the tool can query them
+
+def Widget(Type, Default=None):
+	def Command(*args, **kwargs):
+		Name = args[0] if args else '%s%d' % (Type, len(Current.Widgets)+1)
+		if Flag(kwargs, 'exists', 'ex'):
+			return Name in Current.Widgets
+		if Flag(kwargs, 'query', 'q'):
+			Values = Current.Widgets.get(Name, {})
+			for key in kwargs:
+				if key not in ('query', 'q'):
+					return Values.get(key, Default)
+			return None
+		Values = Current.Widgets.setdefault(Name, {})
+		for key, value in kwargs.items():
+			if key not in ('edit', 'e'):
+				Values[key] = value
+		return Name
+	Command.__name__ = Type
+	return Recorded(Command)
+
+window = Widget('window')
+columnLayout = Widget('columnLayout')
+rowLayout = Widget('rowLayout')
+frameLayout = Widget('frameLayout')
+setParent = Widget('setParent')
+separator = Widget('separator')
+button = Widget('button')
+checkBox = Widget('checkBox', False)
+floatSlider = Widget('floatSlider', 0.0)
+colorSliderGrp = Widget('colorSliderGrp', [1.0, 1.0, 1.0])
+progressBar = Widget('progressBar', 0)
+text = Widget('text', '')
+textField = Widget('textField', '')
+scrollField = Widget('scrollField', '')
+intSliderGrp = Widget('intSliderGrp', 1)
+optionMenu = Widget('optionMenu', '')
+menuItem = Widget('menuItem')
+
+@Recorded
+def showWindow(*args, **kwargs):
+	return None
+
+@Recorded
+def deleteUI(*args, **kwargs):
+	for name in args:
+		Current.Widgets.pop(name, None)
+
+#--------------------------------------------------------------------------------------------------#
+
+def Install():
+	""" register the stand-in as maya, maya.cmds and maya.mel, returning the scene """
+	Maya = types.ModuleType('maya')
+	Cmds = types.ModuleType('maya.cmds')
+	Mel = types.ModuleType('maya.mel')
+	for name, value in globals().items():
+		if callable(value) and getattr(value, '__name__', '') == name and name[:1].islower():
+			setattr(Cmds, name, value)
+	Mel.eval = Recorded(lambda *args, **kwargs: None)
+	Maya.cmds = Cmds
+	Maya.mel = Mel
+	Maya.standin = sys.modules[__name__]
+	sys.modules['maya'] = Maya
+	sys.modules['maya.cmds'] = Cmds
+	sys.modules['maya.mel'] = Mel
+	return Current
+
+def Counts():
+	return dict(Current.Counts)
+
+def ResetCounts():
+	Current.Counts = {}
+	Current.Times = {}
+
+def RunIdleQueue():
+	""" run what evalDeferred queued, and what that queues in turn, as maya does once it is idle """
+	while Current.IdleQueue:
+		Current.IdleQueue.pop(0)()
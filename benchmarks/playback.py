@@ -0,0 +1,105 @@
+""" Compares the playback speed of FK rigs driven by constraints and by matrices, in Maya:
+
+	mayapy benchmarks/playback.py
+	mayapy benchmarks/playback.py --sizes 100 1000 --frames 200 --json playback.json
+
+Each size gets a synthetic skeleton with FK controls built on the whole hierarchy twice, once with
+the default orient and point constraints and once with Matrix FK. Every anim is keyed with the same
+rotations, and the timeline is stepped through with each joint's world matrix read on every frame,
+which is the work a skinCluster would ask for. The report gives the frames per second of each rig,
+and whether the two posed the joints the same on a sample of frames. Unlike run_benchmarks.py this needs
+Maya, and the exit code is 1 when the poses differ """
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import time
+
+Here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, Here)
+sys.path.insert(0, os.path.dirname(Here))
+
+import skeletons
+
+def KeyAnims(cmds, Anims, Frames):
+	""" key every anim with a slow wave of rotation, different for each anim but the same on every run """
+	for Index, Anim in enumerate(Anims):
+		for Frame in range(0, Frames+1, 10):
+			for Axis, Phase in zip('XYZ', (0.0, 1.3, 2.1)):
+				Angle = 20.0 * math.sin(Frame * 0.1 + Index * 0.7 + Phase)
+				cmds.setKeyframe(Anim, attribute='rotate'+Axis, time=Frame, value=Angle)
+
+def Play(cmds, Joints, Frames):
+	""" step through the timeline pulling every joint's world matrix, returning the seconds it took
+	and the poses of a few frames to compare """
+	Poses = {}
+	Samples = set(range(0, Frames+1, max(Frames // 5, 1)))
+	Start = time.perf_counter()
+	for Frame in range(Frames+1):
+		cmds.currentTime(Frame, update=True)
+		Pose = [cmds.getAttr(Joint+'.worldMatrix[0]') for Joint in Joints]
+		if Frame in Samples:
+			Poses[Frame] = [Value for Matrix in Pose for Value in Matrix]
+	return time.perf_counter() - Start, Poses
+
+def RunRig(cmds, Builders, Size, FingerLength, Frames, Matrix):
+	""" build and key FK on a fresh skeleton, then time its playback """
+	cmds.file(new=True, force=True)
+	Roles = skeletons.Character(cmds, Size, FingerLength)
+	with contextlib.redirect_stdout(io.StringIO()):
+		Builders.BuildFK([Roles['root']], False, False, None, Matrix)
+	Anims = cmds.ls('FK_Anim_*', type='transform')
+	KeyAnims(cmds, Anims, Frames)
+	Joints = sorted(cmds.ls(type='joint', long=True))
+	Nodes = len(cmds.ls(type=('orientConstraint', 'pointConstraint', 'multMatrix')))
+	Seconds, Poses = Play(cmds, Joints, Frames)
+	return (Frames+1) / max(Seconds, 1e-9), Nodes, Poses
+
+def SamePoses(Old, New, Tolerance=1e-3):
+	""" whether two rigs put every joint in the same place on every sampled frame """
+	return Old.keys() == New.keys() and all(len(Old[Frame]) == len(New[Frame]) and
+		max(abs(A - B) for A, B in zip(Old[Frame], New[Frame])) < Tolerance for Frame in Old)
+
+def Main(Arguments=None):
+	Parser = argparse.ArgumentParser(description='Compare the playback of constraint and matrix FK rigs, in Maya.')
+	Parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000], help='joint counts')
+	Parser.add_argument('--frames', type=int, default=200, help='frames to play')
+	Parser.add_argument('--finger-length', type=int, default=3, help='joints per finger, larger gives deeper chains')
+	Parser.add_argument('--parallel', action='store_true', help='play with the parallel evaluation manager')
+	Parser.add_argument('--json', help='save the results to this file')
+	Args = Parser.parse_args(Arguments)
+
+	import maya.standalone
+	maya.standalone.initialize(name='python')
+	try:
+		import maya.cmds as cmds
+		from RigHelper import Builders
+		cmds.evaluationManager(mode='parallel' if Args.parallel else 'off')
+
+		Results = []
+		Failed = False
+		print('%7s %12s %12s %8s  %s' % ('joints', 'constraints', 'matrix', 'speedup', 'poses'))
+		for Size in Args.sizes:
+			ConstraintFps, ConstraintNodes, ConstraintPoses = RunRig(cmds, Builders, Size, Args.finger_length, Args.frames, False)
+			MatrixFps, MatrixNodes, MatrixPoses = RunRig(cmds, Builders, Size, Args.finger_length, Args.frames, True)
+			Same = SamePoses(ConstraintPoses, MatrixPoses)
+			Failed = Failed or not Same
+			print('%7d %8.1f fps %8.1f fps %7.1fx  %s' % (Size, ConstraintFps, MatrixFps,
+				MatrixFps / max(ConstraintFps, 1e-9), 'same' if Same else 'DIFFERENT'))
+			Results.append({'size': Size, 'frames': Args.frames, 'parallel': Args.parallel,
+				'constraints': {'fps': ConstraintFps, 'nodes': ConstraintNodes},
+				'matrix': {'fps': MatrixFps, 'nodes': MatrixNodes}, 'same': Same})
+	finally:
+		maya.standalone.uninitialize()
+
+	if Args.json:
+		with open(Args.json, 'w') as File:
+			json.dump(Results, File, indent=1, sort_keys=True)
+	return 1 if Failed else 0
+
+if __name__ == '__main__':
+	sys.exit(Main())
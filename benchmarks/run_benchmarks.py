@@ -0,0 +1,247 @@
+""" Times the rig tool's builds on synthetic skeletons, without Maya.
+
+	python benchmarks/run_benchmarks.py
+	python benchmarks/run_benchmarks.py --sizes 10 100 1000 --json results.json
+	python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+
+maya.cmds is replaced by the recording stand-in in mayastandin.py. Each build runs on a fresh
+skeleton of each size, and the report gives the wall time, the number of cmds calls by command, and
+how both grow with the joint count. With --compare, any build making more cmds calls than the
+saved baseline, or failing where it passed, is reported and the exit code is 1. Call counts do not
+depend on the machine, so they are what is compared; times are only reported """
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import time
+
+Here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, Here)
+
+import mayastandin
+import skeletons
+
+def LoadTool():
+	""" install the stand-in and import the rig tool's builders against it """
+	mayastandin.Install()
+	sys.path.insert(0, os.path.dirname(Here))
+	from RigHelper import Builders
+	return Builders
+
+#--------------------------------------------------------------------------------------------------#
+# Each benchmark sets up what its build needs and returns the build to time
+
+def BenchFK(cmds, Tool, Roles):
+	cmds.select(Roles['root'])
+	return lambda: Tool.StartFK(False)
+
+def BenchFKMatrix(cmds, Tool, Roles):
+	return lambda: Tool.BuildFK([Roles['root']], False, False, None, True)
+
+def BenchSwitch(cmds, Tool, Roles):
+	cmds.select(Roles['arm'][0], Roles['arm'][-1])
+	return lambda: Tool.StartSwitch(False)
+
+def BenchSwitchMatrix(cmds, Tool, Roles):
+	return lambda: Tool.BuildSwitch([Roles['arm'][0], Roles['arm'][-1]], True)
+
+def BenchSwitches(cmds, Tool, Roles):
+	Chains = [Roles['arm'], Roles['leg'][:3]] + [Finger for Finger in Roles['fingers'] if len(Finger) == 3]
+	cmds.select([Joint for Chain in Chains for Joint in (Chain[0], Chain[-1])])
+	return lambda: Tool.StartSwitches(False)
+
+def BenchAddToSwitch(cmds, Tool, Roles):
+	SwitchAnim = Tool.BuildSwitch([Roles['arm'][0], Roles['arm'][-1]])[1]
+	Finger = Roles['fingers'][0]
+	cmds.select(Finger[0], Finger[-1], SwitchAnim)
+	return lambda: Tool.AddToSwitch(False)
+
+def BenchTwist(cmds, Tool, Roles):
+	cmds.select([Joint for Finger in Roles['fingers'] for Joint in Finger[:-1]] or Roles['arm'][:-1])
+	return lambda: Tool.StartTwist(False)
+
+def BenchTwistSegments(cmds, Tool, Roles):
+	Joints = [Joint for Finger in Roles['fingers'] for Joint in Finger[:-1]] or Roles['arm'][:-1]
+	return lambda: Tool.BuildTwist(Joints, 4)
+
+def BenchFootRoll(cmds, Tool, Roles):
+	Handle = Tool.BuildIK([Roles['leg'][0], Roles['leg'][2]])[2]
+	cmds.select(Roles['foot'][0], Roles['foot'][-1], Handle)
+	return lambda: Tool.StartFootRoll(False)
+
+def BenchFlip(cmds, Tool, Roles):
+	cmds.select(Roles['root'])
+	return lambda: Tool.StartFlipJoints(False)
+
+def Replayed(Bench):
+	""" a benchmark of Bench's build traced on the skeleton, then played on the same skeleton with
+	its joints renamed, in a new scene as a trace is played on another character """
+	def BenchReplay(cmds, Tool, Roles):
+		from RigHelper import Session, Trace
+		Build = Bench(cmds, Tool, Roles)
+		Session.Current.Options.update(TraceBuilds=True, ChunkedBuilds=False)
+		try:
+			Build()
+		finally:
+			del Session.Current.Options['TraceBuilds'], Session.Current.Options['ChunkedBuilds']
+		Traces = Session.Current.Traces[-1:]
+		cmds.file(new=True, force=True)
+		skeletons.Character(cmds, Roles['count'], max(len(Finger) for Finger in Roles['fingers']))
+		NameMap = dict((Joint, cmds.rename(Joint, 'B_'+Joint)) for Joint in cmds.ls(type='joint'))
+		return lambda: Trace.ReplayTraces(Traces, NameMap)
+	return BenchReplay
+
+Benchmarks = {
+	'fk': BenchFK,
+	'fkmatrix': BenchFKMatrix,
+	'switch': BenchSwitch,
+	'switchmatrix': BenchSwitchMatrix,
+	'switches': BenchSwitches,
+	'addtoswitch': BenchAddToSwitch,
+	'twist': BenchTwist,
+	'twistsegments': BenchTwistSegments,
+	'footroll': BenchFootRoll,
+	'flip': BenchFlip,
+	'replay': Replayed(BenchFK),
+	'replayswitches': Replayed(BenchSwitches),
+	'replayflip': Replayed(BenchFlip),
+	}
+
+# the build each replay was traced from
+Replays = {'replay': 'fk', 'replayswitches': 'switches', 'replayflip': 'flip'}
+
+#--------------------------------------------------------------------------------------------------#
+
+def RunBenchmark(Tool, Name, Size, FingerLength, Repeat=1, Verbose=False):
+	""" the best time of Repeat runs of one build on a fresh skeleton, with its cmds call counts """
+	cmds = sys.modules['maya.cmds']
+	Result = {'benchmark': Name, 'size': Size}
+	Best = None
+	for i in range(Repeat):
+		cmds.file(new=True, force=True)
+		Roles = skeletons.Character(cmds, Size, FingerLength)
+		Result['joints'] = Roles['count']
+		try:
+			with contextlib.redirect_stdout(sys.stdout if Verbose else io.StringIO()):
+				Build = Benchmarks[Name](cmds, Tool, Roles)
+				mayastandin.ResetCounts()
+				Start = time.perf_counter()
+				Build()
+				mayastandin.RunIdleQueue() # the chunks of builds run from the idle queue
+				Seconds = time.perf_counter() - Start
+		except Exception as Error:
+			Result['error'] = '%s: %s' % (type(Error).__name__, str(Error).splitlines()[0] if str(Error) else '')
+			return Result
+		if Best is None or Seconds < Best:
+			Best = Seconds
+			Result['seconds'] = Seconds
+			Result['counts'] = mayastandin.Counts()
+			Result['calls'] = sum(Result['counts'].values())
+	return Result
+
+def Growth(Results, Key):
+	""" the exponent k in value ~ joints**k between the two largest sizes a benchmark ran at,
+	where the fixed cost of a build matters least """
+	Small, Large = sorted(Results, key=lambda Result: Result['joints'])[-2:]
+	if Small['joints'] == Large['joints']:
+		return 0.0
+	return math.log(max(Key(Large), 1e-9) / max(Key(Small), 1e-9)) / math.log(float(Large['joints']) / Small['joints'])
+
+def Report(Results, Top=4):
+	print('%-14s %7s %10s %8s  %s' % ('benchmark', 'joints', 'seconds', 'calls', 'most called'))
+	for Result in Results:
+		if 'error' in Result:
+			print('%-14s %7d %10s %8s  %s' % (Result['benchmark'], Result['joints'], '-', '-', Result['error']))
+			continue
+		Counts = sorted(Result['counts'].items(), key=lambda Item: -Item[1])[:Top]
+		print('%-14s %7d %10.4f %8d  %s' % (Result['benchmark'], Result['joints'], Result['seconds'],
+			Result['calls'], ', '.join('%s %d' % Item for Item in Counts)))
+
+	print('')
+	print('growth with joint count between the two largest sizes, as k in joints**k (1 is linear)')
+	for Name in Benchmarks:
+		Runs = [Result for Result in Results if Result['benchmark'] == Name and 'error' not in Result]
+		if len(Runs) < 2:
+			continue
+		Line = '%-14s time %5.2f  calls %5.2f' % (Name, Growth(Runs, lambda Result: Result['seconds']),
+			Growth(Runs, lambda Result: Result['calls']))
+		Steep = []
+		for Command in sorted(set(Command for Result in Runs for Command in Result['counts'])):
+			if all(Command in Result['counts'] for Result in Runs):
+				Exponent = Growth(Runs, lambda Result: Result['counts'][Command])
+				if Exponent > 1.15:
+					Steep.append('%s %.2f' % (Command, Exponent))
+		if Steep:
+			Line += '  faster than linear: ' + ', '.join(Steep)
+		print(Line)
+
+	Built = dict(((Result['benchmark'], Result['size']), Result) for Result in Results if 'error' not in Result)
+	Lines = []
+	for Result in Results:
+		Build = Built.get((Replays.get(Result['benchmark']), Result['size']))
+		if Build and 'error' not in Result:
+			Lines.append('%-14s %7d  time %5.2f  calls %5.2f' % (Result['benchmark'], Result['joints'],
+				Result['seconds'] / max(Build['seconds'], 1e-9), float(Result['calls']) / Build['calls']))
+	if Lines:
+		print('')
+		print('replays against the builds they were traced from, as replay / build')
+		print('\n'.join(Lines))
+
+def Compare(Results, Baseline, Tolerance):
+	""" the ways Results are worse than a saved Baseline: more calls to a command, or a failure """
+	Saved = dict(((Result['benchmark'], Result['size']), Result) for Result in Baseline)
+	Problems = []
+	for Result in Results:
+		Old = Saved.get((Result['benchmark'], Result['size']))
+		if Old is None or 'error' in Old:
+			continue
+		Label = '%s at %d joints' % (Result['benchmark'], Result['joints'])
+		if 'error' in Result:
+			Problems.append('%s failed: %s' % (Label, Result['error']))
+			continue
+		for Command, Count in sorted(Result['counts'].items()):
+			Limit = Old['counts'].get(Command, 0) * (1 + Tolerance)
+			if Count > Limit:
+				Problems.append('%s: %d %s calls, %d in the baseline' % (Label, Count, Command, Old['counts'].get(Command, 0)))
+	return Problems
+
+def Main(Arguments=None):
+	Parser = argparse.ArgumentParser(description='Time the rig tool on synthetic skeletons, without Maya.')
+	Parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000], help='joint counts')
+	Parser.add_argument('--benchmarks', nargs='+', choices=list(Benchmarks), default=list(Benchmarks))
+	Parser.add_argument('--finger-length', type=int, default=3, help='joints per finger, larger gives deeper chains')
+	Parser.add_argument('--repeat', type=int, default=1, help='runs of each build, the best time is kept')
+	Parser.add_argument('--json', help='save the results to this file')
+	Parser.add_argument('--compare', help='fail on more cmds calls than the results saved in this file')
+	Parser.add_argument('--tolerance', type=float, default=0.0, help='fraction of extra calls allowed by --compare')
+	Parser.add_argument('--verbose', action='store_true', help='show what the tool prints while building')
+	Args = Parser.parse_args(Arguments)
+
+	Tool = LoadTool()
+	Results = []
+	for Name in Args.benchmarks:
+		for Size in Args.sizes:
+			Results.append(RunBenchmark(Tool, Name, Size, Args.finger_length, max(1, Args.repeat), Args.verbose))
+	Report(Results)
+
+	if Args.json:
+		with open(Args.json, 'w') as File:
+			json.dump(Results, File, indent=1, sort_keys=True)
+	if Args.compare:
+		with open(Args.compare) as File:
+			Problems = Compare(Results, json.load(File), Args.tolerance)
+		print('')
+		if Problems:
+			print('%d regressions against %s:' % (len(Problems), Args.compare))
+			for Problem in Problems:
+				print('\t'+Problem)
+			return 1
+		print('no regressions against %s' % Args.compare)
+	return 0
+
+if __name__ == '__main__':
+	sys.exit(Main())
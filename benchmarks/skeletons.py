@@ -0,0 +1,48 @@
+""" Synthetic skeletons for the benchmarks, built with the stand-in's joint command.
+
+Every skeleton is a small character: a root, a spine, an arm ending in a hand and a leg ending in a
+foot. The joint count is made up by the hand, which gets as many fingers of FingerLength joints as
+it takes, so a 10,000 joint skeleton is a very wide hand rather than a very deep chain. A large
+FingerLength gives long chains instead """
+
+Spacing = 2.0
+
+def Chain(cmds, Names, Parent=None, Step=(Spacing, 0, 0)):
+	""" a joint chain under Parent, each joint Step away from the last. Returns the long names """
+	cmds.select(clear=True)
+	if Parent:
+		cmds.select(Parent)
+	Joints = []
+	for Name in Names:
+		Joint = cmds.joint(name=Name)
+		if Parent or Joints:
+			cmds.setAttr(Joint+'.translate', *Step)
+		Joints.append(cmds.ls(Joint, long=True)[0])
+		cmds.select(Joint)
+	cmds.select(clear=True)
+	return Joints
+
+def Character(cmds, Count, FingerLength=3):
+	""" a character of at least 12 joints, with Count joints when Count is larger.
+	Returns the long names of the joints each benchmark needs, by role """
+	Root = Chain(cmds, ['root'])[0]
+	Spine = Chain(cmds, ['spine_01', 'spine_02'], Root, (0, Spacing, 0))
+	Arm = Chain(cmds, ['L_shoulder', 'L_elbow', 'L_wrist'], Spine[-1])
+	Leg = Chain(cmds, ['L_hip', 'L_knee', 'L_ankle', 'L_ball', 'L_toe'], Root, (0, -Spacing, 0))
+	Remaining = max(Count - 11, 1)
+	Fingers = []
+	Finger = 0
+	while Remaining > 0:
+		Length = min(FingerLength, Remaining)
+		Names = ['L_finger%d_%02d' % (Finger, Joint+1) for Joint in range(Length)]
+		Fingers.append(Chain(cmds, Names, Arm[-1], (Spacing/2, 0, Spacing/4)))
+		Remaining -= Length
+		Finger += 1
+	return {
+		'root': Root,
+		'arm': Arm,
+		'leg': Leg,
+		'foot': Leg[2:],
+		'fingers': Fingers,
+		'count': len(cmds.ls(type='joint')),
+		}